@@ -1,7 +1,7 @@
 # Εισαγωγή των απαραίτητων modules
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Car, Appointment, Work
+from .models import User, Car, Appointment, Work, ImportJob, ArchivedAppointment, ArchivedWork
 
 """
 Ολόκληρος ο κώδικας ρυθμίζει τη διαχείριση των μοντέλων (User, Car, Appointment, Work)
@@ -66,6 +66,9 @@ class AppointmentAdmin(admin.ModelAdmin):
     # Αναζητήσιμα widgets για τα σχετικά μοντέλα
     raw_id_fields = ("client", "car", "mechanic")
 
+    # Τα σύνολα υπολογίζονται από τις εργασίες του ραντεβού
+    readonly_fields = ("total_cost", "labour_duration")
+
 
 # 4. ΡΥΘΜΙΣΗ ΤΩΝ ΕΡΓΑΣΙΩΝ (Work)
 @admin.register(Work)
@@ -79,4 +82,43 @@ class WorkAdmin(admin.ModelAdmin):
     search_fields = ("description",)  # Μόνο στην περιγραφή μπορεί να γίνει αναζήτηση
     
     # Αναζητήσιμο widget για το σχετικό ραντεβού
-    raw_id_fields = ("appointment",)
\ No newline at end of file
+    raw_id_fields = ("appointment",)
+
+
+# 5. ΡΥΘΜΙΣΗ ΤΩΝ ΕΡΓΑΣΙΩΝ ΕΙΣΑΓΩΓΗΣ (ImportJob)
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """
+    Παρακολούθηση των εργασιών εισαγωγής CSV που εκτελούνται στο παρασκήνιο.
+    """
+    
+    list_display = ("id", "kind", "status", "rows_processed", "rows_created", "rows_skipped", "created_by", "creation_date")
+    list_filter = ("kind", "status")
+    raw_id_fields = ("created_by",)
+
+
+# 6. ΡΥΘΜΙΣΗ ΤΟΥ ΑΡΧΕΙΟΥ ΡΑΝΤΕΒΟΥ (ArchivedAppointment)
+class ArchivedWorkInline(admin.TabularInline):
+    model = ArchivedWork
+    extra = 0
+    can_delete = False
+    readonly_fields = ("description", "materials", "completion_time", "cost")
+
+
+@admin.register(ArchivedAppointment)
+class ArchivedAppointmentAdmin(admin.ModelAdmin):
+    """
+    Προβολή (μόνο ανάγνωση) των αρχειοθετημένων ραντεβού και των εργασιών τους.
+    Οι εγγραφές δημιουργούνται από την εντολή `manage.py archive_appointments`.
+    """
+
+    list_display = ("id", "client", "car", "date", "hour", "status", "mechanic", "archived_at")
+    list_filter = ("status", "service_type")
+    search_fields = ("client__username", "mechanic__username", "car__serial_number")
+    inlines = [ArchivedWorkInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Appointment, Work, ArchivedAppointment, ArchivedWork
+from .fragments import MY_APPOINTMENTS, MY_ASSIGNED_APPOINTMENTS, invalidate
+from .transitions import FINAL_STATUSES
+
+"""
+Αρχειοθέτηση παλιών κλεισμένων ραντεβού (ολοκληρωμένων/ακυρωμένων) με τις εργασίες τους.
+Οι γραμμές αντιγράφονται στους πίνακες ArchivedAppointment/ArchivedWork με τα ίδια id
+(INSERT ... SELECT μέσα στη βάση, χωρίς φόρτωση αντικειμένων) και διαγράφονται με DELETE,
+ώστε ο πίνακας των ραντεβού, που διαβάζουν ο προγραμματισμός και οι λίστες, να έχει μόνο
+το πρόσφατο και ενεργό τμήμα. Κάθε παρτίδα μεταφέρεται σε δικό της transaction.
+Τα ημερήσια σύνολα (DailySummary) δεν αλλάζουν: η διαγραφή γίνεται χωρίς signals και το
+reports.rebuild_summary μετρά και το αρχείο. Μια μεταγενέστερη διαγραφή αρχειοθετημένου
+ραντεβού (π.χ. σε cascade από τον πελάτη ή το αυτοκίνητο) αφαιρείται από τα σύνολα (signals.py). Τα τελικά ραντεβού δεν καταλαμβάνουν θέσεις,
+άρα η cache των ελεύθερων θέσεων δεν επηρεάζεται.
+"""
+
+# Προεπιλεγμένη ηλικία (σε ημέρες) μετά την οποία ένα κλεισμένο ραντεβού αρχειοθετείται
+ARCHIVE_AFTER_DAYS = 365
+
+# Πλήθος ραντεβού ανά παρτίδα (και transaction)
+ARCHIVE_BATCH_SIZE = 1000
+
+# Στήλες που αντιγράφονται (ίδια ονόματα στους πίνακες του αρχείου)
+APPOINTMENT_COLUMNS = [field.column for field in Appointment._meta.concrete_fields]
+WORK_COLUMNS = [field.column for field in Work._meta.concrete_fields]
+
+
+def archive_cutoff(days=ARCHIVE_AFTER_DAYS):
+    """Η πρώτη ημέρα που δεν αρχειοθετείται"""
+    return date.today() - timedelta(days=days)
+
+
+def archivable(cutoff):
+    """Τα κλεισμένα ραντεβού πριν την ημέρα cutoff"""
+    return Appointment.objects.filter(status__in=FINAL_STATUSES, date__lt=cutoff)
+
+
+def copy_rows(source, target, columns, condition, params, extra=None):
+    """
+    Αντιγράφει με ένα INSERT ... SELECT τις γραμμές του πίνακα source που ικανοποιούν τη
+    συνθήκη στον πίνακα target (ίδιες στήλες, συν τις σταθερές τιμές extra). Επιστρέφει το πλήθος.
+    """
+    extra = extra or {}
+    quote = connection.ops.quote_name
+    names = ', '.join(quote(column) for column in [*columns, *extra])
+    values = ', '.join([quote(column) for column in columns] + ['%s'] * len(extra))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({names}) '
+            f'SELECT {values} FROM {quote(source._meta.db_table)} WHERE {condition}',
+            [*extra.values(), *params],
+        )
+        return cursor.rowcount
+
+
+def delete_rows(model, condition, params):
+    """Διαγράφει με ένα DELETE (χωρίς signals) τις γραμμές του πίνακα που ικανοποιούν τη συνθήκη"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} WHERE {condition}', params)
+        return cursor.rowcount
+
+
+def archive_batch(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Μεταφέρει στο αρχείο έως batch_size ραντεβού πριν την ημέρα cutoff, με τις εργασίες
+    τους, σε ένα transaction. Επιστρέφει (πλήθος ραντεβού, πλήθος εργασιών).
+    """
+    with transaction.atomic():
+        rows = list(
+            archivable(cutoff).select_for_update().order_by('date')
+            .values_list('pk', 'client_id', 'mechanic_id')[:batch_size]
+        )
+        if not rows:
+            return 0, 0
+        ids = [pk for pk, _, _ in rows]
+        placeholders = ', '.join(['%s'] * len(ids))
+
+        copy_rows(
+            Appointment, ArchivedAppointment, APPOINTMENT_COLUMNS, f'id IN ({placeholders})', ids,
+            extra={'archived_at': connection.ops.adapt_datetimefield_value(timezone.now())},
+        )
+        works = copy_rows(Work, ArchivedWork, WORK_COLUMNS, f'appointment_id IN ({placeholders})', ids)
+        # Διαγραφή χωρίς signals: τα σύνολα των ραντεβού και τα ημερήσια σύνολα μένουν ως έχουν
+        delete_rows(Work, f'appointment_id IN ({placeholders})', ids)
+        delete_rows(Appointment, f'id IN ({placeholders})', ids)
+
+        invalidate(MY_APPOINTMENTS, *{client_id for _, client_id, _ in rows})
+        invalidate(MY_ASSIGNED_APPOINTMENTS, *{mechanic_id for _, _, mechanic_id in rows})
+    return len(rows), works
+
+
+def archive_appointments(cutoff, batch_size=ARCHIVE_BATCH_SIZE, log=None):
+    """
+    Αρχειοθετεί σε παρτίδες όλα τα κλεισμένα ραντεβού πριν την ημέρα cutoff.
+    Μια διακοπή αφήνει τις ολοκληρωμένες παρτίδες στο αρχείο και η επόμενη εκτέλεση συνεχίζει.
+    Επιστρέφει (πλήθος ραντεβού, πλήθος εργασιών).
+    """
+    appointments = works = 0
+    while True:
+        moved, moved_works = archive_batch(cutoff, batch_size)
+        if not moved:
+            return appointments, works
+        appointments += moved
+        works += moved_works
+        if log:
+            log(f"{appointments} ραντεβού, {works} εργασίες στο αρχείο")
+
+
+class IncludeArchivedMixin:
+    """
+    Mixin για views λίστας που περιλαμβάνουν και το αρχείο όταν ζητηθεί με ?archived=1.
+    Δίνει στο template τη σημαία include_archived.
+    """
+
+    def include_archived(self):
+        return self.request.GET.get('archived') == '1'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['include_archived'] = self.include_archived()
+        return context
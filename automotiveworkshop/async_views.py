@@ -0,0 +1,50 @@
+from django.views.generic import View
+from django.views.generic.base import ContextMixin, TemplateResponseMixin
+
+"""
+Βάση για ασύγχρονες σελίδες λίστας (μόνο ανάγνωση) που εξυπηρετούνται μέσω ASGI
+(project/asgi.py). Τα δεδομένα φορτώνονται με το ασύγχρονο ORM (aiterator), οπότε
+όσο περιμένει η βάση ή ένας αργός client δεν δεσμεύεται thread.
+Σε WSGI οι ίδιες views εκτελούνται κανονικά (το Django τις τρέχει με async_to_sync).
+Μετρήσεις ASGI/WSGI: `manage.py benchmark asgi`.
+"""
+
+
+class AsyncListView(TemplateResponseMixin, ContextMixin, View):
+    """
+    Ασύγχρονη εκδοχή του ListView. Η view ορίζει model (ή get_queryset), template_name,
+    context_object_name και προαιρετικά paginate_by (απαιτεί apaginate_queryset,
+    π.χ. από το KeysetPaginationMixin).
+    Οι έλεγχοι ρόλου γίνονται με method_decorator στο dispatch, όπως στις σύγχρονες views.
+    Το template αποδίδεται από το TemplateResponse μετά την view (το Django το εκτελεί σε thread).
+    """
+    model = None
+    context_object_name = None
+    paginate_by = None
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    async def aget_object_list(self, queryset):
+        return [obj async for obj in queryset.aiterator()]
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Ο χρήστης φορτώνεται ασύγχρονα μία φορά και αντικαθιστά το lazy request.user,
+        # ώστε η view και το template να μην τον ξαναφορτώσουν με σύγχρονο query
+        request.user = await request.auser()
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        context = {'paginator': None, 'page_obj': None, 'is_paginated': False}
+        if self.paginate_by:
+            paginator, page, object_list, is_paginated = await self.apaginate_queryset(queryset, self.paginate_by)
+            context.update(paginator=paginator, page_obj=page, is_paginated=is_paginated)
+        else:
+            object_list = await self.aget_object_list(queryset)
+
+        self.object_list = object_list
+        context['object_list'] = object_list
+        if self.context_object_name:
+            context[self.context_object_name] = object_list
+        return self.render_to_response(self.get_context_data(**context))
@@ -0,0 +1,115 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.db import connections
+
+from .models import User, Car
+
+"""
+Ευρετήρια προθεμάτων στη μνήμη για αυτόματη συμπλήρωση σειριακών αριθμών
+αυτοκινήτων και usernames χωρίς πρόσβαση στη βάση.
+Κάθε διεργασία κρατά μια ταξινομημένη πλειάδα που φορτώνεται την πρώτη φορά που
+χρειάζεται, ενημερώνεται από τα signals post_save/post_delete μετά το commit
+(βλ. signals.py) και ξαναφορτώνεται περιοδικά σε thread στο παρασκήνιο, ώστε να
+φαίνονται και οι αλλαγές άλλων διεργασιών (π.χ. μαζικές εισαγωγές από τον worker).
+"""
+
+# Δευτερόλεπτα μετά τα οποία το ευρετήριο ξαναφορτώνεται από τη βάση
+MAX_AGE = 300
+
+# Μέγιστο πλήθος προτάσεων ανά αίτημα
+AUTOCOMPLETE_LIMIT = 10
+
+
+class PrefixIndex:
+    """
+    Ταξινομημένη πλειάδα (κλειδί χωρίς πεζά/κεφαλαία, τιμή, id) με αναζήτηση προθέματος μέσω bisect.
+    Η πλειάδα δεν αλλάζει: κάθε ενημέρωση φτιάχνει νέα και την αντικαθιστά κάτω από το lock,
+    οπότε η αναζήτηση διαβάζει χωρίς lock ένα συνεπές στιγμιότυπο.
+    Το loader επιστρέφει ζεύγη (id, τιμή).
+    """
+
+    def __init__(self, loader, max_age=MAX_AGE):
+        self.loader = loader
+        self.max_age = max_age
+        self.entries = None
+        self.by_pk = {}
+        self.loaded_at = 0
+        self.reloading = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Φορτώνει το ευρετήριο από τη βάση. Οι ενημερώσεις στο μεταξύ περιμένουν το lock."""
+        with self.lock:
+            entries = tuple(sorted((value.casefold(), value, pk) for pk, value in self.loader()))
+            self.entries = entries
+            self.by_pk = {entry[2]: entry for entry in entries}
+            self.loaded_at = time.monotonic()
+
+    def reload_if_stale(self):
+        """Ξεκινά επαναφόρτωση σε thread στο παρασκήνιο, αν το ευρετήριο είναι παλαιότερο από max_age"""
+        with self.lock:
+            if self.reloading or time.monotonic() - self.loaded_at <= self.max_age:
+                return
+            self.reloading = True
+        threading.Thread(target=self._reload, daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.load()
+        finally:
+            self.reloading = False
+            connections.close_all()
+
+    def complete(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Επιστρέφει έως `limit` τιμές που ξεκινούν με το πρόθεμα (χωρίς διάκριση πεζών/κεφαλαίων)"""
+        if self.entries is None:
+            self.load()
+        else:
+            self.reload_if_stale()
+        prefix = prefix.casefold()
+        if not prefix:
+            return []
+
+        entries = self.entries
+        results = []
+        for index in range(bisect_left(entries, (prefix,)), len(entries)):
+            key, value, _ = entries[index]
+            if not key.startswith(prefix) or len(results) == limit:
+                break
+            results.append(value)
+        return results
+
+    def update(self, pk, value):
+        """Προσθέτει ή αλλάζει την τιμή ενός αντικειμένου (αν το ευρετήριο έχει φορτωθεί)"""
+        with self.lock:
+            entry = (value.casefold(), value, pk)
+            if self.entries is None or self.by_pk.get(pk) == entry:
+                return
+            entries = self._without(pk)
+            index = bisect_left(entries, entry)
+            self.entries = entries[:index] + (entry,) + entries[index:]
+            self.by_pk[pk] = entry
+
+    def remove(self, pk):
+        """Αφαιρεί ένα αντικείμενο από το ευρετήριο (αν έχει φορτωθεί)"""
+        with self.lock:
+            if self.entries is not None:
+                self.entries = self._without(pk)
+
+    def _without(self, pk):
+        """Η πλειάδα χωρίς το αντικείμενο `pk` (καλείται με το lock)"""
+        entries = self.entries
+        entry = self.by_pk.pop(pk, None)
+        if entry is not None:
+            index = bisect_left(entries, entry)
+            if index < len(entries) and entries[index] == entry:
+                return entries[:index] + entries[index + 1:]
+        return entries
+
+
+INDEXES = {
+    'cars': PrefixIndex(lambda: Car.objects.values_list('pk', 'serial_number').iterator()),
+    'users': PrefixIndex(lambda: User.objects.values_list('pk', 'username').iterator()),
+}
@@ -0,0 +1,175 @@
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from .forms import BatchAppointmentForm, AppointmentStatusForm
+from .models import User, Car, Appointment
+from .reports import add_many_to_summary
+from .scheduling import assign_mechanics
+from .fragments import MY_APPOINTMENTS, MY_ASSIGNED_APPOINTMENTS, invalidate
+from .slots import invalidate_days
+from .transitions import FINAL_STATUSES, MAX_TRANSITION_SIZE, SUMMARY_FIELDS, summary_changes
+
+"""
+Μαζικές λειτουργίες ραντεβού για το JSON API (AppointmentBatchView):
+ανάκτηση, δημιουργία και αλλαγή κατάστασης πολλών ραντεβού σε ένα αίτημα.
+Κάθε παρτίδα ελέγχεται ολόκληρη με τους κανόνες των φορμών (ωράριο, περιγραφή για
+επισκευές, τελικές καταστάσεις) και εφαρμόζεται ολόκληρη ή καθόλου, σε ένα transaction
+με bulk_create/bulk_update, οπότε το πλήθος των queries δεν εξαρτάται από το μέγεθός της.
+Τα bulk_* δεν στέλνουν signals: τα ημερήσια σύνολα, η cache των σελίδων και οι ελεύθερες
+θέσεις των ημερών ενημερώνονται εδώ.
+"""
+
+# Μέγιστο πλήθος εγγραφών ανά παρτίδα
+MAX_BATCH_SIZE = MAX_TRANSITION_SIZE
+
+# Πεδία ραντεβού στις αποκρίσεις του API (τα ForeignKey ως id)
+API_FIELDS = [
+    'id', 'client', 'car', 'mechanic', 'date', 'hour', 'service_type',
+    'problem_description', 'status', 'total_cost', 'labour_duration',
+]
+
+
+class BatchError(Exception):
+    """
+    Η παρτίδα απορρίφθηκε χωρίς καμία αλλαγή. Το errors είναι λίστα
+    {'index': θέση στην παρτίδα (ή None για όλη την παρτίδα), 'errors': {πεδίο: [μηνύματα]}}.
+    """
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} σφάλματα στην παρτίδα.")
+        self.errors = errors
+
+
+def batch_error(message):
+    return BatchError([{'index': None, 'errors': {'__all__': [message]}}])
+
+
+def check_batch(items):
+    """Ελέγχει ότι η παρτίδα είναι λίστα αντικειμένων JSON με έως MAX_BATCH_SIZE στοιχεία"""
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise batch_error("Αναμένεται λίστα αντικειμένων JSON.")
+    if len(items) > MAX_BATCH_SIZE:
+        raise batch_error(f"Η παρτίδα μπορεί να έχει έως {MAX_BATCH_SIZE} εγγραφές.")
+
+
+def to_id(value):
+    """Ακέραιο id από τιμή JSON (ή None αν δεν είναι έγκυρο)"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def form_errors(form):
+    return {field: [str(message) for message in messages] for field, messages in form.errors.items()}
+
+
+def appointment_json(appointment):
+    """Τα πεδία API_FIELDS του ραντεβού (για JsonResponse)"""
+    return {name: getattr(appointment, Appointment._meta.get_field(name).attname) for name in API_FIELDS}
+
+
+def fetch_appointments(ids):
+    """Επιστρέφει (ραντεβού με τη σειρά των ids, ids που δεν βρέθηκαν) με ένα query"""
+    if len(ids) > MAX_BATCH_SIZE:
+        raise batch_error(f"Η παρτίδα μπορεί να έχει έως {MAX_BATCH_SIZE} εγγραφές.")
+    found = Appointment.objects.only(*API_FIELDS).in_bulk(ids)
+    return (
+        [appointment_json(found[pk]) for pk in ids if pk in found],
+        [pk for pk in ids if pk not in found],
+    )
+
+
+def create_appointments(items):
+    """
+    Δημιουργεί τα ραντεβού της παρτίδας (πεδία της AppointmentForm: client, car, date, hour,
+    service_type, problem_description) με κατάσταση CREATED και αναθέτει μηχανικούς όπως το
+    book_appointment. Επιστρέφει τα νέα ραντεβού (API_FIELDS) με τη σειρά της παρτίδας.
+    """
+    check_batch(items)
+    clients = User.objects.filter(role='client').in_bulk({to_id(item.get('client')) for item in items} - {None})
+    cars = Car.objects.in_bulk({to_id(item.get('car')) for item in items} - {None})
+
+    appointments, errors = [], []
+    for index, item in enumerate(items):
+        form = BatchAppointmentForm(data=item)
+        form.is_valid()
+        item_errors = form_errors(form)
+        client = clients.get(to_id(item.get('client')))
+        car = cars.get(to_id(item.get('car')))
+        if client is None:
+            item_errors['client'] = ["Άγνωστος πελάτης."]
+        if car is None:
+            item_errors['car'] = ["Άγνωστο αυτοκίνητο."]
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+            continue
+
+        appointment = form.save(commit=False)
+        appointment.client = client
+        appointment.car = car
+        appointment.status = 'CREATED'
+        appointment.total_cost = Decimal('0.00')
+        appointments.append(appointment)
+    if errors:
+        raise BatchError(errors)
+
+    with transaction.atomic():
+        assign_mechanics(appointments)
+        Appointment.objects.bulk_create(appointments)
+        keys = Counter((appointment.date, appointment.mechanic_id, appointment.status) for appointment in appointments)
+        add_many_to_summary({key: (count, 0, timedelta(0)) for key, count in keys.items()})
+        invalidate(MY_APPOINTMENTS, *{appointment.client_id for appointment in appointments})
+        invalidate(MY_ASSIGNED_APPOINTMENTS, *{appointment.mechanic_id for appointment in appointments})
+        invalidate_days(*{appointment.date for appointment in appointments})
+    return [appointment_json(appointment) for appointment in appointments]
+
+
+def update_statuses(items):
+    """
+    Αλλάζει την κατάσταση των ραντεβού της παρτίδας ({'id': ..., 'status': ...}).
+    Όπως στο AppointmentStatusUpdateView, ραντεβού σε τελική κατάσταση δεν αλλάζουν.
+    Επιστρέφει τα id των ραντεβού που άλλαξαν κατάσταση.
+    """
+    check_batch(items)
+    ids = [to_id(item.get('id')) for item in items]
+    repeated = {pk for pk, count in Counter(ids).items() if count > 1}
+
+    with transaction.atomic():
+        appointments = Appointment.objects.select_for_update().only(*SUMMARY_FIELDS).in_bulk(set(ids) - {None})
+
+        errors, statuses = [], {}
+        for index, (pk, item) in enumerate(zip(ids, items)):
+            form = AppointmentStatusForm(data=item)
+            form.is_valid()
+            item_errors = form_errors(form)
+            appointment = appointments.get(pk)
+            if appointment is None:
+                item_errors['id'] = ["Άγνωστο ραντεβού."]
+            elif pk in repeated:
+                item_errors['id'] = ["Το ραντεβού εμφανίζεται περισσότερες από μία φορές."]
+            elif appointment.status in FINAL_STATUSES:
+                item_errors['status'] = ["Δεν μπορείτε να αλλάξετε ένα τελικό στάδιο."]
+            if item_errors:
+                errors.append({'index': index, 'errors': item_errors})
+            else:
+                statuses[pk] = form.cleaned_data['status']
+        if errors:
+            raise BatchError(errors)
+
+        changed = [appointments[pk] for pk, status in statuses.items() if appointments[pk].status != status]
+        changes = summary_changes((appointment, statuses[appointment.pk]) for appointment in changed)
+        for appointment in changed:
+            appointment.status = statuses[appointment.pk]
+
+        Appointment.objects.bulk_update(changed, ['status'], batch_size=500)
+        add_many_to_summary(changes)
+        invalidate(MY_APPOINTMENTS, *{appointment.client_id for appointment in changed})
+        invalidate(MY_ASSIGNED_APPOINTMENTS, *{appointment.mechanic_id for appointment in changed})
+        invalidate_days(*{appointment.date for appointment in changed})
+    return [appointment.pk for appointment in changed]
@@ -0,0 +1,1827 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time as timer
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Count, Min, Q
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .models import User, Car, Appointment, ArchivedWork, DailySummary, ImportJob, Work
+from .autocomplete import PrefixIndex
+from .pagination import KeysetPaginator
+from .reports import rebuild_summary
+from .fragments import new_generation
+from .imports import CAR_FIELDS, import_users, import_cars, read_csv
+from .search import SEARCH_LIMIT, search
+from .batch import create_appointments
+from .transitions import transition_statuses
+from .slots import SLOT_STARTS, free_slots, slots_key
+from .calendar_feed import calendar_token
+from .exports import EXPORTS
+from .archive import archive_appointments, archive_cutoff, archivable
+from .dataset import SLOTS, generate_dataset
+from .scheduling import (
+    ACTIVE_APPOINTMENT, APPOINTMENT_DURATION, active_appointments, available_mechanics, book_appointment, to_minutes,
+)
+from . import views
+from .urls import urlpatterns
+
+"""
+Σενάρια μέτρησης απόδοσης για την εφαρμογή.
+Τα σενάρια δεν αφήνουν δεδομένα στη βάση (εκτελούνται μέσα σε transaction
+που ακυρώνεται ή καθαρίζουν ό,τι δημιούργησαν) και επιστρέφουν λίστα με
+γραμμές αποτελεσμάτων (dict) που εμφανίζει η εντολή `manage.py benchmark`.
+"""
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Decorator που καταχωρεί ένα σενάριο με το όνομά του"""
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def rolled_back():
+    """Εκτελεί το μπλοκ μέσα σε transaction που ακυρώνεται πάντα στο τέλος"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(func, *args, **kwargs):
+    """Εκτελεί τη συνάρτηση και επιστρέφει (αποτέλεσμα, πλήθος queries, χρόνο σε ms)"""
+    # Το log του Django κρατά έως 9000 queries: αν είναι γεμάτο, τα νέα queries δεν μετρώνται
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        started = timer.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = (timer.perf_counter() - started) * 1000
+    return result, len(ctx.captured_queries), elapsed
+
+
+def create_users(count, role, prefix):
+    """Μαζική δημιουργία ενεργών χρηστών συγκεκριμένου ρόλου"""
+    return User.objects.bulk_create([
+        User(username=f'{prefix}_{i}', role=role, is_active=True, password='!')
+        for i in range(count)
+    ])
+
+
+def create_cars(owners, prefix):
+    """Μαζική δημιουργία ενός αυτοκινήτου για κάθε ιδιοκτήτη"""
+    return Car.objects.bulk_create([
+        Car(
+            owner=owner,
+            serial_number=f'{prefix}-{i}',
+            model='Corolla',
+            make='Toyota',
+            type='sedan',
+            fuel_type='petrol',
+            doors=4,
+            wheels=4,
+            production_date=date(2020, 1, 1),
+            acquisition_year=2020,
+        )
+        for i, owner in enumerate(owners)
+    ])
+
+
+def count_double_bookings(appointments):
+    """
+    Μετρά τα ζεύγη ραντεβού του ίδιου μηχανικού που επικαλύπτονται.
+    Αφού όλα τα ραντεβού έχουν ίδια διάρκεια, αρκεί ο έλεγχος διαδοχικών ωρών έναρξης.
+    """
+    starts = defaultdict(list)
+    for appointment in appointments:
+        if appointment.mechanic_id is not None:
+            starts[(appointment.mechanic_id, appointment.date)].append(to_minutes(appointment.hour))
+
+    overlaps = 0
+    for values in starts.values():
+        values.sort()
+        overlaps += sum(1 for prev, cur in zip(values, values[1:]) if cur - prev < APPOINTMENT_DURATION)
+    return overlaps
+
+
+@scenario('availability')
+def bench_availability(sizes):
+    """
+    Μετρά queries και χρόνο του Appointment.get_available_mechanics καθώς
+    αυξάνεται το πλήθος των μηχανικών. Ο αριθμός queries πρέπει να μένει σταθερός.
+    """
+    results = []
+    target_date = date.today() + timedelta(days=7)
+    for size in sizes:
+        with rolled_back():
+            mechanics = create_users(size, 'mechanic', f'bench_mech_{size}')
+            client = create_users(1, 'client', f'bench_client_{size}')[0]
+            car = create_cars([client], f'BENCH-{size}')[0]
+            # Οι μισοί μηχανικοί είναι απασχολημένοι στις 10:00
+            Appointment.objects.bulk_create([
+                Appointment(
+                    client=client, car=car, mechanic=mech,
+                    date=target_date, hour=time(10, 0),
+                    service_type='service', status='CREATED',
+                )
+                for mech in mechanics[::2]
+            ])
+            free, queries, elapsed = measure(
+                Appointment.get_available_mechanics, target_date, time(11, 0)
+            )
+            results.append({
+                'mechanics': size,
+                'free': len(free),
+                'queries': queries,
+                'ms': round(elapsed, 2),
+            })
+    return results
+
+
+@scenario('booking')
+def bench_booking(sizes):
+    """
+    Στέλνει ταυτόχρονα (από threads) `size` κρατήσεις για την ίδια ημερομηνία και ώρα
+    και ελέγχει ότι κανένας μηχανικός δεν έχει επικαλυπτόμενα ραντεβού.
+    Τα threads χρησιμοποιούν δικές τους συνδέσεις, οπότε τα δεδομένα γράφονται κανονικά
+    στη βάση (απαιτείται βάση σε αρχείο) και διαγράφονται στο τέλος.
+    """
+    results = []
+    target_date = date.today() + timedelta(days=3650)
+    for size in sizes:
+        prefix = f'bench_booking_{size}'
+        create_users(5, 'mechanic', f'{prefix}_mech')
+        clients = create_users(size, 'client', f'{prefix}_client')
+        cars = create_cars(clients, prefix)
+        barrier = threading.Barrier(size)
+
+        def book(car):
+            try:
+                barrier.wait()
+                book_appointment(Appointment(
+                    client_id=car.owner_id, car=car,
+                    date=target_date, hour=time(10, 0),
+                    service_type='service', status='CREATED',
+                ))
+            except DatabaseError as exc:
+                return exc
+            finally:
+                connections.close_all()
+
+        try:
+            started = timer.perf_counter()
+            with ThreadPoolExecutor(max_workers=size) as pool:
+                outcomes = list(pool.map(book, cars))
+            elapsed = (timer.perf_counter() - started) * 1000
+
+            booked = list(Appointment.objects.filter(date=target_date))
+            results.append({
+                'bookings': size,
+                'mechanics': User.objects.filter(role='mechanic', is_active=True).count(),
+                'assigned': sum(1 for a in booked if a.mechanic_id is not None),
+                'errors': sum(1 for outcome in outcomes if outcome is not None),
+                'double_bookings': count_double_bookings(booked),
+                'ms': round(elapsed, 2),
+                'ok': count_double_bookings(booked) == 0,
+            })
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+    return results
+
+
+def view_queryset(view_class, user):
+    """Επιστρέφει το queryset που θα χρησιμοποιούσε η view για τον συγκεκριμένο χρήστη"""
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request)
+    return view.get_queryset()
+
+
+def is_table_scan(plan):
+    """
+    Ελέγχει αν το EXPLAIN QUERY PLAN του SQLite περιέχει πλήρη σάρωση πίνακα
+    (γραμμή SCAN χωρίς χρήση ευρετηρίου).
+    """
+    return any(
+        ' SCAN ' in f' {line} ' and 'USING' not in line
+        for line in plan.splitlines()
+    )
+
+
+@scenario('query_plans')
+def bench_query_plans(sizes):
+    """
+    Ελέγχει με EXPLAIN QUERY PLAN (SQLite) ότι τα queries των βασικών views
+    και της διαθεσιμότητας μηχανικών χρησιμοποιούν ευρετήριο αντί για σάρωση πίνακα.
+    Το μέγεθος δεδομένων δεν επηρεάζει το σενάριο.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+
+    with rolled_back():
+        client = create_users(1, 'client', 'bench_plan_client')[0]
+        mechanic = create_users(1, 'mechanic', 'bench_plan_mech')[0]
+        querysets = {
+            'MyCarsView': view_queryset(views.MyCarsView, client),
+            'ClientCarListView': view_queryset(views.ClientCarListView, client),
+            'MyAppointmentsView': view_queryset(views.MyAppointmentsView, client),
+            'ClientAppointmentListView': view_queryset(views.ClientAppointmentListView, client),
+            'MyAssignedAppointmentsView': view_queryset(views.MyAssignedAppointmentsView, mechanic),
+            'MechanicAppointmentListView': view_queryset(views.MechanicAppointmentListView, mechanic),
+            'get_available_mechanics': active_appointments(date.today()).order_by('hour'),
+        }
+
+        results = []
+        for name, queryset in querysets.items():
+            plan = queryset.explain()
+            results.append({
+                'query': name,
+                'ok': not is_table_scan(plan),
+                'plan': ' | '.join(line.split(' ', 3)[-1] for line in plan.splitlines()),
+            })
+    return results
+
+
+def legacy_import_users(rows):
+    """Η αρχική εισαγωγή χρηστών: ένα exists() και ένα create_user ανά γραμμή"""
+    count = 0
+    for row in rows:
+        if not User.objects.filter(username=row['username']).exists():
+            User.objects.create_user(
+                username=row['username'],
+                password=row['password'],
+                role=row.get('role', 'client'),
+                is_active=True,
+            )
+            count += 1
+    return count
+
+
+@scenario('user_import')
+def bench_user_import(sizes):
+    """
+    Συγκρίνει τη ρυθμαπόδοση (γραμμές/δευτερόλεπτο) της αρχικής εισαγωγής χρηστών
+    ανά γραμμή με τη μαζική εισαγωγή (παράλληλος κατακερματισμός + bulk_create).
+    """
+    results = []
+    for size in sizes:
+        rows = [
+            {'username': f'bench_import_{size}_{i}', 'password': f'secret-{i}', 'role': 'client'}
+            for i in range(size)
+        ]
+        with rolled_back():
+            _, _, legacy_ms = measure(legacy_import_users, rows)
+        with rolled_back():
+            report, queries, bulk_ms = measure(import_users, rows)
+        results.append({
+            'rows': size,
+            'legacy_rows_per_s': round(size / legacy_ms * 1000, 1),
+            'bulk_rows_per_s': round(size / bulk_ms * 1000, 1),
+            'bulk_queries': queries,
+            'speedup': round(legacy_ms / bulk_ms, 1),
+            'ok': report.created == size,
+        })
+    return results
+
+
+def legacy_import_cars(rows):
+    """Η αρχική εισαγωγή αυτοκινήτων: δύο queries και ένα INSERT ανά γραμμή"""
+    count = 0
+    for row in rows:
+        try:
+            owner = User.objects.get(username=row['owner_username'], role='client')
+            if not Car.objects.filter(serial_number=row['serial_number']).exists():
+                Car.objects.create(owner=owner, **{name: row[name] for name in CAR_FIELDS})
+                count += 1
+        except Exception:
+            continue
+    return count
+
+
+def car_rows(owners, count, prefix):
+    """Συνθετικές γραμμές CSV αυτοκινήτων μοιρασμένες στους ιδιοκτήτες"""
+    for i in range(count):
+        yield {
+            'owner_username': owners[i % len(owners)].username,
+            'serial_number': f'{prefix}-{i}',
+            'model': 'Golf',
+            'make': 'Volkswagen',
+            'type': 'hatchback',
+            'fuel_type': 'diesel',
+            'doors': '5',
+            'wheels': '4',
+            'production_date': '2019-05-01',
+            'acquisition_year': '2020',
+        }
+
+
+@scenario('car_import')
+def bench_car_import(sizes):
+    """
+    Συγκρίνει τη ρυθμαπόδοση της αρχικής εισαγωγής αυτοκινήτων ανά γραμμή
+    με τη μαζική εισαγωγή (cache ιδιοκτητών + bulk_create σε παρτίδες).
+    """
+    results = []
+    for size in sizes:
+        with rolled_back():
+            owners = create_users(max(1, size // 10), 'client', f'bench_car_owner_{size}')
+            rows = list(car_rows(owners, size, f'BENCH-IMPORT-{size}'))
+            _, _, legacy_ms = measure(legacy_import_cars, rows)
+        with rolled_back():
+            owners = create_users(max(1, size // 10), 'client', f'bench_car_owner_{size}')
+            rows = list(car_rows(owners, size, f'BENCH-IMPORT-{size}'))
+            report, queries, bulk_ms = measure(import_cars, rows)
+        results.append({
+            'rows': size,
+            'legacy_rows_per_s': round(size / legacy_ms * 1000, 1),
+            'bulk_rows_per_s': round(size / bulk_ms * 1000, 1),
+            'bulk_queries': queries,
+            'speedup': round(legacy_ms / bulk_ms, 1),
+            'ok': report.created == size,
+        })
+    return results
+
+
+# Ανώτατο όριο μνήμης (bytes) για την ανάγνωση CSV σε τμήματα, ανεξάρτητα από το μέγεθος αρχείου
+STREAMING_PEAK_LIMIT = 1024 * 1024
+
+
+def peak_memory(func, *args):
+    """Επιστρέφει τη μέγιστη μνήμη (bytes) που δεσμεύτηκε κατά την εκτέλεση της συνάρτησης"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def legacy_read_csv(uploaded_file):
+    """Η αρχική ανάγνωση: ολόκληρο το αρχείο σε bytes, string και λίστα γραμμών"""
+    uploaded_file.seek(0)
+    for _ in csv.DictReader(uploaded_file.read().decode('utf-8').splitlines()):
+        pass
+
+
+def streaming_read_csv(uploaded_file):
+    for _ in read_csv(uploaded_file):
+        pass
+
+
+@scenario('csv_memory')
+def bench_csv_memory(sizes):
+    """
+    Μετρά με tracemalloc τη μέγιστη μνήμη για την ανάγνωση συνθετικού CSV αυτοκινήτων
+    `size` γραμμών, με την αρχική ανάγνωση και με την ανάγνωση σε τμήματα.
+    Η δεύτερη πρέπει να μένει σταθερή ανεξάρτητα από το μέγεθος του αρχείου.
+    """
+    results = []
+    owners = [User(username='bench_owner')]
+    for size in sizes:
+        with TemporaryUploadedFile('cars.csv', 'text/csv', 0, 'utf-8') as uploaded_file:
+            text_file = open(uploaded_file.temporary_file_path(), 'w', encoding='utf-8', newline='')
+            with text_file:
+                writer = csv.DictWriter(text_file, fieldnames=['owner_username', *CAR_FIELDS])
+                writer.writeheader()
+                writer.writerows(car_rows(owners, size, 'BENCH-CSV'))
+            uploaded_file.size = os.path.getsize(uploaded_file.temporary_file_path())
+
+            legacy_peak = peak_memory(legacy_read_csv, uploaded_file)
+            streaming_peak = peak_memory(streaming_read_csv, uploaded_file)
+        results.append({
+            'rows': size,
+            'file_kb': uploaded_file.size // 1024,
+            'legacy_peak_kb': legacy_peak // 1024,
+            'streaming_peak_kb': streaming_peak // 1024,
+            'ok': streaming_peak < STREAMING_PEAK_LIMIT,
+        })
+    return results
+
+
+MAKES = ['Toyota', 'Volkswagen', 'Ford', 'Fiat', 'Peugeot', 'Opel', 'Hyundai', 'Skoda']
+
+
+@scenario('search')
+def bench_search(sizes):
+    """
+    Συγκρίνει τον χρόνο αναζήτησης αυτοκινήτων με LIKE '%q%' (αρχική CarSearchView)
+    και με τον πίνακα FTS5, για έναν σπάνιο όρο (σειριακός) και έναν συχνό (μάρκα).
+    Και οι δύο αναζητήσεις επιστρέφουν έως SEARCH_LIMIT αποτελέσματα.
+    """
+    results = []
+    for size in sizes:
+        with rolled_back():
+            owner = create_users(1, 'client', f'bench_search_owner_{size}')[0]
+            for start in range(0, size, 5000):
+                Car.objects.bulk_create([
+                    Car(
+                        owner=owner, serial_number=f'BENCH-SEARCH-{i:07d}',
+                        model='Model', make=MAKES[i % len(MAKES)], type='sedan', fuel_type='petrol',
+                        doors=4, wheels=4, production_date=date(2020, 1, 1), acquisition_year=2020,
+                    )
+                    for i in range(start, min(start + 5000, size))
+                ])
+
+            for term in [f'{size // 2:07d}', 'peugeot']:
+                like = Car.objects.filter(
+                    Q(serial_number__icontains=term) | Q(make__icontains=term) | Q(model__icontains=term)
+                )
+                like_hits, _, like_ms = measure(lambda: list(like[:SEARCH_LIMIT]))
+                fts_hits, _, fts_ms = measure(search, Car, term)
+                results.append({
+                    'rows': size,
+                    'term': term,
+                    'like_ms': round(like_ms, 2),
+                    'fts_ms': round(fts_ms, 2),
+                    'speedup': round(like_ms / fts_ms, 1),
+                    'ok': len(like_hits) == len(fts_hits),
+                })
+    return results
+
+
+@scenario('autocomplete')
+def bench_autocomplete(sizes):
+    """
+    Μετρά τον μέσο χρόνο αυτόματης συμπλήρωσης από το ευρετήριο προθεμάτων
+    με `size` σειριακούς αριθμούς. Η αναζήτηση δεν πρέπει να εκτελεί queries
+    και να απαντά σε λιγότερο από ένα millisecond.
+    """
+    results = []
+    lookups = 1000
+    for size in sizes:
+        index = PrefixIndex(lambda: ((i, f'WVW{i:08d}') for i in range(size)))
+        index.load()
+        prefixes = [f'wvw{i:08d}'[:8] for i in range(0, size, max(1, size // lookups))][:lookups]
+        _, queries, elapsed = measure(lambda: [index.complete(prefix) for prefix in prefixes])
+        per_lookup_ms = elapsed / len(prefixes)
+        results.append({
+            'keys': size,
+            'lookups': len(prefixes),
+            'queries': queries,
+            'us_per_lookup': round(per_lookup_ms * 1000, 1),
+            'ok': queries == 0 and per_lookup_ms < 1,
+        })
+    return results
+
+
+@scenario('pagination')
+def bench_pagination(sizes):
+    """
+    Συγκρίνει τον χρόνο μιας σελίδας 10 ραντεβού (πλήρης λίστα γραμματέα) με OFFSET
+    (Paginator του Django, με COUNT(*)) και με κέρσορα, στην αρχή, στη μέση και στο τέλος.
+    Με κέρσορα ο χρόνος πρέπει να μένει σταθερός ανεξάρτητα από το βάθος.
+    """
+    results = []
+    ordering = ('-date', '-hour', '-id')
+    for size in sizes:
+        with rolled_back():
+            client = create_users(1, 'client', f'bench_page_client_{size}')[0]
+            car = create_cars([client], f'BENCH-PAGE-{size}')[0]
+            start = date(2000, 1, 1)
+            for offset in range(0, size, 5000):
+                Appointment.objects.bulk_create([
+                    Appointment(
+                        client=client, car=car, date=start + timedelta(days=i // 4),
+                        hour=time(8 + 2 * (i % 4), 0), service_type='service', status='COMPLETED',
+                    )
+                    for i in range(offset, min(offset + 5000, size))
+                ])
+
+            queryset = Appointment.objects.all()
+            keyset = KeysetPaginator(queryset, 10, ordering)
+            offset_paginator = Paginator(queryset.order_by(*ordering), 10)
+            for depth in sorted({0, size // 2, max(size - 10, 0)}):
+                number = depth // 10 + 1
+                _, _, offset_ms = measure(lambda: list(offset_paginator.page(number).object_list))
+                offset_paginator = Paginator(queryset.order_by(*ordering), 10)  # Χωρίς cache του COUNT
+
+                cursor = None
+                if depth:
+                    cursor = keyset.encode(queryset.order_by(*ordering)[depth - 1], 'next')
+                page, queries, keyset_ms = measure(keyset.page, cursor)
+                results.append({
+                    'rows': size,
+                    'depth': depth,
+                    'offset_ms': round(offset_ms, 2),
+                    'keyset_ms': round(keyset_ms, 2),
+                    'keyset_queries': queries,
+                    'ok': queries == 1 and len(page) == min(10, size - depth),
+                })
+    return results
+
+
+# Ρόλος χρήστη, παράμετροι URL και query string για κάθε URL της εφαρμογής (με GET,
+# εκτός από όσα είναι στο QUERY_COUNT_POST). Ο ρόλος None σημαίνει ανώνυμο χρήστη. Τα 'appointment', 'import_job'
+# και 'mechanic' αντικαθίστανται με το id και το 'calendar_token' με το token της ροής του μηχανικού.
+QUERY_COUNT_URLS = {
+    'index': (None, {}, ''),
+    'login': (None, {}, ''),
+    'logout': (None, {}, ''),
+    'register': (None, {}, ''),
+    'car_create': ('client', {}, ''),
+    'appointment_create': ('client', {}, ''),
+    'my_appointments': ('client', {}, ''),
+    'my_cars': ('client', {}, ''),
+    'my_assigned_appointments': ('mechanic', {}, ''),
+    'secretary_appointment_create': ('secretary', {}, ''),
+    'appointment_update_status': ('secretary', {'pk': 'appointment'}, ''),
+    'appointment_bulk_status': ('secretary', {}, ''),
+    'all_users': ('secretary', {}, ''),
+    'all_appointments': ('secretary', {}, ''),
+    'all_cars': ('secretary', {}, ''),
+    'user_upload': ('secretary', {}, ''),
+    'car_upload': ('secretary', {}, ''),
+    'import_job': ('secretary', {'pk': 'import_job'}, ''),
+    'import_job_progress': ('secretary', {'pk': 'import_job'}, ''),
+    'user_search': ('secretary', {}, 'q=bench'),
+    'car_search': ('secretary', {}, 'q=bench'),
+    'appointment_search': ('secretary', {}, 'q=bench'),
+    'autocomplete': ('secretary', {'kind': 'cars'}, 'q=bench'),
+    'report': ('secretary', {}, 'start=2000-01-01&end=2030-12-31'),
+    'api_appointments': ('secretary', {}, 'ids=1,2,3'),
+    'appointment_slots': ('client', {}, 'start=2000-01-01&end=2000-01-31'),
+    'mechanic_calendar': (None, {'pk': 'mechanic', 'token': 'calendar_token'}, ''),
+    'export': ('secretary', {'kind': 'appointments'}, 'start=2000-01-01&end=2000-12-31&status=CREATED'),
+}
+QUERY_COUNT_POST = {'logout'}
+
+# Κλειδωμένο πλήθος queries ανά URL (μετά την πρώτη, «ζεστή» κλήση).
+# Αν αλλάξει σκόπιμα μια view, ενημερώνεται και η τιμή εδώ.
+EXPECTED_QUERIES = {
+    'index': 0,
+    'login': 0,
+    'logout': 0,
+    'register': 0,
+    'car_create': 2,
+    'appointment_create': 4,
+    'my_appointments': 2,  # Από την cache (μόνο session και χρήστης)
+    'my_cars': 2,  # Από την cache (μόνο session και χρήστης)
+    'my_assigned_appointments': 2,  # Από την cache (μόνο session και χρήστης)
+    'secretary_appointment_create': 4,
+    'appointment_update_status': 3,
+    'appointment_bulk_status': 3,
+    'all_users': 3,
+    'all_appointments': 3,
+    'all_cars': 3,
+    'user_upload': 2,
+    'car_upload': 2,
+    'import_job': 3,
+    'import_job_progress': 3,
+    'user_search': 4,
+    'car_search': 4,
+    'appointment_search': 3,
+    'autocomplete': 2,
+    'report': 4,
+    'api_appointments': 3,
+    'appointment_slots': 3,  # Οι ημέρες από την cache (μόνο session, χρήστης και μηχανικοί)
+    'mechanic_calendar': 3,  # Μηχανικός, ETag και η ροή (χωρίς session)
+    'export': 3,
+}
+
+
+def read_response(request, url):
+    """Αίτημα του test client που διαβάζει και τις ροές (StreamingHttpResponse), ώστε να μετρηθούν τα queries τους"""
+    response = request(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def query_count_setup():
+    """
+    Χρήστες ανά ρόλο με συνδεδεμένους test clients (None: ανώνυμος), ένα αυτοκίνητο του πελάτη
+    και τα αντικείμενα που αντικαθίστανται στις παραμέτρους του QUERY_COUNT_URLS.
+    """
+    users = {
+        'client': create_users(1, 'client', 'bench_nq_client')[0],
+        'mechanic': create_users(1, 'mechanic', 'bench_nq_mechanic')[0],
+        'secretary': create_users(1, 'secretary', 'bench_nq_secretary')[0],
+    }
+    clients = {role: Client() for role in users}
+    for role, user in users.items():
+        clients[role].force_login(user)
+    clients[None] = Client()
+    own_car = create_cars([users['client']], 'BENCH-NQ-OWN')[0]
+    objects = {
+        'import_job': ImportJob.objects.create(kind='cars', created_by=users['secretary']).pk,
+        'mechanic': users['mechanic'].pk,
+        'calendar_token': calendar_token(users['mechanic']),
+    }
+    return users, clients, own_car, objects
+
+
+def query_count_data(users, own_car, objects, created, size):
+    """
+    Συμπληρώνει πελάτες, αυτοκίνητα και ραντεβού (τα μισά του πελάτη του query_count_setup)
+    από `created` μέχρι `size` και ορίζει το ραντεβού των URLs στο objects.
+    """
+    owners = create_users(size - created, 'client', f'bench_nq_owner_{size}')
+    cars = create_cars(owners, f'BENCH-NQ-{size}')
+    start = date(2000, 1, 1) + timedelta(days=created)
+    appointments = Appointment.objects.bulk_create([
+        Appointment(
+            client=users['client'] if i % 2 else owner, car=own_car if i % 2 else car,
+            mechanic=users['mechanic'], date=start + timedelta(days=i),
+            hour=time(8, 0), service_type='service', status='CREATED',
+        )
+        for i, (owner, car) in enumerate(zip(owners, cars))
+    ])
+    rebuild_summary(start, start + timedelta(days=len(appointments)))  # Το bulk_create δεν στέλνει signals
+    objects['appointment'] = appointments[0].pk
+
+
+def query_count_request(clients, objects, name):
+    """Επιστρέφει (κλήση του test client, URL) για ένα όνομα του QUERY_COUNT_URLS"""
+    role, kwargs, query = QUERY_COUNT_URLS[name]
+    kwargs = {key: objects.get(value, value) for key, value in kwargs.items()}
+    url = reverse(name, kwargs=kwargs) + (f'?{query}' if query else '')
+    return (clients[role].post if name in QUERY_COUNT_POST else clients[role].get), url
+
+
+@scenario('query_counts')
+def bench_query_counts(sizes):
+    """
+    Πλήθος queries κάθε URL της εφαρμογής με τον κατάλληλο ρόλο για αυξανόμενο πλήθος
+    πελατών/αυτοκινήτων/ραντεβού, σε σύγκριση με το EXPECTED_QUERIES.
+    URLs χωρίς καταχώριση στο QUERY_COUNT_URLS αποτυγχάνουν, ώστε να καλύπτονται και οι νέες views.
+    Ο ίδιος έλεγχος τρέχει ως test (βλ. tests.py, `manage.py test automotiveworkshop`).
+    """
+    counts = defaultdict(dict)
+    statuses = {}
+    with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+        users, clients, own_car, objects = query_count_setup()
+
+        created = 0
+        for size in sizes:
+            # Συμπλήρωση δεδομένων μέχρι το επόμενο μέγεθος
+            query_count_data(users, own_car, objects, created, size)
+            created = size
+
+            for pattern in urlpatterns:
+                if pattern.name not in QUERY_COUNT_URLS:
+                    statuses[pattern.name] = 'no entry'
+                    continue
+                request, url = query_count_request(clients, objects, pattern.name)
+                request(url)  # Ζέσταμα (ευρετήρια στη μνήμη, cache περιεχομένου)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = read_response(request, url)
+                counts[pattern.name][size] = len(ctx.captured_queries)
+                statuses[pattern.name] = response.status_code
+
+    results = []
+    for name, status in statuses.items():
+        queries = counts.get(name, {})
+        row = {'url': name, 'status': status}
+        row.update({f'queries@{size}': queries.get(size, '-') for size in sizes})
+        row['expected'] = EXPECTED_QUERIES.get(name, '-')
+        row['ok'] = (
+            status in (200, 302, 405)
+            and len(set(queries.values())) == 1
+            and EXPECTED_QUERIES.get(name) in queries.values()
+        )
+        results.append(row)
+    return results
+
+
+def percentile(values, percent):
+    """Εκατοστημόριο με τη μέθοδο του πλησιέστερου βαθμού (nearest rank)"""
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+def timing_row(target, status, timings, queries, ok):
+    return {
+        'target': target,
+        'status': status,
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 50), 2) if timings else '-',
+        'p95_ms': round(percentile(timings, 95), 2) if timings else '-',
+        'max_queries': max(queries) if queries else '-',
+        'ok': ok,
+    }
+
+
+@scenario('views')
+def bench_views(sizes):
+    """
+    Χρόνος απόκρισης (p50/p95) και πλήθος queries για κάθε URL της εφαρμογής και για το
+    get_available_mechanic, πάνω στα δεδομένα που υπάρχουν ήδη στη βάση
+    (π.χ. από `manage.py generate_dataset`). Εδώ κάθε μέγεθος είναι το πλήθος
+    αιτημάτων ανά URL, μετά από ένα αίτημα ζεστάματος.
+    Για σύγκριση μετρήσεων στον χρόνο: `manage.py benchmark views --json results.json`.
+    """
+    results = []
+    with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+        # Ένας υπάρχων χρήστης ανά ρόλο (ή νέος, αν η βάση είναι άδεια)
+        users = {
+            role: User.objects.filter(role=role, is_active=True).order_by('pk').first()
+            or create_users(1, role, f'bench_views_{role}')[0]
+            for role in ['client', 'mechanic', 'secretary']
+        }
+        clients = {role: Client() for role in users}
+        for role, user in users.items():
+            clients[role].force_login(user)
+        clients[None] = Client()
+
+        appointment = Appointment.objects.order_by('-pk').first()
+        if appointment is None:
+            car = create_cars([users['client']], 'BENCH-VIEWS')[0]
+            appointment = Appointment.objects.create(
+                client=users['client'], car=car, date=date.today(), hour=time(8, 0), service_type='service',
+            )
+        objects = {
+            'appointment': appointment.pk,
+            'import_job': ImportJob.objects.create(kind='cars', created_by=users['secretary']).pk,
+            'mechanic': users['mechanic'].pk,
+            'calendar_token': calendar_token(users['mechanic']),
+        }
+
+        for size in sizes:
+            for pattern in urlpatterns:
+                if pattern.name not in QUERY_COUNT_URLS:
+                    results.append(timing_row(pattern.name, 'no entry', [], [], ok=False))
+                    continue
+                role, kwargs, query = QUERY_COUNT_URLS[pattern.name]
+                kwargs = {key: objects.get(value, value) for key, value in kwargs.items()}
+                url = reverse(pattern.name, kwargs=kwargs) + (f'?{query}' if query else '')
+                request = clients[role].post if pattern.name in QUERY_COUNT_POST else clients[role].get
+                request(url)
+
+                timings, queries, statuses = [], [], set()
+                for _ in range(size):
+                    response, count, elapsed = measure(read_response, request, url)
+                    timings.append(elapsed)
+                    queries.append(count)
+                    statuses.add(response.status_code)
+                status = ','.join(map(str, sorted(statuses)))
+                results.append(timing_row(pattern.name, status, timings, queries, ok=statuses <= {200, 302}))
+
+            # Διαθεσιμότητα για τυχαίες ημέρες/ώρες στο εύρος των υπαρχόντων ραντεβού
+            first_day = Appointment.objects.order_by('date').values_list('date', flat=True).first()
+            days = max((date.today() - first_day).days, 1)
+            rng = random.Random(size)
+            timings, queries = [], []
+            for _ in range(size):
+                slot = (first_day + timedelta(days=rng.randrange(days)), time(rng.choice([8, 10, 12, 14]), 0))
+                _, count, elapsed = measure(Appointment.get_available_mechanic, *slot)
+                timings.append(elapsed)
+                queries.append(count)
+            results.append(timing_row('get_available_mechanic', '-', timings, queries, ok=True))
+    return results
+
+
+def render_view(view_class, user, path='/'):
+    """Εκτελεί την view (με απόδοση του template) για τον χρήστη, χωρίς session και middleware"""
+    request = RequestFactory().get(path)
+    request.user = user
+    request.auser = sync_to_async(lambda: user)
+    view = view_class.as_view()
+    response = async_to_sync(view)(request) if view_class.view_is_async else view(request)
+    response.render()
+    return response
+
+
+@scenario('fragments')
+def bench_fragments(sizes):
+    """
+    Χρόνος και queries των σελίδων «τα αυτοκίνητά μου», «τα ραντεβού μου» και «ανατεθειμένα
+    ραντεβού» χωρίς cache (miss) και από την cache (hit), για χρήστη με `size` ραντεβού.
+    Ελέγχει ότι η επιτυχία cache δεν εκτελεί queries και ότι μια αλλαγή (αυτοκίνητο, ραντεβού,
+    εργασία) ακυρώνει το τμήμα, ώστε η επόμενη απόδοση να δείχνει τη νέα τιμή.
+    """
+    results = []
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            client = create_users(1, 'client', f'bench_frag_client_{size}')[0]
+            mechanic = create_users(1, 'mechanic', f'bench_frag_mechanic_{size}')[0]
+            cars = create_cars([client] * min(size, 50), f'BENCH-FRAG-{size}')
+            appointments = Appointment.objects.bulk_create([
+                Appointment(
+                    client=client, car=cars[i % len(cars)], mechanic=mechanic, date=date(2000, 1, 1) + timedelta(days=i),
+                    hour=time(8, 0), service_type='service', status='COMPLETED',
+                )
+                for i in range(size)
+            ])
+            pages = [
+                (views.MyCarsView, client, 'my_cars'),
+                (views.MyAppointmentsView, client, 'my_appointments'),
+                (views.MyAssignedAppointmentsView, mechanic, 'my_assigned_appointments'),
+            ]
+
+            # Αλλαγές που πρέπει να εμφανιστούν αμέσως (μετά τη διαγραφή του τμήματος)
+            car = Car.objects.get(pk=cars[0].pk)
+            appointment = Appointment.objects.get(pk=appointments[0].pk)
+            changes = {
+                'my_cars': (lambda: setattr(car, 'model', 'Changed') or car.save(), 'Changed'),
+                'my_appointments': (lambda: Work.objects.create(
+                    appointment=appointment, description='-', materials='-',
+                    completion_time=timedelta(hours=1), cost=Decimal('123.45'),
+                ), '123,45'),
+                'my_assigned_appointments': (lambda: setattr(appointment, 'status', 'CANCELLED') or appointment.save(),
+                                             'Ακυρώθηκε'),
+            }
+
+            for view_class, user, name in pages:
+                new_generation(name, user.pk)
+                _, miss_queries, miss_ms = measure(render_view, view_class, user)
+                response, hit_queries, hit_ms = measure(render_view, view_class, user)
+
+                change, expected = changes[name]
+                # Η διαγραφή γίνεται στο commit, που εδώ δεν έρχεται ποτέ: εκτελείται στο τέλος της αλλαγής
+                with TestCase.captureOnCommitCallbacks(execute=True):
+                    change()
+                fresh = expected in render_view(view_class, user).content.decode()
+                results.append({
+                    'rows': size,
+                    'page': name,
+                    'miss_ms': round(miss_ms, 2),
+                    'miss_queries': miss_queries,
+                    'hit_ms': round(hit_ms, 2),
+                    'hit_queries': hit_queries,
+                    'invalidated': fresh,
+                    'ok': hit_queries == 0 and fresh,
+                })
+                new_generation(name, user.pk)
+    return results
+
+
+# Διάρκεια (δευτερόλεπτα) κάθε μέτρησης ταυτόχρονων αναγνώσεων/εγγραφών
+CONTENTION_SECONDS = 2
+
+# Εγγραφές στον πίνακα του σεναρίου contention
+CONTENTION_ROWS = 20000
+
+
+def contention_database(directory, name):
+    """Δημιουργεί βάση SQLite (journal_mode=DELETE) με πίνακα ραντεβού για το σενάριο contention"""
+    path = os.path.join(directory, f'{name}.sqlite3')
+    db = sqlite3.connect(path)
+    db.execute(
+        'CREATE TABLE bench_appointment (id INTEGER PRIMARY KEY, date TEXT, hour INTEGER, '
+        'mechanic_id INTEGER, status TEXT, total_cost REAL)'
+    )
+    db.execute('CREATE INDEX bench_appointment_date ON bench_appointment (date, hour)')
+    rng = random.Random(0)
+    db.executemany(
+        'INSERT INTO bench_appointment (date, hour, mechanic_id, status, total_cost) VALUES (?, ?, ?, ?, ?)',
+        [
+            ((date(2020, 1, 1) + timedelta(days=i // 40)).isoformat(), rng.choice([8, 10, 12, 14]),
+             rng.randrange(50), 'COMPLETED', rng.randrange(20, 400))
+            for i in range(CONTENTION_ROWS)
+        ],
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+def contention_run(alias, threads, writers):
+    """
+    Εκτελεί για CONTENTION_SECONDS αναγνώσεις (σελίδα λίστας ραντεβού) και εγγραφές (κράτηση
+    μέσα σε transaction) από `threads` threads, από τα οποία τα `writers` γράφουν.
+    Κάθε λειτουργία είναι ένα «αίτημα»: πριν και μετά καλείται το close_if_unusable_or_obsolete,
+    όπως στα signals request_started/request_finished, ώστε να ισχύουν CONN_MAX_AGE και health checks.
+    Επιστρέφει (αναγνώσεις, χρόνους εγγραφών σε ms, σφάλματα).
+    """
+    barrier = threading.Barrier(threads)
+    days = CONTENTION_ROWS // 40
+
+    def request(operation):
+        conn = connections[alias]
+        conn.close_if_unusable_or_obsolete()
+        try:
+            operation(conn)
+        finally:
+            conn.close_if_unusable_or_obsolete()
+
+    def read(conn):
+        day = date(2020, 1, 1) + timedelta(days=random.randrange(days))
+        with conn.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, date, hour, status, total_cost FROM bench_appointment '
+                'WHERE date >= %s ORDER BY date, hour, id LIMIT 20',
+                [day.isoformat()],
+            )
+            cursor.fetchall()
+
+    def write(conn):
+        day = (date(2020, 1, 1) + timedelta(days=random.randrange(days))).isoformat()
+        hour = random.choice([8, 10, 12, 14])
+        with transaction.atomic(using=alias), conn.cursor() as cursor:
+            cursor.execute(
+                'SELECT mechanic_id FROM bench_appointment WHERE date = %s AND hour = %s', [day, hour],
+            )
+            busy = {row[0] for row in cursor.fetchall()}
+            mechanic = next((m for m in range(50) if m not in busy), None)
+            cursor.execute(
+                'INSERT INTO bench_appointment (date, hour, mechanic_id, status, total_cost) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [day, hour, mechanic, 'CREATED', 0],
+            )
+
+    def worker(index):
+        reads, write_ms, errors = 0, [], 0
+        try:
+            barrier.wait()
+            deadline = timer.perf_counter() + CONTENTION_SECONDS
+            while timer.perf_counter() < deadline:
+                started = timer.perf_counter()
+                try:
+                    request(write if index < writers else read)
+                except DatabaseError:
+                    errors += 1
+                    continue
+                if index < writers:
+                    write_ms.append((timer.perf_counter() - started) * 1000)
+                else:
+                    reads += 1
+        finally:
+            connections[alias].close()
+            del connections[alias]
+        return reads, write_ms, errors
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(worker, range(threads)))
+    return (
+        sum(reads for reads, _, _ in outcomes),
+        [ms for _, write_ms, _ in outcomes for ms in write_ms],
+        sum(errors for _, _, errors in outcomes),
+    )
+
+
+# Ρυθμίσεις SQLite που συγκρίνονται στα σενάρια contention και booking_stress:
+# οι βασικές (BEGIN IMMEDIATE, journal_mode=DELETE, νέα σύνδεση ανά αίτημα) και το προφίλ παραγωγής
+SQLITE_PROFILES = {
+    'default': {'OPTIONS': {'transaction_mode': 'IMMEDIATE'}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'production': {
+        'OPTIONS': settings.SQLITE_PRODUCTION_OPTIONS,
+        'CONN_MAX_AGE': settings.SQLITE_PRODUCTION_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+
+@scenario('contention')
+def bench_contention(sizes):
+    """
+    Ταυτόχρονες αναγνώσεις και εγγραφές σε SQLite με τις βασικές ρυθμίσεις (journal_mode=DELETE,
+    synchronous=FULL, timeout 5s, νέα σύνδεση ανά αίτημα) και με το προφίλ παραγωγής
+    (SQLITE_PRODUCTION_OPTIONS στο settings.py). Κάθε μέγεθος είναι το πλήθος threads,
+    από τα οποία το ένα τέταρτο γράφει. Χρησιμοποιείται προσωρινή βάση, όχι η βάση της εφαρμογής.
+    """
+    results = []
+    directory = tempfile.mkdtemp(prefix='bench_contention_')
+    try:
+        for size in sizes:
+            writers = max(1, size // 4)
+            for profile, overrides in SQLITE_PROFILES.items():
+                alias = f'bench_contention_{profile}'
+                connections.settings[alias] = {
+                    **connections['default'].settings_dict,
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': contention_database(directory, f'{alias}_{size}'),
+                    **overrides,
+                }
+                try:
+                    reads, write_ms, errors = contention_run(alias, size, writers)
+                finally:
+                    del connections.settings[alias]
+                results.append({
+                    'threads': size,
+                    'writers': writers,
+                    'profile': profile,
+                    'reads_per_s': round(reads / CONTENTION_SECONDS, 1),
+                    'writes_per_s': round(len(write_ms) / CONTENTION_SECONDS, 1),
+                    'write_p95_ms': round(percentile(write_ms, 95), 2) if write_ms else '-',
+                    'errors': errors,
+                    'ok': profile == 'default' or errors == 0,
+                })
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+# Κρατήσεις ανά πελάτη στο σενάριο booking_stress (μία σε κάθε ώρα έναρξης της ημέρας)
+STRESS_HOURS = [time(8, 0), time(10, 0), time(12, 0), time(14, 0)]
+
+
+def in_thread(func, *args):
+    """
+    Εκτελεί τη συνάρτηση σε νέο thread και επιστρέφει το αποτέλεσμα. Το thread ανοίγει δικές
+    του συνδέσεις (με τις τρέχουσες ρυθμίσεις του connections.settings) και τις κλείνει στο τέλος.
+    """
+    def run():
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run).result()
+
+
+def lock_timer(waits):
+    """
+    Execute wrapper που καταγράφει στο `waits` τον χρόνο (ms) αναμονής για το κλείδωμα εγγραφής:
+    τη διάρκεια κάθε BEGIN (με transaction_mode=IMMEDIATE περιμένει το κλείδωμα) και κάθε
+    εντολής που απέτυχε με «database is locked» (με BEGIN DEFERRED η αναμονή γίνεται στην εγγραφή).
+    """
+    def wrapper(execute, sql, params, many, context):
+        started = timer.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except DatabaseError as exc:
+            if 'locked' in str(exc):
+                waits.append((timer.perf_counter() - started) * 1000)
+            raise
+        if sql.startswith('BEGIN'):
+            waits.append((timer.perf_counter() - started) * 1000)
+        return result
+    return wrapper
+
+
+def stress_setup(size, day):
+    """Μηχανικοί, πελάτες με αυτοκίνητο και συνδεδεμένοι test clients για το booking_stress"""
+    create_users(size, 'mechanic', 'bench_stress_mech')
+    owners = create_users(size, 'client', 'bench_stress_client')
+    cars = create_cars(owners, 'BENCH-STRESS')
+    clients = []
+    for car in cars:
+        client = Client()
+        client.force_login(car.owner)
+        clients.append((client, car))
+    return clients
+
+
+def stress_run(clients, day):
+    """
+    Κάθε πελάτης στέλνει από δικό του thread τις κρατήσεις του (AppointmentCreateView), όλοι
+    μαζί μετά από ένα barrier. Επιστρέφει (διάρκεια σε ms, χρόνοι αιτημάτων, αναμονές
+    κλειδώματος, επιτυχίες, σφάλματα, σφάλματα «database is locked»).
+    """
+    barrier = threading.Barrier(len(clients))
+    url = reverse('appointment_create')
+
+    def worker(index):
+        client, car = clients[index]
+        timings, waits, booked, errors, locked = [], [], 0, 0, 0
+        barrier.wait()
+        with connections['default'].execute_wrapper(lock_timer(waits)):
+            for offset in range(len(STRESS_HOURS)):
+                hour = STRESS_HOURS[(index + offset) % len(STRESS_HOURS)]
+                started = timer.perf_counter()
+                try:
+                    response = client.post(url, {
+                        'client': car.owner_id, 'car': car.pk, 'date': day.isoformat(),
+                        'hour': hour.strftime('%H:%M'), 'service_type': 'service',
+                    })
+                    if response.status_code == 302:
+                        booked += 1
+                    else:
+                        errors += 1
+                except DatabaseError as exc:
+                    errors += 1
+                    locked += 'locked' in str(exc)
+                timings.append((timer.perf_counter() - started) * 1000)
+        return timings, waits, booked, errors, locked
+
+    def run(index):
+        try:
+            return worker(index)
+        finally:
+            connections.close_all()
+
+    started = timer.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        outcomes = list(pool.map(run, range(len(clients))))
+    elapsed = (timer.perf_counter() - started) * 1000
+    return (
+        elapsed,
+        [ms for timings, *_ in outcomes for ms in timings],
+        [ms for _, waits, *_ in outcomes for ms in waits],
+        *(sum(outcome[position] for outcome in outcomes) for position in (2, 3, 4)),
+    )
+
+
+@scenario('booking_stress')
+def bench_booking_stress(sizes):
+    """
+    Ταυτόχρονες κρατήσεις μέσω της φόρμας πελάτη (AppointmentCreateView, με τον test client):
+    `size` πελάτες, ο καθένας σε δικό του thread, στέλνουν μαζί 4 κρατήσεις (μία ανά ώρα
+    έναρξης) για την ίδια ημέρα, με `size` μηχανικούς, άρα υπάρχει θέση για όλες.
+    Κάθε εκτέλεση γίνεται σε προσωρινό αντίγραφο σε αρχείο μιας βάσης με όλα τα migrations,
+    με BEGIN DEFERRED (προεπιλογή του Django) και με τα προφίλ του SQLITE_PROFILES.
+    Αναφέρει ρυθμό κρατήσεων, ποσοστό σφαλμάτων, σφάλματα «database is locked», χρόνους
+    αιτημάτων, αναμονή για το κλείδωμα εγγραφής, επικαλυπτόμενα ραντεβού μηχανικών και
+    ραντεβού που αποθηκεύτηκαν ενώ το αίτημα απέτυχε (phantom).
+    Ελέγχει ότι δεν υπάρχουν επικαλύψεις και ότι με BEGIN IMMEDIATE δεν υπάρχουν σφάλματα
+    και κάθε κράτηση παίρνει μηχανικό.
+    """
+    profiles = {
+        'deferred': {'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+        **SQLITE_PROFILES,
+    }
+    day = date.today() + timedelta(days=30)
+    original = connections.settings['default']
+    # Τα «database is locked» του BEGIN DEFERRED μετρώνται, δεν χρειάζεται και το traceback τους
+    logger = logging.getLogger('django.request')
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    results = []
+    directory = tempfile.mkdtemp(prefix='bench_stress_')
+    try:
+        # Τα νέα threads συνδέονται στη βάση του connections.settings['default'] (η σύνδεση
+        # του κύριου thread μένει στη βάση της εφαρμογής)
+        template = os.path.join(directory, 'template.sqlite3')
+        connections.settings['default'] = {**original, 'NAME': template, **profiles['deferred']}
+        in_thread(lambda: call_command('migrate', verbosity=0, interactive=False))
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for size in sizes:
+                for profile, overrides in profiles.items():
+                    path = os.path.join(directory, f'{profile}_{size}.sqlite3')
+                    shutil.copyfile(template, path)
+                    connections.settings['default'] = {**original, 'NAME': path, **overrides}
+                    clients = in_thread(stress_setup, size, day)
+                    elapsed, timings, waits, booked, errors, locked = stress_run(clients, day)
+                    appointments = in_thread(lambda: list(Appointment.objects.filter(date=day)))
+
+                    requests = len(timings)
+                    overlaps = count_double_bookings(appointments)
+                    unassigned = sum(1 for appointment in appointments if appointment.mechanic_id is None)
+                    results.append({
+                        'clients': size,
+                        'profile': profile,
+                        'requests': requests,
+                        'booked': booked,
+                        'bookings_per_s': round(booked / elapsed * 1000, 1),
+                        'error_rate': round(errors / requests, 3),
+                        'locked': locked,
+                        'p50_ms': round(percentile(timings, 50), 2),
+                        'p95_ms': round(percentile(timings, 95), 2),
+                        'lock_wait_p95_ms': round(percentile(waits, 95), 2) if waits else '-',
+                        'lock_wait_share': round(sum(waits) / sum(timings), 3),
+                        'unassigned': unassigned,
+                        'phantom': len(appointments) - booked,
+                        'overlaps': overlaps,
+                        'ok': overlaps == 0 and (
+                            profile == 'deferred'
+                            or (errors == 0 and unassigned == 0 and len(appointments) == booked)
+                        ),
+                    })
+    finally:
+        logger.setLevel(level)
+        connections.settings['default'] = original
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+# Threads του WSGI server στο σενάριο asgi (π.χ. gunicorn --threads 4)
+WSGI_THREADS = 4
+
+# Χρόνος (δευτερόλεπτα) που χρειάζεται ένας αργός client για να διαβάσει την απόκριση
+SLOW_CLIENT_SECONDS = 0.05
+
+# URLs του σεναρίου asgi: (όνομα, ρόλος, query string)
+LOAD_URLS = [
+    ('all_appointments', 'secretary', ''),
+    ('car_search', 'secretary', 'q=a'),
+    ('my_appointments', 'client', ''),
+]
+
+
+def wsgi_request(application, path, query, cookie, delay):
+    """Ένα αίτημα GET στην εφαρμογή WSGI. Το thread μένει δεσμευμένο όσο ο client διαβάζει την απόκριση."""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    statuses = []
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(int(status.split()[0])))
+    try:
+        b''.join(body)
+        timer.sleep(delay)
+    finally:
+        body.close()  # Στέλνει το request_finished (κλείσιμο σύνδεσης βάσης)
+    return statuses[0]
+
+
+async def asgi_request(application, path, query, cookie, delay):
+    """Ένα αίτημα GET στην εφαρμογή ASGI. Όσο ο client διαβάζει την απόκριση δεν δεσμεύεται thread."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    disconnected = asyncio.Event()
+    requested = False
+    status = None
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            await asyncio.sleep(delay)
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return status
+
+
+def wsgi_load(application, requests, delay):
+    """Στέλνει όλα τα αιτήματα ταυτόχρονα σε WSGI server με WSGI_THREADS threads"""
+    def timed(request, submitted):
+        return wsgi_request(application, *request, delay), (timer.perf_counter() - submitted) * 1000
+
+    with ThreadPoolExecutor(max_workers=WSGI_THREADS) as pool:
+        futures = [pool.submit(timed, request, timer.perf_counter()) for request in requests]
+        return [future.result() for future in futures]
+
+
+def asgi_load(application, requests, delay):
+    """Στέλνει όλα τα αιτήματα ταυτόχρονα στην εφαρμογή ASGI (ένα event loop)"""
+    async def timed(request):
+        started = timer.perf_counter()
+        status = await asgi_request(application, *request, delay)
+        return status, (timer.perf_counter() - started) * 1000
+
+    async def run():
+        return await asyncio.gather(*(timed(request) for request in requests))
+
+    return asyncio.run(run())
+
+
+@scenario('asgi')
+def bench_asgi(sizes):
+    """
+    Διεκπεραιωτική ικανότητα (αιτήματα/s) και p95 των async σελίδων λίστας/αναζήτησης με
+    ταυτόχρονους clients, μέσω του ASGI handler (project/asgi.py) και του WSGI handler
+    (project/wsgi.py, με WSGI_THREADS threads), χωρίς καθυστέρηση και με αργούς clients
+    (SLOW_CLIENT_SECONDS για την ανάγνωση κάθε απόκρισης). Κάθε μέγεθος είναι το πλήθος
+    ταυτόχρονων αιτημάτων. Χρησιμοποιούνται τα δεδομένα της βάσης (π.χ. από
+    `manage.py generate_dataset`) και προσωρινοί χρήστες που διαγράφονται στο τέλος.
+    """
+    servers = {'wsgi': (get_internal_wsgi_application(), wsgi_load), 'asgi': (get_asgi_application(), asgi_load)}
+    results = []
+    users = {role: create_users(1, role, f'bench_asgi_{role}')[0] for role in ['client', 'secretary']}
+    clients = {role: Client() for role in users}
+    try:
+        for role, user in users.items():
+            clients[role].force_login(user)
+        cookies = {
+            role: f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            for role, client in clients.items()
+        }
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for size in sizes:
+                for name, role, query in LOAD_URLS:
+                    requests = [(reverse(name), query, cookies[role])] * size
+                    for delay in (0, SLOW_CLIENT_SECONDS):
+                        for server, (application, load) in servers.items():
+                            started = timer.perf_counter()
+                            outcomes = load(application, requests, delay)
+                            elapsed = timer.perf_counter() - started
+                            timings = [ms for _, ms in outcomes]
+                            results.append({
+                                'clients': size,
+                                'url': name,
+                                'slow_ms': round(delay * 1000),
+                                'server': server,
+                                'req_per_s': round(size / elapsed, 1),
+                                'p95_ms': round(percentile(timings, 95), 2),
+                                'ok': all(status == 200 for status, _ in outcomes),
+                            })
+    finally:
+        for client in clients.values():
+            client.logout()
+        User.objects.filter(username__startswith='bench_asgi_').delete()
+    return results
+
+
+def summary_snapshot(start, end):
+    """Οι μη μηδενικές γραμμές ημερήσιων συνόλων του διαστήματος (για σύγκριση με rebuild_summary)"""
+    return {
+        (row.date, row.mechanic_id, row.status): (row.appointments, row.revenue, row.labour_duration)
+        for row in DailySummary.objects.filter(date__range=(start, end))
+        if row.appointments or row.revenue or row.labour_duration
+    }
+
+
+@scenario('batch_api')
+def bench_batch_api(sizes):
+    """
+    Δημιουργία `size` ραντεβού με ένα αίτημα στο JSON API (POST api/appointments/) και αλλαγή
+    της κατάστασής τους με ένα PATCH, σε σύγκριση με ένα αίτημα της φόρμας γραμματέα ανά ραντεβού.
+    Ελέγχει ότι δεν υπάρχουν επικαλυπτόμενα ραντεβού μηχανικών και ότι τα ημερήσια σύνολα
+    συμφωνούν με τον πλήρη επανυπολογισμό τους.
+    """
+    results = []
+    start = date(2090, 1, 1)
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            create_users(10, 'mechanic', f'bench_batch_mech_{size}')
+            secretary = create_users(1, 'secretary', f'bench_batch_secretary_{size}')[0]
+            owners = create_users(size, 'client', f'bench_batch_client_{size}')
+            cars = create_cars(owners, f'BENCH-BATCH-{size}')
+            client = Client()
+            client.force_login(secretary)
+            rng = random.Random(size)
+            items = [
+                {
+                    'client': car.owner_id, 'car': car.pk, 'date': (start + timedelta(days=i // 20)).isoformat(),
+                    'hour': f'{rng.choice([8, 10, 12, 14]):02d}:00', 'service_type': 'repair',
+                    'problem_description': 'Θόρυβος στα φρένα',
+                }
+                for i, car in enumerate(cars)
+            ]
+            end = start + timedelta(days=size // 20)
+
+            with transaction.atomic():
+                url = reverse('secretary_appointment_create')
+                _, form_queries, form_ms = measure(lambda: [client.post(url, item) for item in items])
+                transaction.set_rollback(True)
+
+            url = reverse('api_appointments')
+            response, create_queries, create_ms = measure(
+                client.post, url, json.dumps(items), content_type='application/json',
+            )
+            created = [row['id'] for row in response.json().get('created', [])]
+            changes = [{'id': pk, 'status': rng.choice(['IN_PROGRESS', 'COMPLETED', 'CANCELLED'])} for pk in created]
+            patched, status_queries, status_ms = measure(
+                client.patch, url, json.dumps(changes), content_type='application/json',
+            )
+
+            booked = list(Appointment.objects.filter(date__range=(start, end)))
+            before = summary_snapshot(start, end)
+            rebuild_summary(start, end)
+            consistent = before == summary_snapshot(start, end)
+            results.append({
+                'appointments': size,
+                'form_queries': form_queries,
+                'form_ms': round(form_ms, 2),
+                'create_queries': create_queries,
+                'create_ms': round(create_ms, 2),
+                'status_queries': status_queries,
+                'status_ms': round(status_ms, 2),
+                'double_bookings': count_double_bookings(booked),
+                'summary_ok': consistent,
+                'ok': (
+                    response.status_code == 201 and patched.status_code == 200 and len(created) == size
+                    and count_double_bookings(booked) == 0 and consistent
+                ),
+            })
+    return results
+
+
+@scenario('transitions')
+def bench_transitions(sizes):
+    """
+    Κλείσιμο ημέρας: ολοκλήρωση `size` ραντεβού (το ένα τέταρτο ήδη ακυρωμένα, συν μερικά
+    ανύπαρκτα id) με ένα αίτημα στη μαζική σελίδα, σε σύγκριση με ένα αίτημα της φόρμας
+    κατάστασης ανά ραντεβού. Ελέγχει ότι απορρίπτονται ακριβώς τα ακυρωμένα και τα ανύπαρκτα,
+    ότι το πλήθος των queries δεν αλλάζει με το μέγεθος και ότι τα ημερήσια σύνολα
+    συμφωνούν με τον πλήρη επανυπολογισμό τους.
+    """
+    results = []
+    bulk_counts = set()
+    day = date(2091, 1, 2)
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            mechanics = create_users(size // 4 + 1, 'mechanic', f'bench_close_mech_{size}')
+            secretary = create_users(1, 'secretary', f'bench_close_secretary_{size}')[0]
+            owners = create_users(size, 'client', f'bench_close_client_{size}')
+            cars = create_cars(owners, f'BENCH-CLOSE-{size}')
+            created = create_appointments([
+                {
+                    'client': car.owner_id, 'car': car.pk, 'date': day.isoformat(),
+                    'hour': f'{8 + 2 * (i % 4):02d}:00', 'service_type': 'service',
+                }
+                for i, car in enumerate(cars)
+            ])
+            ids = [row['id'] for row in created]
+            cancelled = set(ids[::4])
+            transition_statuses(cancelled, 'CANCELLED')
+            missing = [max(ids) + offset for offset in range(1, 6)]
+            client = Client()
+            client.force_login(secretary)
+
+            with transaction.atomic():
+                _, form_queries, form_ms = measure(lambda: [
+                    client.post(reverse('appointment_update_status', kwargs={'pk': pk}), {'status': 'COMPLETED'})
+                    for pk in ids
+                ])
+                transaction.set_rollback(True)
+
+            with transaction.atomic():
+                url = f"{reverse('appointment_bulk_status')}?date={day.isoformat()}"
+                response, bulk_queries, bulk_ms = measure(
+                    client.post, url, {'ids': ids + missing, 'status': 'COMPLETED'},
+                )
+                transaction.set_rollback(True)
+
+            updated, rejected = transition_statuses(ids + missing, 'COMPLETED')
+            before = summary_snapshot(day, day)
+            rebuild_summary(day, day)
+            consistent = before == summary_snapshot(day, day)
+            correct = (
+                set(updated) == set(ids) - cancelled and set(rejected) == cancelled | set(missing)
+                and not Appointment.objects.filter(pk__in=ids).exclude(status__in=['COMPLETED', 'CANCELLED']).exists()
+            )
+            bulk_counts.add(bulk_queries)
+            results.append({
+                'appointments': size,
+                'mechanics': len(mechanics),
+                'form_queries': form_queries,
+                'form_ms': round(form_ms, 2),
+                'bulk_queries': bulk_queries,
+                'bulk_ms': round(bulk_ms, 2),
+                'rejected': len(rejected),
+                'summary_ok': consistent,
+                'ok': response.status_code == 302 and correct and consistent and len(bulk_counts) == 1,
+            })
+    return results
+
+
+# Ημέρες του ημερολογίου κρατήσεων στο σενάριο slots
+SLOT_DAYS = 14
+
+
+def naive_slots(days):
+    """Το πλέγμα με ένα available_mechanics ανά ημέρα και ώρα έναρξης"""
+    return [
+        (day, [(time(slot // 60, slot % 60), len(available_mechanics(day, time(slot // 60, slot % 60))))
+               for slot in SLOT_STARTS])
+        for day in days
+    ]
+
+
+@scenario('slots')
+def bench_slots(sizes):
+    """
+    Πλέγμα ελεύθερων θέσεων για 14 ημέρες με `size` μηχανικούς: ένα available_mechanics ανά
+    θέση, σε σύγκριση με το free_slots χωρίς cache και με cache. Ελέγχει ότι τα πλήθη συμφωνούν
+    και ότι μια κράτηση και μια ακύρωση διαγράφουν από την cache μόνο την ημέρα τους.
+    """
+    results = []
+    start = date(2092, 3, 1)
+    days = [start + timedelta(days=offset) for offset in range(SLOT_DAYS)]
+    for size in sizes:
+        with rolled_back():
+            cache.delete_many([slots_key(day) for day in days])
+            mechanics = create_users(size, 'mechanic', f'bench_slots_mech_{size}')
+            owner = create_users(1, 'client', f'bench_slots_client_{size}')[0]
+            car = create_cars([owner], f'BENCH-SLOTS-{size}')[0]
+            rng = random.Random(size)
+            Appointment.objects.bulk_create([
+                Appointment(
+                    client=owner, car=car, mechanic=mechanic, date=day,
+                    hour=time(rng.randrange(8, 16), rng.choice([0, 30])),
+                    service_type='service', status=rng.choice(['CREATED', 'IN_PROGRESS', 'CANCELLED']),
+                )
+                for day in days for mechanic in mechanics if rng.random() < 0.6
+            ])
+            mechanics[-1].is_active = False
+            mechanics[-1].save(update_fields=['is_active'])
+
+            naive, naive_queries, naive_ms = measure(naive_slots, days)
+            cold, cold_queries, cold_ms = measure(free_slots, days[0], days[-1])
+            warm, warm_queries, warm_ms = measure(free_slots, days[0], days[-1])
+
+            # Κράτηση και ακύρωση (με signals και με transition_statuses) σε δύο ημέρες
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                book_appointment(Appointment(
+                    client=owner, car=car, date=days[3], hour=time(10, 0), service_type='service', status='CREATED',
+                ))
+            cancelled = Appointment.objects.filter(ACTIVE_APPOINTMENT, date=days[5]).values_list('pk', flat=True)[:1]
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                transition_statuses(list(cancelled), 'CANCELLED')
+            cached = cache.get_many([slots_key(day) for day in days])
+            dropped = [day for day in days if slots_key(day) not in cached]
+            changed, changed_queries, _ = measure(free_slots, days[0], days[-1])
+            results.append({
+                'mechanics': size,
+                'naive_queries': naive_queries,
+                'naive_ms': round(naive_ms, 2),
+                'cold_queries': cold_queries,
+                'cold_ms': round(cold_ms, 2),
+                'warm_queries': warm_queries,
+                'warm_ms': round(warm_ms, 2),
+                'after_change_queries': changed_queries,
+                'ok': (
+                    naive == cold == warm and changed == naive_slots(days) and changed != naive
+                    and dropped == [days[3], days[5]] and cold_queries == 2 and warm_queries == 1
+                ),
+            })
+    return results
+
+
+def consume(response):
+    """Διαβάζει τη ροή χωρίς να την κρατά στη μνήμη και επιστρέφει το μέγεθός της"""
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+@scenario('calendar')
+def bench_calendar(sizes):
+    """
+    Ροή ICS μηχανικού με `size` επόμενα ραντεβού: πρώτο αίτημα (ολόκληρη ροή), αιτήματα με
+    If-None-Match και If-Modified-Since (304) και αίτημα μετά από ακύρωση ραντεβού (νέο ETag).
+    Ελέγχει ότι η μέγιστη μνήμη κατά την παραγωγή της ροής μένει κάτω από το όριο,
+    ότι οι γραμμές δεν ξεπερνούν τα 75 bytes και ότι λάθος token δίνει 404.
+    """
+    results = []
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            mechanic = create_users(1, 'mechanic', f'bench_calendar_mech_{size}')[0]
+            owner = create_users(1, 'client', f'bench_calendar_client_{size}')[0]
+            car = create_cars([owner], f'BENCH-CALENDAR-{size}')[0]
+            first_day = date.today() + timedelta(days=1)
+            appointments = Appointment.objects.bulk_create([
+                Appointment(
+                    client=owner, car=car, mechanic=mechanic, date=first_day + timedelta(days=i // 4),
+                    hour=time(8 + 2 * (i % 4), 0), service_type='repair', status='CREATED',
+                    problem_description='Θόρυβος στα φρένα, έλεγχος; ' * 4,
+                )
+                for i in range(size)
+            ])
+            url = reverse('mechanic_calendar', kwargs={'pk': mechanic.pk, 'token': calendar_token(mechanic)})
+            client = Client()
+
+            full, full_queries, full_ms = measure(read_response, client.get, url)
+            body = b''.join(client.get(url).streaming_content).decode()
+            peak = peak_memory(lambda: consume(client.get(url)))
+            etag, modified = full['ETag'], full['Last-Modified']
+            by_etag, etag_queries, etag_ms = measure(client.get, url, HTTP_IF_NONE_MATCH=etag)
+            by_date, date_queries, date_ms = measure(client.get, url, HTTP_IF_MODIFIED_SINCE=modified)
+
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                transition_statuses([appointments[0].pk], 'CANCELLED')
+            changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            changed_events = b''.join(changed.streaming_content).decode().count('BEGIN:VEVENT')
+            forbidden = client.get(url.replace(calendar_token(mechanic), '0' * 32))
+
+            lines = body.split('\r\n')
+            results.append({
+                'appointments': size,
+                'bytes': len(body.encode()),
+                'full_queries': full_queries,
+                'full_ms': round(full_ms, 2),
+                'peak_kb': round(peak / 1024, 1),
+                'not_modified_queries': etag_queries,
+                'etag_ms': round(etag_ms, 2),
+                'since_ms': round(date_ms, 2),
+                'ok': (
+                    full.status_code == 200 and body.count('BEGIN:VEVENT') == size
+                    and all(len(line.encode()) <= 75 for line in lines) and lines[-1] == ''
+                    and by_etag.status_code == 304 and by_date.status_code == 304
+                    and changed.status_code == 200 and changed['ETag'] != etag and changed_events == size - 1
+                    and forbidden.status_code == 404 and peak < STREAMING_PEAK_LIMIT
+                ),
+            })
+    return results
+
+
+def legacy_export_appointments():
+    """Εξαγωγή ραντεβού με ολόκληρο το CSV στη μνήμη (αντικείμενα μοντέλου και select_related)"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([header for header, _ in EXPORTS['appointments'].columns])
+    for appointment in Appointment.objects.select_related('client', 'car', 'mechanic').order_by('date', 'hour', 'pk'):
+        writer.writerow([
+            appointment.pk, appointment.date, appointment.hour, appointment.status, appointment.service_type,
+            appointment.problem_description, appointment.client.username, appointment.client.first_name,
+            appointment.client.last_name, appointment.client.afm, appointment.car.serial_number,
+            appointment.car.make, appointment.car.model,
+            appointment.mechanic.username if appointment.mechanic else '', appointment.total_cost,
+            int(appointment.labour_duration.total_seconds() // 60), appointment.creation_date,
+        ])
+    return HttpResponse(output.getvalue(), content_type='text/csv')
+
+
+# Όριο μνήμης της ροής εξαγωγής: ένα τμήμα EXPORT_CHUNK_SIZE γραμμών με τα JOIN τους,
+# ανεξάρτητα από το πλήθος των εγγραφών
+EXPORT_PEAK_LIMIT = 2 * 1024 * 1024
+
+
+@scenario('csv_export')
+def bench_csv_export(sizes):
+    """
+    Εξαγωγή `size` ραντεβού σε CSV: ολόκληρο το αρχείο στη μνήμη σε σύγκριση με τη ροή του
+    ExportView (χρόνος ως το πρώτο τμήμα, συνολικός χρόνος, μέγιστη μνήμη, queries).
+    Ελέγχει ότι η μνήμη της ροής μένει κάτω από το όριο, ότι το CSV διαβάζεται ξανά με
+    όλες τις γραμμές και ότι τα φίλτρα ημερομηνίας και κατάστασης εφαρμόζονται.
+    """
+    results = []
+    start = date(2093, 1, 1)
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            secretary = create_users(1, 'secretary', f'bench_export_secretary_{size}')[0]
+            mechanic = create_users(1, 'mechanic', f'bench_export_mech_{size}')[0]
+            owners = create_users(min(size, 1000), 'client', f'bench_export_client_{size}')
+            cars = create_cars(owners, f'BENCH-EXPORT-{size}')
+            Appointment.objects.bulk_create([
+                Appointment(
+                    client=cars[i % len(cars)].owner, car=cars[i % len(cars)], mechanic=mechanic,
+                    date=start + timedelta(days=i // 100), hour=time(8 + 2 * (i % 4), 0),
+                    service_type='repair', problem_description='Θόρυβος, "τρίξιμο" στα φρένα',
+                    status='CANCELLED' if i % 5 == 0 else 'COMPLETED',
+                    total_cost=Decimal('120.50'), labour_duration=timedelta(minutes=90),
+                )
+                for i in range(size)
+            ], batch_size=5000)
+            client = Client()
+            client.force_login(secretary)
+            url = reverse('export', kwargs={'kind': 'appointments'})
+            query = f'start={start.isoformat()}&end={(start + timedelta(days=size // 100)).isoformat()}'
+            Appointment.objects.filter(date__lt=start).count()  # Ζέσταμα
+
+            legacy_peak = peak_memory(legacy_export_appointments)
+            _, _, legacy_ms = measure(legacy_export_appointments)
+
+            started = timer.perf_counter()
+            response = client.get(f'{url}?{query}')
+            chunks = iter(response.streaming_content)
+            first_chunk = next(chunks)
+            first_ms = (timer.perf_counter() - started) * 1000
+            body = (first_chunk + b''.join(chunks)).decode('utf-8-sig')
+            _, queries, stream_ms = measure(read_response, client.get, f'{url}?{query}')
+            stream_peak = peak_memory(lambda: consume(client.get(f'{url}?{query}')))
+
+            rows = list(csv.DictReader(io.StringIO(body)))
+            cancelled = b''.join(client.get(f'{url}?{query}&status=CANCELLED').streaming_content).decode('utf-8-sig')
+            cancelled_rows = list(csv.DictReader(io.StringIO(cancelled)))
+            invalid = [client.get(f'{url}?status=UNKNOWN').status_code, client.get(f'{url}?start=x').status_code]
+            results.append({
+                'appointments': size,
+                'legacy_ms': round(legacy_ms, 2),
+                'legacy_peak_kb': round(legacy_peak / 1024, 1),
+                'first_chunk_ms': round(first_ms, 2),
+                'stream_ms': round(stream_ms, 2),
+                'stream_peak_kb': round(stream_peak / 1024, 1),
+                'queries': queries,
+                'ok': (
+                    len(rows) == size and rows[0]['problem_description'] == 'Θόρυβος, "τρίξιμο" στα φρένα'
+                    and len(cancelled_rows) == (size + 4) // 5
+                    and all(row['status'] == 'CANCELLED' for row in cancelled_rows)
+                    and invalid == [400, 400] and queries == 3 and stream_peak < EXPORT_PEAK_LIMIT
+                ),
+            })
+    return results
+
+
+# Ηλικία (σε ημέρες) των ραντεβού που αρχειοθετούνται στο σενάριο archive
+ARCHIVE_BENCH_DAYS = 30
+
+# Ελάχιστο διάστημα (σε ημέρες) των ραντεβού του σεναρίου archive: στα μικρά μεγέθη η
+# πληρότητα μειώνεται, ώστε να υπάρχουν πάντα ραντεβού παλιότερα από ARCHIVE_BENCH_DAYS
+ARCHIVE_BENCH_SPAN = 120
+
+# Μηχανικοί του συνόλου δεδομένων στο σενάριο archive
+ARCHIVE_BENCH_MECHANICS = 20
+
+# Επαναλήψεις κάθε μέτρησης πριν και μετά την αρχειοθέτηση
+ARCHIVE_REPEATS = 11
+
+
+@scenario('archive')
+def bench_archive(sizes):
+    """
+    Συνθετικό σύνολο (generate_dataset) με `size` ραντεβού: χρόνος του προγραμματισμού
+    (available_mechanics ανά θέση και free_slots χωρίς cache) και των λιστών (ραντεβού
+    πελάτη και μηχανικού χωρίς cache, πρώτη σελίδα όλων των ραντεβού, αναζήτηση) πριν και
+    μετά την αρχειοθέτηση των κλεισμένων ραντεβού παλιότερων από 30 ημέρες.
+    Ελέγχει ότι μεταφέρονται όλα τα ραντεβού και οι εργασίες τους, ότι τα ημερήσια σύνολα
+    δεν αλλάζουν και συμφωνούν με τον επανυπολογισμό τους και ότι το ιστορικό πελάτη και η
+    αναζήτηση με ?archived=1 δείχνουν τα ίδια ραντεβού με πριν.
+    """
+    results = []
+    for size in sizes:
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['*']):
+            prefix = f'bench_archive_{size}'
+            slots_per_day = ARCHIVE_BENCH_MECHANICS * len(SLOTS) * 5 / 7
+            generate_dataset(
+                clients=max(size // 20, 1), mechanics=ARCHIVE_BENCH_MECHANICS, secretaries=1,
+                cars=max(size // 10, 1), appointments=size, works=size // 2, prefix=prefix, seed=size,
+                occupancy=min(0.8, size / (ARCHIVE_BENCH_SPAN * slots_per_day)),
+            )
+            secretary = User.objects.get(username=f'{prefix}_secretary_0')
+            clients = User.objects.filter(username__startswith=f'{prefix}_client_').annotate(
+                total=Count('appointment'),
+            ).order_by('-total')
+            client = clients.first()
+            # Πελάτης του οποίου όλα τα ραντεβού χωρούν στα αποτελέσματα της αναζήτησης
+            searched = clients.filter(total__lte=SEARCH_LIMIT).first()
+            mechanic = User.objects.get(username=f'{prefix}_mechanic_0')
+            days = [date.today() + timedelta(days=offset) for offset in range(1, 6)]
+            last_name = client.last_name
+
+            def schedule():
+                cache.delete_many([slots_key(day) for day in days])
+                naive_slots(days)
+                free_slots(days[0], days[-1])
+
+            def page(view_class, user, name=None):
+                if name:
+                    new_generation(name, user.pk)
+                return render_view(view_class, user)
+
+            targets = [
+                ('scheduling', schedule),
+                ('client_history', lambda: page(views.MyAppointmentsView, client, 'my_appointments')),
+                ('mechanic_list', lambda: page(views.MyAssignedAppointmentsView, mechanic, 'my_assigned_appointments')),
+                ('appointment_list', lambda: page(views.AppointmentListView, secretary)),
+                ('search', lambda: search(Appointment, last_name)),
+            ]
+
+            def timings():
+                return {
+                    name: percentile([measure(func)[2] for _ in range(ARCHIVE_REPEATS)], 50)
+                    for name, func in targets
+                }
+
+            history_url = '/?archived=1'
+            search_url = f'/?q={searched.afm}&archived=1'
+            history = [a.pk for a in render_view(views.MyAppointmentsView, client).context_data['appointments']]
+            found = {a.pk for a in render_view(views.AppointmentSearchView, secretary, search_url).context_data['appointments']}
+            first = Appointment.objects.filter(client__username__startswith=prefix).aggregate(first=Min('date'))['first']
+            last = days[-1] + timedelta(days=30)
+            summaries = summary_snapshot(first, last)
+            totals = (Appointment.objects.count(), Work.objects.count())
+            cutoff = archive_cutoff(ARCHIVE_BENCH_DAYS)
+            expected = archivable(cutoff).count()
+            before = timings()
+
+            (moved, moved_works), _, archive_ms = measure(archive_appointments, cutoff)
+            after = timings()
+
+            remaining = (Appointment.objects.count(), Work.objects.count())
+            archived_history, history_queries, _ = measure(render_view, views.MyAppointmentsView, client, history_url)
+            archived_found = {
+                a.pk for a in render_view(views.AppointmentSearchView, secretary, search_url).context_data['appointments']
+            }
+            unchanged = summaries == summary_snapshot(first, last)
+            rebuild_summary(first, last)
+            consistent = summaries == summary_snapshot(first, last)
+            correct = (
+                0 < moved == expected and not archivable(cutoff).exists()
+                and remaining == (totals[0] - moved, totals[1] - moved_works)
+                and ArchivedWork.objects.filter(appointment__client__username__startswith=prefix).count() == moved_works
+                and [a.pk for a in archived_history.context_data['appointments']] == history
+                and found == archived_found and history_queries == 2 and unchanged and consistent
+            )
+            for name, _ in targets:
+                results.append({
+                    'appointments': size,
+                    'archived': moved,
+                    'archive_ms': round(archive_ms, 2),
+                    'target': name,
+                    'before_ms': round(before[name], 2),
+                    'after_ms': round(after[name], 2),
+                    'speedup': round(before[name] / after[name], 2) if after[name] else '-',
+                    'ok': correct,
+                })
+    return results
@@ -0,0 +1,120 @@
+import hashlib
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Appointment
+from .scheduling import ACTIVE_APPOINTMENT, APPOINTMENT_DURATION
+
+"""
+Ροή ημερολογίου (ICS) με τα επόμενα ραντεβού κάθε μηχανικού, για εφαρμογές ημερολογίου
+που τη ζητούν ανά λίγα λεπτά χωρίς σύνδεση στην εφαρμογή.
+Η πρόσβαση γίνεται με token ανά μηχανικό (HMAC του id και του κωδικού του, όπως στα
+tokens επαναφοράς κωδικού του Django), οπότε η αλλαγή κωδικού ακυρώνει τα παλιά URLs.
+Το ETag είναι hash των ραντεβού της ροής (ένα query χωρίς απόδοση της ροής), ώστε τα
+αιτήματα χωρίς αλλαγές να απαντώνται με 304. Η ροή παράγεται γραμμή προς γραμμή από
+queryset.iterator() και δεν κρατιέται ποτέ ολόκληρη στη μνήμη.
+"""
+
+# Salt του HMAC για τα tokens της ροής
+CALENDAR_SALT = 'automotiveworkshop.calendar_feed'
+
+# Πλήθος ραντεβού ανά ανάγνωση από τη βάση
+FEED_CHUNK_SIZE = 500
+
+# Χρόνος ζωής της πρώτης εμφάνισης κάθε εκδοχής της ροής (Last-Modified)
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+# Πεδία των ραντεβού που εμφανίζονται στη ροή (και από τα οποία υπολογίζεται το ETag)
+FEED_FIELDS = [
+    'pk', 'date', 'hour', 'status', 'service_type', 'problem_description',
+    'car__make', 'car__model', 'car__serial_number',
+]
+
+SERVICE_NAMES = dict(Appointment.SERVICE_CHOICES)
+STATUS_NAMES = dict(Appointment.STATUS_CHOICES)
+
+
+def calendar_token(user):
+    """Token της ροής του μηχανικού"""
+    return salted_hmac(CALENDAR_SALT, f'{user.pk}{user.password}', algorithm='sha256').hexdigest()[:32]
+
+
+def check_calendar_token(user, token):
+    return constant_time_compare(calendar_token(user), token)
+
+
+def upcoming_rows(mechanic_id):
+    """Τα ενεργά ραντεβού του μηχανικού από σήμερα και μετά (πεδία FEED_FIELDS)"""
+    return Appointment.objects.filter(
+        ACTIVE_APPOINTMENT, mechanic_id=mechanic_id, date__gte=date.today(),
+    ).order_by('date', 'hour', 'pk').values_list(*FEED_FIELDS)
+
+
+def feed_version(mechanic_id):
+    """
+    Επιστρέφει (ETag, Last-Modified) της ροής. Το Last-Modified είναι η πρώτη φορά που
+    εμφανίστηκε η συγκεκριμένη εκδοχή (τα ραντεβού δεν έχουν χρόνο τελευταίας αλλαγής).
+    """
+    digest = hashlib.sha256()
+    for row in upcoming_rows(mechanic_id).iterator(chunk_size=FEED_CHUNK_SIZE):
+        digest.update(repr(row).encode())
+    etag = digest.hexdigest()[:32]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    last_modified = cache.get_or_set(f'calendar:{mechanic_id}:{etag}', now, VERSION_TIMEOUT)
+    return f'"{etag}"', last_modified
+
+
+def escape(text):
+    """Διαφυγή κειμένου για τιμές TEXT του iCalendar (RFC 5545, 3.3.11)"""
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Γραμμή iCalendar σε τμήματα έως 75 bytes (οι συνέχειες ξεκινούν με κενό), με CRLF"""
+    parts, current, size = [], '', 0
+    for char in line:
+        length = len(char.encode())
+        if size + length > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += length
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def utc_stamp(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def feed_lines(mechanic_id, host, stamp):
+    """Οι γραμμές της ροής ICS, μία προς μία (για StreamingHttpResponse)"""
+    local = ZoneInfo(settings.TIME_ZONE)
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold('PRODID:-//automotiveworkshop//calendar feed//EL')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold('X-WR-CALNAME:Ραντεβού συνεργείου')
+    rows = upcoming_rows(mechanic_id).iterator(chunk_size=FEED_CHUNK_SIZE)
+    for pk, day, hour, status, service_type, problem, make, model, serial in rows:
+        start = datetime.combine(day, hour, tzinfo=local)
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:appointment-{pk}@{host}')
+        yield fold(f'DTSTAMP:{utc_stamp(stamp)}')
+        yield fold(f'DTSTART:{utc_stamp(start)}')
+        yield fold(f'DURATION:PT{APPOINTMENT_DURATION}M')
+        summary = f"{SERVICE_NAMES.get(service_type, service_type)}: {make} {model} ({serial})"
+        yield fold(f'SUMMARY:{escape(summary)}')
+        description = f"Ραντεβού #{pk} - {STATUS_NAMES.get(status, status)}"
+        if problem:
+            description += f"\n{problem}"
+        yield fold(f'DESCRIPTION:{escape(description)}')
+        yield fold('END:VEVENT')
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,220 @@
+import random
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min
+
+from .models import User, Car, Appointment, Work
+from .reports import rebuild_summary
+from .slots import invalidate_days
+
+"""
+Δημιουργία συνθετικού συνόλου δεδομένων σε κλίμακα παραγωγής (χρήστες, αυτοκίνητα,
+ραντεβού, εργασίες) για μετρήσεις απόδοσης, με bulk_create σε παρτίδες.
+Τα δεδομένα είναι ντετερμινιστικά για δεδομένο seed και αναγνωρίζονται από το
+πρόθεμα των usernames/σειριακών αριθμών. Χρησιμοποιείται από την εντολή
+`manage.py generate_dataset`.
+"""
+
+# Μέγεθος παρτίδας για bulk_create
+BATCH_SIZE = 5000
+
+# Ώρες έναρξης ραντεβού (διάρκεια 2 ώρες, ωράριο 08:00-16:00)
+SLOTS = [time(8, 0), time(10, 0), time(12, 0), time(14, 0)]
+
+# Ημέρες μετά από σήμερα για τις οποίες υπάρχουν ήδη κλεισμένα ραντεβού
+FUTURE_DAYS = 14
+
+FIRST_NAMES = ['Γιώργος', 'Μαρία', 'Νίκος', 'Ελένη', 'Κώστας', 'Αικατερίνη', 'Δημήτρης', 'Σοφία', 'Γιάννης', 'Άννα']
+LAST_NAMES = ['Παπαδόπουλος', 'Νικολάου', 'Γεωργίου', 'Οικονόμου', 'Δημητρίου', 'Ιωάννου', 'Βασιλείου', 'Αλεξίου']
+SPECIALIZATIONS = ['Κινητήρες', 'Ηλεκτρολογικά', 'Φανοποιία', 'Ανάρτηση', 'Φρένα']
+MODELS = {
+    'Toyota': ['Yaris', 'Corolla', 'RAV4'],
+    'Volkswagen': ['Polo', 'Golf', 'Passat'],
+    'Ford': ['Fiesta', 'Focus', 'Kuga'],
+    'Fiat': ['Panda', '500', 'Tipo'],
+    'Peugeot': ['208', '308', '3008'],
+    'Opel': ['Corsa', 'Astra'],
+    'Hyundai': ['i10', 'i20', 'Tucson'],
+    'Skoda': ['Fabia', 'Octavia'],
+}
+CAR_TYPES = ['sedan', 'hatchback', 'suv', 'van']
+FUEL_TYPES = ['petrol', 'diesel', 'lpg', 'hybrid', 'electric']
+WORKS = [
+    ('Αλλαγή λαδιών', 'Λάδι, φίλτρο λαδιού'),
+    ('Αλλαγή τακακιών', 'Τακάκια εμπρός'),
+    ('Διάγνωση βλάβης', '-'),
+    ('Αντικατάσταση μπαταρίας', 'Μπαταρία 60Ah'),
+    ('Ζυγοστάθμιση', 'Βαρίδια'),
+]
+
+
+def batched_create(model, objects, batch_size=BATCH_SIZE):
+    """Δημιουργεί τα αντικείμενα του iterator σε παρτίδες και επιστρέφει το πλήθος τους"""
+    created = 0
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def generate_users(rng, role, count, prefix):
+    for i in range(count):
+        yield User(
+            username=f'{prefix}_{role}_{i}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            email=f'{prefix}_{role}_{i}@example.com',
+            role=role,
+            afm=f'{rng.randrange(10 ** 9):09d}' if role == 'client' else None,
+            specialization=rng.choice(SPECIALIZATIONS) if role == 'mechanic' else None,
+            is_active=True,
+            password='!',  # Χωρίς δυνατότητα σύνδεσης (αποφεύγεται το ακριβό hashing)
+        )
+
+
+def generate_cars(rng, owner_ids, count, prefix):
+    for i in range(count):
+        make = rng.choice(list(MODELS))
+        year = rng.randrange(2000, 2025)
+        yield Car(
+            owner_id=rng.choice(owner_ids),
+            serial_number=f'{prefix.upper()}-{i:07d}',
+            make=make,
+            model=rng.choice(MODELS[make]),
+            type=rng.choice(CAR_TYPES),
+            fuel_type=rng.choice(FUEL_TYPES),
+            doors=rng.choice([3, 5]),
+            wheels=4,
+            production_date=date(year, rng.randrange(1, 13), 1),
+            acquisition_year=year + rng.randrange(0, 3),
+        )
+
+
+def generate_appointments(rng, cars, mechanic_ids, count, works, occupancy, batch_size=BATCH_SIZE):
+    """
+    Δημιουργεί `count` ραντεβού γεμίζοντας τις θέσεις των μηχανικών ανά εργάσιμη ημέρα
+    (ποσοστό πληρότητας `occupancy`), ώστε να μην υπάρχουν επικαλύψεις, και περίπου
+    `works` εργασίες στα ολοκληρωμένα ραντεβού. Τα παλιά ραντεβού είναι ολοκληρωμένα
+    ή ακυρωμένα, τα σημερινά σε εξέλιξη και τα μελλοντικά σε αναμονή.
+    Επιστρέφει (πλήθος ραντεβού, πλήθος εργασιών).
+    """
+    per_day = len(mechanic_ids) * len(SLOTS) * occupancy
+    # Μόνο εργάσιμες ημέρες (Δευτέρα-Παρασκευή). Με μικρή πληρότητα (λιγότερα από ένα ραντεβού
+    # την ημέρα) τα ραντεβού απλώνονται σε περισσότερες ημέρες
+    days = max(int(-(-count // max(per_day, 0.01))), 1) * 7 // 5
+    today = date.today()
+    first_day = today + timedelta(days=FUTURE_DAYS) - timedelta(days=days - 1)
+    completed_share = 0.9 * max(0, min(days, (today - first_day).days)) / days
+    works_per_appointment = works / max(count * completed_share, 1)
+
+    def appointments():
+        remaining = count
+        day = first_day
+        while remaining:
+            if day.weekday() >= 5:
+                day += timedelta(days=1)
+                continue
+            for mechanic_id in mechanic_ids:
+                for hour in SLOTS:
+                    if not remaining:
+                        return
+                    if rng.random() >= occupancy:
+                        continue
+                    car_id, owner_id = rng.choice(cars)
+                    if day < today:
+                        status = 'COMPLETED' if rng.random() < 0.9 else 'CANCELLED'
+                    else:
+                        status = 'IN_PROGRESS' if day == today else 'CREATED'
+                    remaining -= 1
+                    yield Appointment(
+                        client_id=owner_id, car_id=car_id, mechanic_id=mechanic_id,
+                        date=day, hour=hour, status=status,
+                        service_type=rng.choice(['service', 'repair']),
+                    )
+            day += timedelta(days=1)
+
+    def save(batch):
+        # Οι εργασίες χρειάζονται τα id των ραντεβού, άρα δημιουργούνται μετά από αυτά
+        jobs = []
+        for appointment in batch:
+            if appointment.status != 'COMPLETED':
+                continue
+            extra = 1 if rng.random() < works_per_appointment % 1 else 0
+            for _ in range(int(works_per_appointment) + extra):
+                description, materials = rng.choice(WORKS)
+                work = Work(
+                    description=description,
+                    materials=materials,
+                    completion_time=timedelta(minutes=rng.choice([30, 60, 90, 120])),
+                    cost=Decimal(rng.randrange(2000, 40000)) / 100,
+                )
+                appointment.total_cost += work.cost
+                appointment.labour_duration += work.completion_time
+                jobs.append((appointment, work))
+        with transaction.atomic():
+            Appointment.objects.bulk_create(batch)
+            for appointment, work in jobs:
+                work.appointment = appointment
+            Work.objects.bulk_create([work for _, work in jobs])
+        return len(jobs)
+
+    created_appointments = created_works = 0
+    batch = []
+    for appointment in appointments():
+        appointment.total_cost = Decimal('0.00')
+        appointment.labour_duration = timedelta(0)
+        batch.append(appointment)
+        if len(batch) == batch_size:
+            created_works += save(batch)
+            created_appointments += len(batch)
+            batch = []
+    if batch:
+        created_works += save(batch)
+        created_appointments += len(batch)
+    return created_appointments, created_works
+
+
+def generate_dataset(clients, mechanics, secretaries, cars, appointments, works,
+                     occupancy=0.8, prefix='gen', seed=0, log=None):
+    """
+    Δημιουργεί το σύνολο δεδομένων και επιστρέφει dict με τα πλήθη ανά μοντέλο.
+    Το log (προαιρετικό) καλείται με μήνυμα προόδου μετά από κάθε βήμα.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    counts = {}
+
+    for role, count in [('client', clients), ('mechanic', mechanics), ('secretary', secretaries)]:
+        counts[role] = batched_create(User, generate_users(rng, role, count, prefix))
+        log(f"{role}: {counts[role]}")
+
+    owner_ids = list(User.objects.filter(username__startswith=f'{prefix}_client_').values_list('pk', flat=True))
+    counts['car'] = batched_create(Car, generate_cars(rng, owner_ids, cars, prefix))
+    log(f"car: {counts['car']}")
+
+    car_pairs = list(Car.objects.filter(serial_number__startswith=f'{prefix.upper()}-').values_list('pk', 'owner_id'))
+    mechanic_ids = list(User.objects.filter(username__startswith=f'{prefix}_mechanic_').values_list('pk', flat=True))
+    counts['appointment'], counts['work'] = generate_appointments(
+        rng, car_pairs, mechanic_ids, appointments, works, occupancy,
+    )
+    log(f"appointment: {counts['appointment']}, work: {counts['work']}")
+
+    # Το bulk_create δεν στέλνει signals, άρα τα ημερήσια σύνολα υπολογίζονται στο τέλος
+    # και οι ελεύθερες θέσεις των ημερών διαγράφονται από την cache
+    days = Appointment.objects.aggregate(first=Min('date'), last=Max('date'))
+    if days['first'] is not None:
+        counts['daily_summary'] = rebuild_summary(days['first'], days['last'])
+        span = (days['last'] - days['first']).days
+        invalidate_days(*(days['first'] + timedelta(days=offset) for offset in range(span + 1)))
+    return counts
@@ -1,23 +1,32 @@
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 from functools import wraps
 
+def check_role(user, allowed_roles):
+    """Σηκώνει PermissionDenied αν ο χρήστης δεν είναι συνδεδεμένος ή δεν έχει επιτρεπόμενο ρόλο"""
+    if not user.is_authenticated:
+        raise PermissionDenied("Απαιτείται σύνδεση.")
+    # Γραμματέας έχει πάντα πρόσβαση, οι άλλοι ρόλοι ελέγχονται
+    if user.role != 'secretary' and user.role not in allowed_roles:
+        raise PermissionDenied("Δεν έχετε δικαίωμα πρόσβασης.")
+
 def role_required(allowed_roles):
     """
     Decorator που επιτρέπει πρόσβαση μόνο αν ο χρήστης έχει ρόλο μέσα στο allowed_roles.
     Ο γραμματέας (secretary) έχει πάντα πρόσβαση ανεξαρτήτως.
+    Σε async views ο χρήστης φορτώνεται με request.auser(), χωρίς σύγχρονο query μέσα στο event loop.
     """
     def decorator(view_func):
-        @wraps(view_func)
-        def wrapper(request, *args, **kwargs):
-            if not request.user.is_authenticated:
-                raise PermissionDenied("Απαιτείται σύνδεση.")
-            # Γραμματέας έχει πάντα πρόσβαση
-            if request.user.role == 'secretary':
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                check_role(await request.auser(), allowed_roles)
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                check_role(request.user, allowed_roles)
                 return view_func(request, *args, **kwargs)
-            # Άλλοι ρόλοι ελέγχονται
-            if request.user.role not in allowed_roles:
-                raise PermissionDenied("Δεν έχετε δικαίωμα πρόσβασης.")
-            return view_func(request, *args, **kwargs)
         return wrapper
     return decorator
 
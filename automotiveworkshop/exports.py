@@ -0,0 +1,137 @@
+import csv
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import User, Car, Appointment, ArchivedAppointment
+from .imports import CAR_FIELDS
+
+"""
+Εξαγωγή ραντεβού, αυτοκινήτων και χρηστών σε CSV για το λογιστήριο.
+Οι γραμμές διαβάζονται με values_list().iterator(chunk_size=...) (τα στοιχεία πελάτη,
+αυτοκινήτου και μηχανικού με JOIN στο ίδιο query) και στέλνονται σε τμήματα μέσω
+StreamingHttpResponse, οπότε η λήψη ξεκινά αμέσως και η μνήμη δεν εξαρτάται από το
+πλήθος των εγγραφών. Οι επικεφαλίδες αυτοκινήτων και χρηστών είναι αυτές που διαβάζει
+η εισαγωγή (imports.py), ώστε ένα αρχείο εξαγωγής να μπορεί να εισαχθεί ξανά.
+Τα αρχειοθετημένα ραντεβού (βλ. archive.py) εξάγονται χωριστά, με τις ίδιες στήλες.
+"""
+
+# Πλήθος εγγραφών ανά ανάγνωση από τη βάση
+EXPORT_CHUNK_SIZE = 500
+
+# Πλήθος γραμμών CSV ανά τμήμα της απόκρισης
+LINES_PER_CHUNK = 500
+
+# Αρχικοί χαρακτήρες με τους οποίους το Excel ερμηνεύει ένα κελί ως τύπο
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """Αντικείμενο «αρχείου» για το csv.writer που επιστρέφει ό,τι γράφεται αντί να το κρατά"""
+
+    def write(self, value):
+        return value
+
+
+class CSVExport:
+    """
+    Ορισμός εξαγωγής: queryset, στήλες (επικεφαλίδα, πεδίο για το values_list), πεδίο
+    ημερομηνίας για το φίλτρο διαστήματος και πεδίο/τιμές για το φίλτρο κατάστασης.
+    """
+
+    def __init__(self, name, queryset, columns, date_field, status_field=None, statuses=None):
+        self.name = name
+        self.queryset = queryset
+        self.columns = columns
+        self.date_field = date_field
+        self.status_field = status_field
+        self.statuses = statuses or {}
+
+    def rows(self, start=None, end=None, status=None):
+        """Οι γραμμές της εξαγωγής (tuples με τη σειρά των στηλών) για τα φίλτρα"""
+        queryset = self.queryset
+        if start is not None:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start})
+        if end is not None:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': end})
+        if status is not None:
+            queryset = queryset.filter(**{self.status_field: self.statuses[status]})
+        return queryset.values_list(*[field for _, field in self.columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def lines(self, start=None, end=None, status=None):
+        """Το CSV σε τμήματα κειμένου (για StreamingHttpResponse), με BOM για το Excel"""
+        writer = csv.writer(Echo())
+        yield '\ufeff' + writer.writerow([header for header, _ in self.columns])
+        chunk = []
+        for row in self.rows(start, end, status):
+            chunk.append(writer.writerow([format_value(value) for value in row]))
+            if len(chunk) == LINES_PER_CHUNK:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat(timespec='seconds')
+    if isinstance(value, timedelta):
+        return int(value.total_seconds() // 60)
+    # Κείμενο χρήστη (π.χ. περιγραφή προβλήματος) δεν πρέπει να εκτελεστεί ως τύπος στο λογιστικό φύλλο
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# Στήλες των ραντεβού (και του αρχείου ραντεβού)
+APPOINTMENT_COLUMNS = [
+    ('id', 'pk'), ('date', 'date'), ('hour', 'hour'), ('status', 'status'),
+    ('service_type', 'service_type'), ('problem_description', 'problem_description'),
+    ('client_username', 'client__username'), ('client_first_name', 'client__first_name'),
+    ('client_last_name', 'client__last_name'), ('client_at', 'client__afm'),
+    ('car_serial_number', 'car__serial_number'), ('car_make', 'car__make'), ('car_model', 'car__model'),
+    ('mechanic_username', 'mechanic__username'), ('total_cost', 'total_cost'),
+    ('labour_minutes', 'labour_duration'), ('created', 'creation_date'),
+]
+
+
+EXPORTS = {
+    export.name: export for export in [
+        CSVExport(
+            'appointments',
+            Appointment.objects.order_by('date', 'hour', 'pk'),
+            APPOINTMENT_COLUMNS,
+            date_field='date',
+            status_field='status',
+            statuses={status: status for status, _ in Appointment.STATUS_CHOICES},
+        ),
+        CSVExport(
+            'archived_appointments',
+            ArchivedAppointment.objects.order_by('date', 'hour', 'pk'),
+            APPOINTMENT_COLUMNS,
+            date_field='date',
+            status_field='status',
+            statuses={status: status for status, _ in Appointment.STATUS_CHOICES},
+        ),
+        CSVExport(
+            'cars',
+            Car.objects.order_by('pk'),
+            [('owner_username', 'owner__username')] + [(name, name) for name in CAR_FIELDS],
+            date_field='production_date',
+        ),
+        CSVExport(
+            'users',
+            User.objects.order_by('pk'),
+            [
+                ('username', 'username'), ('first_name', 'first_name'), ('last_name', 'last_name'),
+                ('email', 'email'), ('role', 'role'), ('at', 'afm'), ('address', 'address'),
+                ('specialization', 'specialization'), ('is_active', 'is_active'), ('date_joined', 'date_joined'),
+            ],
+            date_field='date_joined__date',
+            status_field='is_active',
+            statuses={'active': True, 'inactive': False},
+        ),
+    ]
+}
@@ -4,6 +4,7 @@ from datetime import time
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
 from .models import User, Car, Appointment, Work
+from .transitions import MAX_TRANSITION_SIZE
 
 # Χρησιμοποιούμε το ενεργό μοντέλο User του Django
 User = get_user_model()
@@ -60,7 +61,7 @@ class AppointmentForm(forms.ModelForm):
     """
     class Meta:
         model = Appointment
-        exclude = ['mechanic', 'creation_date', 'status', 'total_cost']
+        exclude = ['mechanic', 'creation_date', 'status', 'total_cost', 'labour_duration']
 
     def clean_hour(self):
         """
@@ -82,6 +83,47 @@ class AppointmentForm(forms.ModelForm):
         return cleaned_data
 
 
+class BatchAppointmentForm(AppointmentForm):
+    """
+    Φόρμα για το μαζικό JSON API (βλ. batch.py) με τους ίδιους κανόνες με την AppointmentForm.
+    Ο πελάτης και το αυτοκίνητο ελέγχονται από το batch.py με ένα query για όλη την παρτίδα,
+    αντί για ένα query ανά ραντεβού.
+    """
+    class Meta(AppointmentForm.Meta):
+        exclude = AppointmentForm.Meta.exclude + ['client', 'car']
+
+
+class AppointmentStatusForm(forms.ModelForm):
+    """Φόρμα αλλαγής κατάστασης ραντεβού (ίδια με αυτή του AppointmentStatusUpdateView)"""
+    class Meta:
+        model = Appointment
+        fields = ['status']
+
+
+class AppointmentIdsField(forms.Field):
+    """Λίστα από id ραντεβού (πολλαπλές τιμές με το ίδιο όνομα, π.χ. checkboxes)"""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(pk) for pk in value]
+        except (TypeError, ValueError):
+            raise ValidationError("Μη έγκυρο id ραντεβού.")
+
+    def validate(self, value):
+        super().validate(value)
+        if len(value) > MAX_TRANSITION_SIZE:
+            raise ValidationError(f"Μπορείτε να επιλέξετε έως {MAX_TRANSITION_SIZE} ραντεβού.")
+
+
+class BulkStatusForm(forms.Form):
+    """Μαζική αλλαγή κατάστασης: τα επιλεγμένα ραντεβού και η νέα κατάσταση"""
+    ids = AppointmentIdsField(error_messages={'required': "Επιλέξτε τουλάχιστον ένα ραντεβού."})
+    status = forms.ChoiceField(choices=Appointment.STATUS_CHOICES, label="Νέα κατάσταση")
+
+
 class WorkForm(forms.ModelForm):
     """
     Φόρμα για καταχώρηση εργασιών που πραγματοποιήθηκαν σε ένα ραντεβού.
@@ -0,0 +1,78 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+"""
+Cache των τμημάτων σελίδων ανά χρήστη (τα αυτοκίνητά μου, τα ραντεβού μου,
+τα ανατεθειμένα ραντεβού), με το {% cache %} του Django και κλειδί το id του χρήστη
+και τη γενιά (generation) των τμημάτων του. Σε επιτυχία cache η σελίδα δεν εκτελεί
+κανένα query για τη λίστα.
+Τα signals (βλ. signals.py) δίνουν νέα γενιά μόνο στους χρήστες που επηρεάζονται, αφού
+ολοκληρωθεί το transaction. Ένα αίτημα διαβάζει τη γενιά πριν από τα δεδομένα, οπότε ένα
+τμήμα με δεδομένα πριν από το commit αποθηκεύεται στην παλιά γενιά και δεν διαβάζεται ποτέ.
+"""
+
+# Χρόνος ζωής ενός τμήματος (δίχτυ ασφαλείας για αλλαγές που δεν στέλνουν signals, π.χ. bulk update)
+FRAGMENT_TIMEOUT = 600
+
+MY_CARS = 'my_cars'
+MY_APPOINTMENTS = 'my_appointments'
+MY_ASSIGNED_APPOINTMENTS = 'my_assigned_appointments'
+
+
+def fragment_key(name, user_id, generation):
+    """Κλειδί cache του τμήματος, ίδιο με αυτό του {% cache ... name user.pk fragment_generation %}"""
+    return make_template_fragment_key(name, [user_id, generation])
+
+
+def generation_key(name, user_id):
+    return f'fragment_generation:{name}:{user_id}'
+
+
+async def afragment_generation(name, user_id):
+    """Η τρέχουσα γενιά του τμήματος του χρήστη (νέα, αν δεν υπάρχει στην cache)"""
+    key = generation_key(name, user_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, uuid4().hex, timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def new_generation(name, *user_ids):
+    """Δίνει νέα γενιά στα τμήματα των χρηστών: τα αποθηκευμένα τμήματα δεν διαβάζονται πια"""
+    cache.set_many({generation_key(name, user_id): uuid4().hex for user_id in user_ids}, timeout=None)
+
+
+def invalidate(name, *user_ids):
+    """Ακυρώνει το τμήμα για τους χρήστες μετά το commit του τρέχοντος transaction"""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        transaction.on_commit(lambda: new_generation(name, *user_ids))
+
+
+class CachedFragmentMixin:
+    """
+    Mixin για views λίστας (AsyncListView) με τμήμα στην cache: δίνει στο template τον χρόνο
+    ζωής και τη γενιά του τμήματος και δεν φορτώνει τη λίστα όταν το τμήμα `fragment_name` υπάρχει ήδη.
+    """
+    fragment_name = None
+    fragment_generation = None
+
+    async def aget_object_list(self, queryset):
+        # Η γενιά διαβάζεται πριν από τη λίστα: αν στο μεταξύ γίνει commit, το τμήμα που θα
+        # αποδοθεί με τα παλιά δεδομένα αποθηκεύεται στην παλιά γενιά
+        self.fragment_generation = await afragment_generation(self.fragment_name, self.request.user.pk)
+        if await cache.ahas_key(fragment_key(self.fragment_name, self.request.user.pk, self.fragment_generation)):
+            # Το template δεν διαβάζει τη λίστα. Αν το τμήμα λήξει στο μεταξύ, το queryset
+            # εκτελείται κατά την απόδοση του template (σε thread, όχι στο event loop)
+            return queryset
+        return await super().aget_object_list(queryset)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['fragment_timeout'] = FRAGMENT_TIMEOUT
+        context['fragment_generation'] = self.fragment_generation
+        return context
@@ -0,0 +1,337 @@
+import codecs
+import csv
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import UserManager
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import User, Car, ImportJob
+
+"""
+Μαζική εισαγωγή δεδομένων από CSV.
+Το αρχείο διαβάζεται σε τμήματα (chunks) και αποκωδικοποιείται σταδιακά, ώστε
+η μνήμη να μην εξαρτάται από το μέγεθός του. Οι γραμμές επεξεργάζονται σε παρτίδες: ο έλεγχος εγκυρότητας γίνεται στη μνήμη,
+ο κατακερματισμός των κωδικών σε πολλές διεργασίες και η εισαγωγή με bulk_create
+μέσα σε ένα transaction ανά παρτίδα.
+Τα μεγάλα αρχεία εισάγονται στο παρασκήνιο ως ImportJob από την εντολή
+`manage.py process_import_jobs`.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Πλήθος γραμμών ανά παρτίδα (ένα transaction ανά παρτίδα)
+BATCH_SIZE = 500
+
+# Κάτω από αυτό το πλήθος κωδικών ο κατακερματισμός γίνεται σειριακά,
+# αφού το κόστος εκκίνησης των διεργασιών είναι μεγαλύτερο από το όφελος
+PARALLEL_HASH_THRESHOLD = 20
+
+# Τέλη γραμμής του CSV
+LINE_END = re.compile(r'\r\n|\r|\n')
+
+# Μέγιστο μήκος γραμμής, ώστε ένα αρχείο χωρίς αναγνωρίσιμα τέλη γραμμής να μη φορτώνεται ολόκληρο
+MAX_LINE_LENGTH = 1024 * 1024
+
+USER_ROLES = {role for role, _ in User.ROLE_CHOICES}
+
+# Πεδία αυτοκινήτου που διαβάζονται από το CSV (εκτός από τον ιδιοκτήτη)
+CAR_FIELDS = [
+    'serial_number', 'model', 'make', 'type', 'fuel_type',
+    'doors', 'wheels', 'production_date', 'acquisition_year',
+]
+
+
+class ImportReport:
+    """Αποτέλεσμα εισαγωγής: πλήθος νέων εγγραφών και οι γραμμές που παραλείφθηκαν με την αιτία"""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = []
+
+    def skip(self, line, key, reason):
+        self.skipped.append({'line': line, 'key': key, 'reason': reason})
+
+
+def iter_lines(uploaded_file, encoding='utf-8-sig'):
+    """
+    Διαβάζει το ανεβασμένο αρχείο ανά chunk και επιστρέφει μία-μία τις γραμμές κειμένου.
+    Ο αποκωδικοποιητής είναι σταδιακός, οπότε χαρακτήρες που κόβονται ανάμεσα σε δύο
+    chunks αποκωδικοποιούνται σωστά. Το utf-8-sig αφαιρεί το BOM που προσθέτει το Excel.
+    Αναγνωρίζονται τα τέλη γραμμής LF, CRLF και CR (παλιά αρχεία Mac) και επιστρέφονται ως LF.
+    Μια γραμμή μεγαλύτερη από MAX_LINE_LENGTH χαρακτήρες δίνει csv.Error.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in uploaded_file.chunks():
+        pending += decoder.decode(chunk)
+        # Ένα \r στο τέλος του chunk μπορεί να είναι το μισό ενός \r\n
+        end = len(pending) - 1 if pending.endswith('\r') else len(pending)
+        *lines, rest = LINE_END.split(pending[:end])
+        pending = rest + pending[end:]
+        if len(pending) > MAX_LINE_LENGTH:
+            raise csv.Error(f"Γραμμή μεγαλύτερη από {MAX_LINE_LENGTH} χαρακτήρες.")
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    for line in LINE_END.split(pending):
+        if line:
+            yield line + '\n'
+
+
+def read_csv(uploaded_file):
+    """Επιστρέφει csv.DictReader που διαβάζει το αρχείο γραμμή-γραμμή χωρίς να το φορτώνει ολόκληρο"""
+    return csv.DictReader(iter_lines(uploaded_file))
+
+
+def batches(iterable, size):
+    """Χωρίζει ένα iterable σε λίστες των `size` στοιχείων"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def save_batch(model, objects, processed, report, on_batch=None, prepare=None):
+    """
+    Εισάγει μια παρτίδα με bulk_create σε δικό της transaction.
+    Το prepare(objects), αν δοθεί, καλείται μέσα στο transaction πριν την εισαγωγή και
+    επιστρέφει τις εγγραφές που θα εισαχθούν (π.χ. χωρίς όσες δημιουργήθηκαν στο μεταξύ).
+    Το on_batch(processed, report) καλείται μέσα στο ίδιο transaction, ώστε η καταγραφή
+    προόδου να αποθηκεύεται μαζί με τις εγγραφές (δυνατότητα συνέχισης μετά από διακοπή).
+    """
+    if not objects and on_batch is None:
+        return
+    with transaction.atomic():
+        if objects and prepare is not None:
+            objects = prepare(objects)
+        if objects:
+            model.objects.bulk_create(objects)
+            report.created += len(objects)
+        if on_batch is not None:
+            on_batch(processed, report)
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """Κατακερματίζει τους κωδικούς, παράλληλα αν δοθεί pool με `workers` διεργασίες"""
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(rows, workers=None, first_line=2, on_batch=None):
+    """
+    Εισάγει χρήστες από γραμμές CSV (dict ανά γραμμή).
+    - Τα υπάρχοντα usernames φορτώνονται μία φορά σε set
+    - Οι κωδικοί κατακερματίζονται σε pool διεργασιών (workers, προεπιλογή: πλήθος CPU)
+    - Οι εγγραφές εισάγονται με bulk_create σε transaction ανά παρτίδα. Μέσα στο transaction
+      ελέγχονται ξανά τα usernames, ώστε όσα δημιουργήθηκαν στο μεταξύ (π.χ. από εγγραφή
+      χρήστη ή ταυτόχρονη εισαγωγή) να καταγράφονται ως παραλειπόμενα
+    Το first_line είναι ο αριθμός γραμμής της πρώτης γραμμής δεδομένων (για τα μηνύματα)
+    και το on_batch καλείται μετά από κάθε παρτίδα (βλ. save_batch).
+    Επιστρέφει ImportReport με τις γραμμές που παραλείφθηκαν και την αιτία.
+    """
+    report = ImportReport()
+    existing = set(User.objects.values_list('username', flat=True))
+    workers = workers or os.cpu_count() or 1
+
+    processed = 0
+    with ExitStack() as stack:
+        pool = None
+        for batch in batches(enumerate(rows, start=first_line), BATCH_SIZE):
+            users = []
+            passwords = []
+            lines = {}  # username -> γραμμή
+            for line, row in batch:
+                username = User.normalize_username((row.get('username') or '').strip())
+                password = row.get('password') or ''
+                role = row.get('role') or 'client'
+
+                if not username:
+                    report.skip(line, username, "Λείπει το username.")
+                    continue
+                if username in existing:
+                    report.skip(line, username, "Ο χρήστης υπάρχει ήδη.")
+                    continue
+                if not password:
+                    report.skip(line, username, "Λείπει ο κωδικός.")
+                    continue
+                if role not in USER_ROLES:
+                    report.skip(line, username, f"Άγνωστος ρόλος '{role}'.")
+                    continue
+
+                existing.add(username)
+                lines[username] = line
+                passwords.append(password)
+                users.append(User(
+                    username=username,
+                    first_name=row.get('first_name', ''),
+                    last_name=row.get('last_name', ''),
+                    email=UserManager.normalize_email(row.get('email', '')),
+                    role=role,
+                    afm=row.get('at', ''),
+                    address=row.get('address', ''),
+                    specialization=row.get('specialization', ''),
+                    is_active=True,
+                ))
+
+            if pool is None and workers > 1 and len(passwords) >= PARALLEL_HASH_THRESHOLD:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=django.setup))
+            for user, hashed in zip(users, hash_passwords(passwords, pool, workers)):
+                user.password = hashed
+
+            def drop_existing(users):
+                taken = set(
+                    User.objects.filter(username__in=[user.username for user in users])
+                    .values_list('username', flat=True)
+                )
+                for username in sorted(taken, key=lines.get):
+                    report.skip(lines[username], username, "Ο χρήστης υπάρχει ήδη.")
+                return [user for user in users if user.username not in taken]
+
+            processed += len(batch)
+            save_batch(User, users, processed, report, on_batch, prepare=drop_existing)
+    return report
+
+
+def import_cars(rows, first_line=2, on_batch=None):
+    """
+    Εισάγει αυτοκίνητα από γραμμές CSV (dict ανά γραμμή).
+    - Οι υπάρχοντες σειριακοί αριθμοί φορτώνονται μία φορά σε set
+    - Οι ιδιοκτήτες κάθε παρτίδας βρίσκονται με ένα query και κρατούνται σε cache
+    - Οι τιμές ελέγχονται στη μνήμη με τους κανόνες των πεδίων του μοντέλου
+    - Οι εγγραφές εισάγονται με bulk_create σε transaction ανά παρτίδα. Μέσα στο transaction
+      ελέγχονται ξανά οι σειριακοί αριθμοί, ώστε όσοι εισήχθησαν στο μεταξύ (π.χ. από
+      ταυτόχρονη εισαγωγή) να καταγράφονται ως παραλειπόμενοι
+    Τα first_line και on_batch έχουν την ίδια σημασία με την import_users.
+    Επιστρέφει ImportReport με τις γραμμές που απορρίφθηκαν και την αιτία.
+    """
+    report = ImportReport()
+    existing = set(Car.objects.values_list('serial_number', flat=True))
+    owners = {}  # username -> id πελάτη (None αν δεν υπάρχει)
+    fields = [Car._meta.get_field(name) for name in CAR_FIELDS]
+
+    processed = 0
+    for batch in batches(enumerate(rows, start=first_line), BATCH_SIZE):
+        missing = {row.get('owner_username') for _, row in batch} - owners.keys()
+        if missing:
+            found = dict(
+                User.objects.filter(username__in=missing, role='client').values_list('username', 'id')
+            )
+            owners.update({username: found.get(username) for username in missing})
+
+        cars = []
+        lines = {}  # σειριακός αριθμός -> γραμμή
+        for line, row in batch:
+            key = row.get('serial_number') or ''
+            owner_id = owners.get(row.get('owner_username'))
+            if owner_id is None:
+                report.skip(line, key, f"Δεν βρέθηκε πελάτης '{row.get('owner_username') or ''}'.")
+                continue
+            values, errors = {}, []
+            for field in fields:
+                try:
+                    values[field.name] = field.clean(row.get(field.name), None)
+                except ValidationError as exc:
+                    errors.append(f"{field.verbose_name}: {' '.join(exc.messages)}")
+            if errors:
+                report.skip(line, key, ' '.join(errors))
+                continue
+            if values['serial_number'] in existing:
+                report.skip(line, key, "Υπάρχει ήδη αυτοκίνητο με αυτόν τον σειριακό αριθμό.")
+                continue
+
+            existing.add(values['serial_number'])
+            lines[values['serial_number']] = line
+            cars.append(Car(owner_id=owner_id, **values))
+
+        def drop_existing(cars):
+            taken = set(
+                Car.objects.filter(serial_number__in=[car.serial_number for car in cars])
+                .values_list('serial_number', flat=True)
+            )
+            for serial_number in sorted(taken, key=lines.get):
+                report.skip(lines[serial_number], serial_number, "Υπάρχει ήδη αυτοκίνητο με αυτόν τον σειριακό αριθμό.")
+            return [car for car in cars if car.serial_number not in taken]
+
+        processed += len(batch)
+        save_batch(Car, cars, processed, report, on_batch, prepare=drop_existing)
+    return report
+
+
+IMPORTERS = {
+    'users': import_users,
+    'cars': import_cars,
+}
+
+# Μέγιστο πλήθος σφαλμάτων που αποθηκεύονται σε κάθε ImportJob
+MAX_JOB_ERRORS = 1000
+
+
+def claim_import_job(stale_after):
+    """
+    Δεσμεύει την επόμενη εργασία εισαγωγής για εκτέλεση: μια εργασία σε αναμονή ή μια
+    εργασία σε εξέλιξη που δεν έχει ενημερωθεί για `stale_after` (π.χ. λόγω κατάρρευσης worker).
+    Η δέσμευση γίνεται με υπό όρους UPDATE, ώστε δύο workers να μην πάρουν την ίδια εργασία.
+    """
+    claimable = Q(status='PENDING') | Q(status='RUNNING', updated_at__lt=timezone.now() - stale_after)
+    for pk in ImportJob.objects.filter(claimable).order_by('pk').values_list('pk', flat=True)[:10]:
+        claimed = ImportJob.objects.filter(claimable, pk=pk).update(status='RUNNING', updated_at=timezone.now())
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def run_import_job(job):
+    """
+    Εκτελεί μια εργασία εισαγωγής συνεχίζοντας από τη γραμμή που είχε φτάσει.
+    Η πρόοδος αποθηκεύεται στο ίδιο transaction με κάθε παρτίδα εγγραφών.
+    """
+    start = job.rows_processed
+    created = job.rows_created
+    skipped = job.rows_skipped
+    errors = list(job.errors)
+
+    def save_progress(processed, report):
+        nonlocal skipped
+        skipped += len(report.skipped)
+        errors.extend(report.skipped[:max(0, MAX_JOB_ERRORS - len(errors))])
+        report.skipped.clear()  # Σταθερή μνήμη για αρχεία με πολλά σφάλματα
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_processed=start + processed,
+            rows_created=created + report.created,
+            rows_skipped=skipped,
+            errors=errors,
+            updated_at=timezone.now(),
+        )
+
+    try:
+        with job.csv_file.open('rb'):
+            rows = islice(read_csv(job.csv_file), start, None)
+            IMPORTERS[job.kind](rows, first_line=start + 2, on_batch=save_progress)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        finish_import_job(job, 'FAILED', f"Μη έγκυρο αρχείο CSV: {exc}")
+        return
+    except Exception as exc:
+        logger.exception("Import job %s failed", job.pk)
+        finish_import_job(job, 'FAILED', str(exc))
+        return
+
+    finish_import_job(job, 'DONE')
+
+
+def finish_import_job(job, status, message=''):
+    """Ολοκληρώνει την εργασία με την τελική κατάσταση και διαγράφει το ανεβασμένο αρχείο"""
+    job.csv_file.delete(save=False)
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=status, message=message, csv_file='', updated_at=timezone.now(),
+    )
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from automotiveworkshop.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archivable, archive_appointments, archive_cutoff
+
+
+class Command(BaseCommand):
+    """
+    Αρχειοθέτηση ολοκληρωμένων/ακυρωμένων ραντεβού παλιότερων από μια ηλικία.
+    Παράδειγμα: python manage.py archive_appointments --days 365 --batch-size 1000
+    Κάθε παρτίδα είναι ξεχωριστό transaction, οπότε η εντολή μπορεί να διακοπεί και να ξανατρέξει.
+    """
+    help = "Μεταφέρει τα παλιά κλεισμένα ραντεβού και τις εργασίες τους στο αρχείο."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=ARCHIVE_AFTER_DAYS,
+            help="Αρχειοθετούνται τα ραντεβού με ημερομηνία παλιότερη από τόσες ημέρες.",
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Μόνο εμφάνιση του πλήθους.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError("Το --days δεν μπορεί να είναι αρνητικό.")
+        if options['batch_size'] < 1:
+            raise CommandError("Το --batch-size πρέπει να είναι θετικό.")
+
+        cutoff = archive_cutoff(options['days'])
+        if options['dry_run']:
+            self.stdout.write(f"Ραντεβού πριν από {cutoff} για αρχειοθέτηση: {archivable(cutoff).count()}")
+            return
+
+        started = time.perf_counter()
+        appointments, works = archive_appointments(cutoff, options['batch_size'], log=self.stdout.write)
+        self.stdout.write(
+            f"Πριν από {cutoff}: {appointments} ραντεβού και {works} εργασίες στο αρχείο "
+            f"σε {time.perf_counter() - started:.1f}s."
+        )
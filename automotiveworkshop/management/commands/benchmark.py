@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from automotiveworkshop.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    """
+    Εκτέλεση σεναρίων μέτρησης απόδοσης.
+    Παράδειγμα: python manage.py benchmark availability --sizes 10,100,500
+    Αν κάποια γραμμή έχει ok=False η εντολή τερματίζει με σφάλμα.
+    Με --json τα αποτελέσματα αποθηκεύονται και σε αρχείο JSON για σύγκριση μεταξύ εκτελέσεων.
+    """
+    help = "Εκτελεί σενάρια μέτρησης απόδοσης (queries και χρόνος)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument(
+            '--sizes',
+            default='10,100,500',
+            help="Μεγέθη δεδομένων χωρισμένα με κόμμα.",
+        )
+        parser.add_argument('--json', metavar='PATH', help="Αρχείο JSON για τα αποτελέσματα ('-' για stdout).")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        started = datetime.now()
+        rows = SCENARIOS[options['scenario']](sizes)
+
+        if options['json']:
+            report = {
+                'scenario': options['scenario'],
+                'sizes': sizes,
+                'started': started.isoformat(timespec='seconds'),
+                'database': {'vendor': connection.vendor, 'name': str(connection.settings_dict['NAME'])},
+                'rows': rows,
+            }
+            if options['json'] == '-':
+                self.stdout.write(json.dumps(report, indent=2, default=str))
+            else:
+                with open(options['json'], 'w', encoding='utf-8') as output:
+                    json.dump(report, output, indent=2, default=str)
+
+        if rows and options['json'] != '-':
+            # Εμφάνιση αποτελεσμάτων σε μορφή πίνακα
+            columns = list(rows[0])
+            widths = [max(len(str(col)), *(len(str(row.get(col, ''))) for row in rows)) for col in columns]
+            self.stdout.write('  '.join(str(col).rjust(w) for col, w in zip(columns, widths)))
+            for row in rows:
+                self.stdout.write('  '.join(str(row.get(col, '')).rjust(w) for col, w in zip(columns, widths)))
+
+        failed = [row for row in rows if row.get('ok') is False]
+        if failed:
+            raise CommandError(f"{len(failed)} έλεγχοι απέτυχαν.")
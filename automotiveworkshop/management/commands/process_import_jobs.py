@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from automotiveworkshop.imports import claim_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    """
+    Worker που εκτελεί τις εργασίες εισαγωγής CSV στο παρασκήνιο.
+    Παράδειγμα: python manage.py process_import_jobs
+    Εργασίες που έμειναν σε εξέλιξη από worker που κατέρρευσε συνεχίζονται
+    από την τελευταία αποθηκευμένη παρτίδα.
+    """
+    help = "Εκτελεί τις εργασίες εισαγωγής CSV που βρίσκονται σε αναμονή."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Τερματισμός όταν αδειάσει η ουρά.")
+        parser.add_argument('--interval', type=float, default=5, help="Δευτερόλεπτα αναμονής όταν η ουρά είναι άδεια.")
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=900,
+            help="Δευτερόλεπτα χωρίς πρόοδο μετά τα οποία μια εργασία σε εξέλιξη θεωρείται εγκαταλελειμμένη.",
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after'])
+        while True:
+            job = claim_import_job(stale_after)
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f"Εκτέλεση: {job}")
+            run_import_job(job)
+            job.refresh_from_db()
+            self.stdout.write(
+                f"{job}: {job.rows_created} νέες εγγραφές, {job.rows_skipped} γραμμές παραλείφθηκαν."
+            )
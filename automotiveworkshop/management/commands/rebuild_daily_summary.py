@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from automotiveworkshop.models import Appointment, ArchivedAppointment
+from automotiveworkshop.reports import rebuild_summary
+
+
+class Command(BaseCommand):
+    """
+    Επανυπολογισμός των ημερήσιων συνόλων (DailySummary) για ένα διάστημα ημερών.
+    Παράδειγμα: python manage.py rebuild_daily_summary --start 2026-10-01 --end 2026-10-31
+    Χωρίς ημερομηνίες υπολογίζεται όλο το διάστημα των ραντεβού (και του αρχείου).
+    """
+    help = "Ξαναϋπολογίζει τα ημερήσια σύνολα ραντεβού από τα ραντεβού."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="Πρώτη ημέρα (YYYY-MM-DD).")
+        parser.add_argument('--end', type=date.fromisoformat, help="Τελευταία ημέρα (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        # Όλο το διάστημα των ραντεβού, μαζί με το αρχείο
+        bounds = [
+            model.objects.aggregate(first=Min('date'), last=Max('date'))
+            for model in (Appointment, ArchivedAppointment)
+        ]
+        start = options['start'] or min((bound['first'] for bound in bounds if bound['first']), default=None)
+        end = options['end'] or max((bound['last'] for bound in bounds if bound['last']), default=None)
+        if start is None or end is None:
+            self.stdout.write("Δεν υπάρχουν ραντεβού.")
+            return
+        if start > end:
+            raise CommandError("Η πρώτη ημέρα είναι μετά την τελευταία.")
+
+        rows = rebuild_summary(start, end)
+        self.stdout.write(f"{start} έως {end}: {rows} γραμμές ημερήσιων συνόλων.")
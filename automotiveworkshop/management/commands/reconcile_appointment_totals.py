@@ -0,0 +1,87 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from automotiveworkshop.models import Appointment, ArchivedAppointment, ArchivedWork, Work
+from automotiveworkshop.reports import rebuild_summary
+
+# Πλήθος ραντεβού ανά παρτίδα ελέγχου/διόρθωσης
+BATCH_SIZE = 1000
+
+# Ραντεβού και εργασίες τους: ενεργά και αρχείο
+TABLES = [(Appointment, Work), (ArchivedAppointment, ArchivedWork)]
+
+
+class Command(BaseCommand):
+    """
+    Έλεγχος και διόρθωση των συνόλων κόστους/χρόνου των ραντεβού και του αρχείου ραντεβού.
+    Παράδειγμα: python manage.py reconcile_appointment_totals --dry-run
+    Τα σύνολα ενημερώνονται σταδιακά από τα signals των εργασιών. Αλλαγές που
+    παρακάμπτουν τα signals (bulk_create, update, απευθείας SQL) διορθώνονται εδώ,
+    μαζί με τα ημερήσια σύνολα των ημερών που επηρεάστηκαν.
+    Τα ραντεβού ελέγχονται σε παρτίδες διαδοχικών id, η καθεμία σε δικό της transaction:
+    οι γραμμές της παρτίδας κλειδώνονται πριν από το άθροισμα των εργασιών τους (όπως στα
+    signals), οπότε μια ταυτόχρονη αλλαγή εργασίας δεν χάνεται από τη διόρθωση.
+    """
+    help = "Συγκρίνει total_cost/labour_duration με τις εργασίες κάθε ραντεβού και διορθώνει τις αποκλίσεις."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Μόνο εμφάνιση των αποκλίσεων.")
+
+    def handle(self, *args, **options):
+        checked = drifted = 0
+        for model, work_model in TABLES:
+            last = None
+            while True:
+                with transaction.atomic():
+                    batch, fixed = self.reconcile_batch(model, work_model, last, options)
+                if not batch:
+                    break
+                checked += len(batch)
+                drifted += fixed
+                last = batch[-1].pk
+
+        action = "βρέθηκαν" if options['dry_run'] else "διορθώθηκαν"
+        self.stdout.write(f"Ελέγχθηκαν {checked} ραντεβού, {action} {drifted} αποκλίσεις.")
+
+    def reconcile_batch(self, model, work_model, last, options):
+        """
+        Ελέγχει τα επόμενα BATCH_SIZE ραντεβού μετά το id `last` (καλείται μέσα σε transaction).
+        Επιστρέφει (ραντεβού της παρτίδας, πλήθος αποκλίσεων).
+        """
+        queryset = model.objects.select_for_update().only('date', 'total_cost', 'labour_duration').order_by('pk')
+        if last is not None:
+            queryset = queryset.filter(pk__gt=last)
+        batch = list(queryset[:BATCH_SIZE])
+        if not batch:
+            return batch, 0
+
+        # Σύνολα από τις εργασίες των ραντεβού της παρτίδας, ένα GROUP BY
+        sums = {
+            row['appointment_id']: (row['cost'], row['duration'])
+            for row in work_model.objects.filter(appointment_id__gte=batch[0].pk, appointment_id__lte=batch[-1].pk)
+            .order_by().values('appointment_id').annotate(cost=Sum('cost'), duration=Sum('completion_time'))
+        }
+        empty = (Decimal('0.00'), timedelta(0))
+
+        drifted = []
+        for appointment in batch:
+            cost, duration = sums.get(appointment.pk, empty)
+            if appointment.total_cost != cost or appointment.labour_duration != duration:
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f"{model.__name__} #{appointment.pk}: {appointment.total_cost} -> {cost}, "
+                        f"{appointment.labour_duration} -> {duration}"
+                    )
+                appointment.total_cost = cost
+                appointment.labour_duration = duration
+                drifted.append(appointment)
+
+        if drifted and not options['dry_run']:
+            model.objects.bulk_update(drifted, ['total_cost', 'labour_duration'])
+            days = [appointment.date for appointment in drifted]
+            rebuild_summary(min(days), max(days))
+        return batch, len(drifted)
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['mechanic', 'date', 'hour'], name='appt_mechanic_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['client', 'date', 'hour'], name='appt_client_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'status', 'hour'], name='appt_date_status_idx'),
+        ),
+    ]
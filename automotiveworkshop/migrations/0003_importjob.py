@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0002_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('users', 'Χρήστες'), ('cars', 'Αυτοκίνητα')], max_length=10, verbose_name='Είδος')),
+                ('csv_file', models.FileField(blank=True, upload_to='imports/', verbose_name='Αρχείο CSV')),
+                ('status', models.CharField(choices=[('PENDING', 'Σε αναμονή'), ('RUNNING', 'Σε εξέλιξη'), ('DONE', 'Ολοκληρώθηκε'), ('FAILED', 'Απέτυχε')], default='PENDING', max_length=10, verbose_name='Κατάσταση')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='Γραμμές που επεξεργάστηκαν')),
+                ('rows_created', models.PositiveIntegerField(default=0, verbose_name='Νέες εγγραφές')),
+                ('rows_skipped', models.PositiveIntegerField(default=0, verbose_name='Γραμμές που παραλείφθηκαν')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Σφάλματα')),
+                ('message', models.TextField(blank=True, verbose_name='Μήνυμα')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, verbose_name='Ημερομηνία δημιουργίας')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Τελευταία ενημέρωση')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Δημιουργήθηκε από')),
+            ],
+        ),
+    ]
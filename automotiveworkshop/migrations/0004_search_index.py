@@ -0,0 +1,147 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+from django.db import migrations
+
+# Πίνακες FTS5 για την αναζήτηση χρηστών, αυτοκινήτων και ραντεβού.
+# Ενημερώνονται με triggers, ώστε να καλύπτονται και τα bulk_create/update.
+# Ο tokenizer unicode61 αφαιρεί τόνους μόνο από λατινικούς χαρακτήρες, γι' αυτό
+# τα ελληνικά φωνήεντα με τόνο/διαλυτικά αντικαθίστανται πριν την εισαγωγή
+# (το ίδιο γίνεται στο κείμενο αναζήτησης, βλ. search.match_expression).
+TOKENIZE = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+GREEK_ACCENTS = {
+    'ά': 'α', 'έ': 'ε', 'ή': 'η', 'ί': 'ι', 'ό': 'ο', 'ύ': 'υ', 'ώ': 'ω',
+    'ϊ': 'ι', 'ϋ': 'υ', 'ΐ': 'ι', 'ΰ': 'υ',
+    'Ά': 'Α', 'Έ': 'Ε', 'Ή': 'Η', 'Ί': 'Ι', 'Ό': 'Ο', 'Ύ': 'Υ', 'Ώ': 'Ω',
+    'Ϊ': 'Ι', 'Ϋ': 'Υ',
+}
+
+
+def fold(column):
+    """Έκφραση SQL που αφαιρεί τους ελληνικούς τόνους από τη στήλη"""
+    expression = column
+    for accented, plain in GREEK_ACCENTS.items():
+        expression = f"replace({expression}, '{accented}', '{plain}')"
+    return expression
+
+
+USER_COLUMNS = f"{fold('u.username')}, {fold('u.last_name')}"
+CAR_COLUMNS = f"{fold('c.serial_number')}, {fold('c.make')}, {fold('c.model')}"
+APPOINTMENT_COLUMNS = f"{fold('u.last_name')}, {fold('u.afm')}, a.status"
+
+# Triggers του πίνακα ραντεβού. Όταν ένα migration ξαναχτίζει τον πίνακα σε SQLite
+# (π.χ. AddField με NOT NULL), οι triggers πρέπει να διαγραφούν πριν και να
+# ξαναδημιουργηθούν μετά (βλ. 0006_appointment_labour_duration).
+APPOINTMENT_TRIGGERS = [
+    f"""CREATE TRIGGER automotiveworkshop_appointment_fts_ai AFTER INSERT ON automotiveworkshop_appointment BEGIN
+        INSERT INTO automotiveworkshop_appointment_fts(rowid, last_name, afm, status)
+        SELECT a.id, {APPOINTMENT_COLUMNS}
+        FROM automotiveworkshop_appointment a JOIN automotiveworkshop_user u ON u.id = a.client_id
+        WHERE a.id = new.id;
+    END""",
+    """CREATE TRIGGER automotiveworkshop_appointment_fts_ad AFTER DELETE ON automotiveworkshop_appointment BEGIN
+        DELETE FROM automotiveworkshop_appointment_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER automotiveworkshop_appointment_fts_au AFTER UPDATE OF client_id, status ON automotiveworkshop_appointment
+    WHEN old.client_id IS NOT new.client_id OR old.status IS NOT new.status BEGIN
+        DELETE FROM automotiveworkshop_appointment_fts WHERE rowid = old.id;
+        INSERT INTO automotiveworkshop_appointment_fts(rowid, last_name, afm, status)
+        SELECT a.id, {APPOINTMENT_COLUMNS}
+        FROM automotiveworkshop_appointment a JOIN automotiveworkshop_user u ON u.id = a.client_id
+        WHERE a.id = new.id;
+    END""",
+    f"""CREATE TRIGGER automotiveworkshop_appointment_fts_client_au AFTER UPDATE OF last_name, afm ON automotiveworkshop_user
+    WHEN old.last_name IS NOT new.last_name OR old.afm IS NOT new.afm BEGIN
+        UPDATE automotiveworkshop_appointment_fts
+        SET last_name = (SELECT {fold('u.last_name')} FROM automotiveworkshop_user u WHERE u.id = new.id),
+            afm = (SELECT {fold('u.afm')} FROM automotiveworkshop_user u WHERE u.id = new.id)
+        WHERE rowid IN (SELECT id FROM automotiveworkshop_appointment WHERE client_id = new.id);
+    END""",
+]
+
+DROP_APPOINTMENT_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS automotiveworkshop_appointment_fts_client_au",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_appointment_fts_au",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_appointment_fts_ad",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_appointment_fts_ai",
+]
+
+CREATE_SQL = [
+    # Χρήστες
+    f"CREATE VIRTUAL TABLE automotiveworkshop_user_fts USING fts5(username, last_name, {TOKENIZE})",
+    f"""CREATE TRIGGER automotiveworkshop_user_fts_ai AFTER INSERT ON automotiveworkshop_user BEGIN
+        INSERT INTO automotiveworkshop_user_fts(rowid, username, last_name)
+        SELECT u.id, {USER_COLUMNS} FROM automotiveworkshop_user u WHERE u.id = new.id;
+    END""",
+    """CREATE TRIGGER automotiveworkshop_user_fts_ad AFTER DELETE ON automotiveworkshop_user BEGIN
+        DELETE FROM automotiveworkshop_user_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER automotiveworkshop_user_fts_au AFTER UPDATE OF username, last_name ON automotiveworkshop_user
+    WHEN old.username IS NOT new.username OR old.last_name IS NOT new.last_name BEGIN
+        DELETE FROM automotiveworkshop_user_fts WHERE rowid = old.id;
+        INSERT INTO automotiveworkshop_user_fts(rowid, username, last_name)
+        SELECT u.id, {USER_COLUMNS} FROM automotiveworkshop_user u WHERE u.id = new.id;
+    END""",
+    f"""INSERT INTO automotiveworkshop_user_fts(rowid, username, last_name)
+    SELECT u.id, {USER_COLUMNS} FROM automotiveworkshop_user u""",
+
+    # Αυτοκίνητα
+    f"CREATE VIRTUAL TABLE automotiveworkshop_car_fts USING fts5(serial_number, make, model, {TOKENIZE})",
+    f"""CREATE TRIGGER automotiveworkshop_car_fts_ai AFTER INSERT ON automotiveworkshop_car BEGIN
+        INSERT INTO automotiveworkshop_car_fts(rowid, serial_number, make, model)
+        SELECT c.id, {CAR_COLUMNS} FROM automotiveworkshop_car c WHERE c.id = new.id;
+    END""",
+    """CREATE TRIGGER automotiveworkshop_car_fts_ad AFTER DELETE ON automotiveworkshop_car BEGIN
+        DELETE FROM automotiveworkshop_car_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER automotiveworkshop_car_fts_au AFTER UPDATE OF serial_number, make, model ON automotiveworkshop_car
+    WHEN old.serial_number IS NOT new.serial_number OR old.make IS NOT new.make OR old.model IS NOT new.model BEGIN
+        DELETE FROM automotiveworkshop_car_fts WHERE rowid = old.id;
+        INSERT INTO automotiveworkshop_car_fts(rowid, serial_number, make, model)
+        SELECT c.id, {CAR_COLUMNS} FROM automotiveworkshop_car c WHERE c.id = new.id;
+    END""",
+    f"""INSERT INTO automotiveworkshop_car_fts(rowid, serial_number, make, model)
+    SELECT c.id, {CAR_COLUMNS} FROM automotiveworkshop_car c""",
+
+    # Ραντεβού (επώνυμο και ΑΤ πελάτη, κατάσταση)
+    f"CREATE VIRTUAL TABLE automotiveworkshop_appointment_fts USING fts5(last_name, afm, status, {TOKENIZE})",
+    *APPOINTMENT_TRIGGERS,
+    f"""INSERT INTO automotiveworkshop_appointment_fts(rowid, last_name, afm, status)
+    SELECT a.id, {APPOINTMENT_COLUMNS}
+    FROM automotiveworkshop_appointment a JOIN automotiveworkshop_user u ON u.id = a.client_id""",
+]
+
+
+DROP_SQL = [
+    *DROP_APPOINTMENT_TRIGGERS,
+    "DROP TABLE IF EXISTS automotiveworkshop_appointment_fts",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_car_fts_au",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_car_fts_ad",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_car_fts_ai",
+    "DROP TABLE IF EXISTS automotiveworkshop_car_fts",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_user_fts_au",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_user_fts_ad",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_user_fts_ai",
+    "DROP TABLE IF EXISTS automotiveworkshop_user_fts",
+]
+
+
+def run_sqlite(statements):
+    """Εκτελεί τις εντολές μόνο σε SQLite (σε άλλες βάσεις η αναζήτηση γίνεται με icontains)"""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0003_importjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'hour'], name='appt_date_hour_idx'),
+        ),
+    ]
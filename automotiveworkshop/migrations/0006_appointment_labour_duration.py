@@ -0,0 +1,46 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+import datetime
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+
+# Η προσθήκη πεδίου NOT NULL ξαναχτίζει τον πίνακα ραντεβού σε SQLite, οπότε οι triggers
+# αναζήτησης του 0004 διαγράφονται πριν και ξαναδημιουργούνται μετά
+search_index = import_module('automotiveworkshop.migrations.0004_search_index')
+
+
+def fill_totals(apps, schema_editor):
+    """Υπολογίζει τα σύνολα των υπαρχόντων ραντεβού από τις εργασίες τους"""
+    Appointment = apps.get_model('automotiveworkshop', 'Appointment')
+    Work = apps.get_model('automotiveworkshop', 'Work')
+    works = Work.objects.filter(appointment=OuterRef('pk')).order_by().values('appointment')
+    Appointment.objects.filter(pk__in=Work.objects.values('appointment_id')).update(
+        total_cost=Subquery(works.annotate(total=Sum('cost')).values('total')),
+        labour_duration=Subquery(works.annotate(total=Sum('completion_time')).values('total')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0005_appointment_date_hour_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search_index.run_sqlite(search_index.DROP_APPOINTMENT_TRIGGERS),
+            search_index.run_sqlite(search_index.APPOINTMENT_TRIGGERS),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='labour_duration',
+            field=models.DurationField(default=datetime.timedelta(0), verbose_name='Συνολικός χρόνος εργασιών'),
+        ),
+        migrations.RunPython(
+            search_index.run_sqlite(search_index.APPOINTMENT_TRIGGERS),
+            search_index.run_sqlite(search_index.DROP_APPOINTMENT_TRIGGERS),
+        ),
+        migrations.RunPython(fill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_summary(apps, schema_editor):
+    """Υπολογίζει τα ημερήσια σύνολα για όλα τα υπάρχοντα ραντεβού"""
+    Appointment = apps.get_model('automotiveworkshop', 'Appointment')
+    DailySummary = apps.get_model('automotiveworkshop', 'DailySummary')
+    rows = (
+        Appointment.objects.order_by()
+        .values('date', 'mechanic_id', 'status')
+        .annotate(count=Count('id'), revenue=Sum('total_cost'), labour=Sum('labour_duration'))
+    )
+    DailySummary.objects.bulk_create([
+        DailySummary(
+            date=row['date'], mechanic_id=row['mechanic_id'], status=row['status'], appointments=row['count'],
+            revenue=row['revenue'] or 0, labour_duration=row['labour'] or datetime.timedelta(0),
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0006_appointment_labour_duration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Ημερομηνία')),
+                ('status', models.CharField(choices=[('CREATED', 'Δημιουργήθηκε'), ('IN_PROGRESS', 'Σε εξέλιξη'), ('COMPLETED', 'Ολοκληρώθηκε'), ('CANCELLED', 'Ακυρώθηκε')], max_length=20, verbose_name='Κατάσταση')),
+                ('appointments', models.IntegerField(default=0, verbose_name='Ραντεβού')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Έσοδα')),
+                ('labour_duration', models.DurationField(default=datetime.timedelta(0), verbose_name='Χρόνος εργασιών')),
+                ('mechanic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_summaries', to=settings.AUTH_USER_MODEL, verbose_name='Μηχανικός')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'mechanic', 'status'), name='daily_summary_unique')],
+            },
+        ),
+        migrations.RunPython(fill_summary, migrations.RunPython.noop),
+    ]
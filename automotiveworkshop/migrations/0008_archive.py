@@ -0,0 +1,87 @@
+# Generated by Django 5.1.4 on 2026-10-17 10:00
+
+import datetime
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Πίνακας FTS5 για την αναζήτηση στο αρχείο ραντεβού, με τις ίδιες στήλες και
+# τον ίδιο tokenizer με τον πίνακα των ραντεβού (βλ. 0004_search_index)
+search_index = import_module('automotiveworkshop.migrations.0004_search_index')
+
+ARCHIVE_COLUMNS = search_index.APPOINTMENT_COLUMNS
+
+CREATE_SQL = [
+    f"CREATE VIRTUAL TABLE automotiveworkshop_archivedappointment_fts USING fts5(last_name, afm, status, {search_index.TOKENIZE})",
+    f"""CREATE TRIGGER automotiveworkshop_archivedappointment_fts_ai AFTER INSERT ON automotiveworkshop_archivedappointment BEGIN
+        INSERT INTO automotiveworkshop_archivedappointment_fts(rowid, last_name, afm, status)
+        SELECT a.id, {ARCHIVE_COLUMNS}
+        FROM automotiveworkshop_archivedappointment a JOIN automotiveworkshop_user u ON u.id = a.client_id
+        WHERE a.id = new.id;
+    END""",
+    """CREATE TRIGGER automotiveworkshop_archivedappointment_fts_ad AFTER DELETE ON automotiveworkshop_archivedappointment BEGIN
+        DELETE FROM automotiveworkshop_archivedappointment_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER automotiveworkshop_archivedappointment_fts_client_au AFTER UPDATE OF last_name, afm ON automotiveworkshop_user
+    WHEN old.last_name IS NOT new.last_name OR old.afm IS NOT new.afm BEGIN
+        UPDATE automotiveworkshop_archivedappointment_fts
+        SET last_name = (SELECT {search_index.fold('u.last_name')} FROM automotiveworkshop_user u WHERE u.id = new.id),
+            afm = (SELECT {search_index.fold('u.afm')} FROM automotiveworkshop_user u WHERE u.id = new.id)
+        WHERE rowid IN (SELECT id FROM automotiveworkshop_archivedappointment WHERE client_id = new.id);
+    END""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS automotiveworkshop_archivedappointment_fts_client_au",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_archivedappointment_fts_ad",
+    "DROP TRIGGER IF EXISTS automotiveworkshop_archivedappointment_fts_ai",
+    "DROP TABLE IF EXISTS automotiveworkshop_archivedappointment_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automotiveworkshop', '0007_dailysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Αριθμός ραντεβού')),
+                ('date', models.DateField(verbose_name='Ημερομηνία')),
+                ('hour', models.TimeField(verbose_name='Ώρα')),
+                ('service_type', models.CharField(choices=[('service', 'Σέρβις'), ('repair', 'Επισκευή')], max_length=20, verbose_name='Τύπος υπηρεσίας')),
+                ('problem_description', models.TextField(blank=True, verbose_name='Περιγραφή προβλήματος')),
+                ('creation_date', models.DateTimeField(verbose_name='Ημερομηνία δημιουργίας')),
+                ('status', models.CharField(choices=[('CREATED', 'Δημιουργήθηκε'), ('IN_PROGRESS', 'Σε εξέλιξη'), ('COMPLETED', 'Ολοκληρώθηκε'), ('CANCELLED', 'Ακυρώθηκε')], max_length=20, verbose_name='Κατάσταση')),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0.0, max_digits=10, verbose_name='Συνολικό κόστος')),
+                ('labour_duration', models.DurationField(default=datetime.timedelta(0), verbose_name='Συνολικός χρόνος εργασιών')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Ημερομηνία αρχειοθέτησης')),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='automotiveworkshop.car', verbose_name='Αυτοκίνητο')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to=settings.AUTH_USER_MODEL, verbose_name='Πελάτης')),
+                ('mechanic', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assignments', to=settings.AUTH_USER_MODEL, verbose_name='Μηχανικός')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['client', 'date', 'hour'], name='archived_client_date_idx'),
+                    models.Index(fields=['date', 'hour'], name='archived_date_hour_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedWork',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Αριθμός εργασίας')),
+                ('description', models.TextField(verbose_name='Περιγραφή')),
+                ('materials', models.TextField(verbose_name='Υλικά')),
+                ('completion_time', models.DurationField(verbose_name='Χρόνος ολοκλήρωσης')),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Κόστος')),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='works', to='automotiveworkshop.archivedappointment', verbose_name='Ραντεβού')),
+            ],
+        ),
+        migrations.RunPython(search_index.run_sqlite(CREATE_SQL), search_index.run_sqlite(DROP_SQL)),
+    ]
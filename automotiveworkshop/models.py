@@ -1,7 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
-from datetime import time, timedelta, datetime
+from datetime import time, timedelta
 
 """
 Ορισμός μοντέλων για εφαρμογή διαχείρισης συνεργείου αυτοκινήτων.
@@ -102,48 +102,52 @@ class Appointment(models.Model):
     problem_description = models.TextField(blank=True, verbose_name="Περιγραφή προβλήματος")
     creation_date = models.DateTimeField(auto_now_add=True, verbose_name="Ημερομηνία δημιουργίας")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='CREATED', verbose_name="Κατάσταση")
+    # Σύνολα των εργασιών του ραντεβού, ενημερώνονται σταδιακά (βλ. signals.py)
     total_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Συνολικό κόστος")
+    labour_duration = models.DurationField(default=timedelta(0), verbose_name="Συνολικός χρόνος εργασιών")
+
+    class Meta:
+        # Σύνθετα ευρετήρια για τα συχνότερα queries:
+        # - ραντεβού μηχανικού ανά ημερομηνία/ώρα (ανατεθειμένα ραντεβού)
+        # - ραντεβού πελάτη ταξινομημένα κατά ημερομηνία/ώρα (τα ραντεβού μου)
+        # - ενεργά ραντεβού ημέρας (διαθεσιμότητα μηχανικών)
+        # - πλήρης λίστα ραντεβού με σελιδοποίηση κέρσορα κατά ημερομηνία/ώρα
+        indexes = [
+            models.Index(fields=['mechanic', 'date', 'hour'], name='appt_mechanic_date_idx'),
+            models.Index(fields=['client', 'date', 'hour'], name='appt_client_date_idx'),
+            models.Index(fields=['date', 'status', 'hour'], name='appt_date_status_idx'),
+            models.Index(fields=['date', 'hour'], name='appt_date_hour_idx'),
+        ]
 
     def clean(self):
         """Έλεγχος ότι τα ραντεβού είναι εντός ωραρίου λειτουργίας (8πμ-4μμ)"""
-        if self.hour < time(8, 0) or self.hour > time(16, 0):
+        if self.hour is not None and (self.hour < time(8, 0) or self.hour > time(16, 0)):
             raise ValidationError("Τα ραντεβού πρέπει να είναι μεταξύ 08:00 και 16:00.")
 
     def __str__(self):
         return f"Ραντεβού #{self.id} - {self.client.username}"
 
+    def save(self, *args, **kwargs):
+        # Η ενημέρωση των ημερήσιων συνόλων (post_save) γίνεται στο ίδιο transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    @staticmethod
+    def get_available_mechanics(appointment_date, appointment_hour):
+        """
+        Επιστρέφει όλους τους διαθέσιμους μηχανικούς για συγκεκριμένη ημερομηνία και ώρα.
+        Ελέγχει για υπερκαλυπτόμενα ραντεβού (διάρκεια 2 ώρες) με σταθερό αριθμό queries.
+        """
+        from .scheduling import available_mechanics
+        return available_mechanics(appointment_date, appointment_hour)
+
     @staticmethod
     def get_available_mechanic(appointment_date, appointment_hour):
         """
         Βρίσκει διαθέσιμο μηχανικό για συγκεκριμένη ημερομηνία και ώρα.
-        Ελέγχει για υπερκαλυπτόμενα ραντεβού (διάρκεια 2 ώρες).
+        Επιστρέφει τυχαίο μηχανικό από τους διαθέσιμους ή None.
         """
-        start_datetime = datetime.combine(appointment_date, appointment_hour)
-        end_datetime = start_datetime + timedelta(hours=2)
-
-        # Φίλτρα μόνο ενεργοί μηχανικοί
-        all_mechanics = User.objects.filter(role='mechanic', is_active=True)
-        available_mechanics = []
-
-        for mech in all_mechanics:
-            # Βρες όλα τα ραντεβού του μηχανικού που δεν έχουν ολοκληρωθεί
-            overlapping = Appointment.objects.filter(
-                mechanic=mech,
-                date=appointment_date,
-                hour__gte=time(8, 0),
-                hour__lt=time(16, 0),
-                status__in=['CREATED', 'IN_PROGRESS']
-            )
-            
-            # Δημιουργία λίστας με τα υπάρχοντα ραντεβού του μηχανικού
-            busy_times = [
-                (datetime.combine(a.date, a.hour), datetime.combine(a.date, a.hour) + timedelta(hours=2))
-                for a in overlapping
-            ]
-            
-            # Έλεγχος για διαθεσιμότητα
-            if all(not (start_datetime < b_end and end_datetime > b_start) for b_start, b_end in busy_times):
-                available_mechanics.append(mech)
+        available_mechanics = Appointment.get_available_mechanics(appointment_date, appointment_hour)
 
         # Επιστροφή τυχαίου διαθέσιμου μηχανικού (αν υπάρχει)
         if available_mechanics:
@@ -169,4 +173,141 @@ class Work(models.Model):
     cost = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Κόστος")
 
     def __str__(self):
-        return f"Εργασία για Ραντεβού #{self.appointment.id}"
\ No newline at end of file
+        return f"Εργασία για Ραντεβού #{self.appointment.id}"
+
+    def save(self, *args, **kwargs):
+        # Η ενημέρωση των συνόλων του ραντεβού (post_save) γίνεται στο ίδιο transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class ImportJob(models.Model):
+    """
+    Εργασία εισαγωγής CSV (χρήστες ή αυτοκίνητα) που εκτελείται στο παρασκήνιο
+    από την εντολή `manage.py process_import_jobs` αντί για μέσα στο HTTP αίτημα.
+    Η πρόοδος αποθηκεύεται ανά παρτίδα, ώστε η εισαγωγή να συνεχίζει μετά από διακοπή.
+    """
+    KIND_CHOICES = [
+        ('users', 'Χρήστες'),
+        ('cars', 'Αυτοκίνητα'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Σε αναμονή'),
+        ('RUNNING', 'Σε εξέλιξη'),
+        ('DONE', 'Ολοκληρώθηκε'),
+        ('FAILED', 'Απέτυχε'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Είδος")
+    csv_file = models.FileField(upload_to='imports/', blank=True, verbose_name="Αρχείο CSV")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', verbose_name="Κατάσταση")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Δημιουργήθηκε από"
+    )
+
+    # Πρόοδος
+    rows_processed = models.PositiveIntegerField(default=0, verbose_name="Γραμμές που επεξεργάστηκαν")
+    rows_created = models.PositiveIntegerField(default=0, verbose_name="Νέες εγγραφές")
+    rows_skipped = models.PositiveIntegerField(default=0, verbose_name="Γραμμές που παραλείφθηκαν")
+    errors = models.JSONField(default=list, blank=True, verbose_name="Σφάλματα")
+    message = models.TextField(blank=True, verbose_name="Μήνυμα")
+
+    creation_date = models.DateTimeField(auto_now_add=True, verbose_name="Ημερομηνία δημιουργίας")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Τελευταία ενημέρωση")
+
+    def __str__(self):
+        return f"Εισαγωγή #{self.id} ({self.get_kind_display()}) - {self.get_status_display()}"
+
+
+class DailySummary(models.Model):
+    """
+    Ημερήσια σύνολα ραντεβού ανά μηχανικό και κατάσταση για τις αναφορές.
+    Ενημερώνονται σταδιακά από τα signals (βλ. reports.py) και ξαναϋπολογίζονται
+    για οποιοδήποτε διάστημα με την εντολή `manage.py rebuild_daily_summary`.
+    """
+    date = models.DateField(verbose_name="Ημερομηνία")
+    mechanic = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_summaries',
+        verbose_name="Μηχανικός"
+    )
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES, verbose_name="Κατάσταση")
+    appointments = models.IntegerField(default=0, verbose_name="Ραντεβού")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Έσοδα")
+    labour_duration = models.DurationField(default=timedelta(0), verbose_name="Χρόνος εργασιών")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'mechanic', 'status'], name='daily_summary_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.mechanic_id} - {self.get_status_display()}: {self.appointments}"
+
+
+class ArchivedAppointment(models.Model):
+    """
+    Αρχείο κλεισμένων (ολοκληρωμένων/ακυρωμένων) ραντεβού, εκτός του πίνακα των ενεργών
+    ραντεβού που διαβάζουν ο προγραμματισμός και οι λίστες. Οι γραμμές μεταφέρονται με
+    την εντολή `manage.py archive_appointments` και κρατούν το id του αρχικού ραντεβού.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name="Αριθμός ραντεβού")
+    client = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments',
+        verbose_name="Πελάτης"
+    )
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='archived_appointments', verbose_name="Αυτοκίνητο")
+    mechanic = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_assignments',
+        verbose_name="Μηχανικός"
+    )
+    date = models.DateField(verbose_name="Ημερομηνία")
+    hour = models.TimeField(verbose_name="Ώρα")
+    service_type = models.CharField(max_length=20, choices=Appointment.SERVICE_CHOICES, verbose_name="Τύπος υπηρεσίας")
+    problem_description = models.TextField(blank=True, verbose_name="Περιγραφή προβλήματος")
+    # Η ημερομηνία δημιουργίας του αρχικού ραντεβού (όχι auto_now_add)
+    creation_date = models.DateTimeField(verbose_name="Ημερομηνία δημιουργίας")
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES, verbose_name="Κατάσταση")
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Συνολικό κόστος")
+    labour_duration = models.DurationField(default=timedelta(0), verbose_name="Συνολικός χρόνος εργασιών")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Ημερομηνία αρχειοθέτησης")
+
+    class Meta:
+        # Ιστορικό πελάτη και αναφορές ανά διάστημα
+        indexes = [
+            models.Index(fields=['client', 'date', 'hour'], name='archived_client_date_idx'),
+            models.Index(fields=['date', 'hour'], name='archived_date_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"Αρχειοθετημένο ραντεβού #{self.id} - {self.client.username}"
+
+
+class ArchivedWork(models.Model):
+    """Οι εργασίες των αρχειοθετημένων ραντεβού (με το id της αρχικής εργασίας)"""
+    id = models.BigIntegerField(primary_key=True, verbose_name="Αριθμός εργασίας")
+    appointment = models.ForeignKey(
+        ArchivedAppointment,
+        on_delete=models.CASCADE,
+        related_name='works',
+        verbose_name="Ραντεβού"
+    )
+    description = models.TextField(verbose_name="Περιγραφή")
+    materials = models.TextField(verbose_name="Υλικά")
+    completion_time = models.DurationField(verbose_name="Χρόνος ολοκλήρωσης")
+    cost = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Κόστος")
+
+    def __str__(self):
+        return f"Εργασία για αρχειοθετημένο ραντεβού #{self.appointment_id}"
@@ -0,0 +1,151 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+
+"""
+Σελιδοποίηση με κέρσορα (keyset pagination).
+Αντί για OFFSET και COUNT(*), κάθε σελίδα ξεκινά αμέσως μετά (ή πριν) από τις τιμές
+ταξινόμησης της τελευταίας (ή πρώτης) εγγραφής της προηγούμενης σελίδας, οπότε
+ο χρόνος κάθε σελίδας δεν εξαρτάται από το βάθος της.
+Οι κέρσορες είναι αδιαφανή tokens (base64 JSON) που περνούν στο ?cursor=.
+"""
+
+
+class KeysetPage:
+    """Σελίδα αποτελεσμάτων με tokens για την επόμενη και την προηγούμενη σελίδα"""
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode(self.object_list[0], 'previous')
+
+
+class KeysetPaginator:
+    """
+    Σελιδοποίηση queryset με βάση τα πεδία ταξινόμησης `ordering`
+    (π.χ. ('-date', '-hour', '-id')). Το τελευταίο πεδίο πρέπει να είναι μοναδικό.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    def encode(self, obj, direction):
+        values = [getattr(obj, field.attname) for field in self.fields]
+        payload = json.dumps({'v': values, 'd': direction}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            values = [field.to_python(value) for field, value in zip(self.fields, payload['v'], strict=True)]
+            direction = payload['d']
+        except Exception:
+            raise Http404("Μη έγκυρος κέρσορας σελιδοποίησης.")
+        if direction not in ('next', 'previous'):
+            raise Http404("Μη έγκυρος κέρσορας σελιδοποίησης.")
+        return values, direction
+
+    def boundary(self, values, reverse):
+        """
+        Συνθήκη για τις εγγραφές μετά τις `values` στη σειρά ταξινόμησης (ή πριν, με reverse=True):
+        a >= x AND ((a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z))
+        Ο πρώτος όρος επιτρέπει στη βάση να ξεκινήσει απευθείας από το σωστό σημείο του ευρετηρίου.
+        """
+        conditions = []
+        equal = {}
+        for name, field, value in zip(self.ordering, self.fields, values):
+            descending = name.startswith('-') != reverse
+            lookup = f'{field.name}__lt' if descending else f'{field.name}__gt'
+            conditions.append(Q(**equal, **{lookup: value}))
+            equal[field.name] = value
+
+        first_descending = self.ordering[0].startswith('-') != reverse
+        first_lookup = f'{self.fields[0].name}__lte' if first_descending else f'{self.fields[0].name}__gte'
+        return Q(**{first_lookup: values[0]}) & reduce(or_, conditions)
+
+    def query(self, cursor=None):
+        """Επιστρέφει (queryset της σελίδας με μία εγγραφή παραπάνω, κατεύθυνση) για τον κέρσορα"""
+        if not cursor:
+            return self.queryset.order_by(*self.ordering)[:self.per_page + 1], None
+
+        values, direction = self.decode(cursor)
+        if direction == 'next':
+            queryset = self.queryset.filter(self.boundary(values, reverse=False)).order_by(*self.ordering)
+            return queryset[:self.per_page + 1], direction
+
+        # Προηγούμενη σελίδα: αντίστροφη ταξινόμηση και αναστροφή των αποτελεσμάτων
+        reversed_ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        queryset = self.queryset.filter(self.boundary(values, reverse=True)).order_by(*reversed_ordering)
+        return queryset[:self.per_page + 1], direction
+
+    def build_page(self, rows, direction):
+        more = len(rows) > self.per_page
+        if direction == 'previous':
+            return KeysetPage(self, rows[:self.per_page][::-1], True, more)
+        return KeysetPage(self, rows[:self.per_page], more, direction == 'next')
+
+    def page(self, cursor=None):
+        queryset, direction = self.query(cursor)
+        return self.build_page(list(queryset), direction)
+
+    async def apage(self, cursor=None):
+        """Ασύγχρονη εκδοχή του page (για async views)"""
+        queryset, direction = self.query(cursor)
+        return self.build_page([row async for row in queryset.aiterator()], direction)
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin για ListView που αντικαθιστά τη σελιδοποίηση με OFFSET από σελιδοποίηση με κέρσορα.
+    Η view ορίζει paginate_by και keyset_ordering. Στο template διατίθενται τα
+    page_obj.next_cursor και page_obj.previous_cursor.
+    Οι async views (βλ. async_views.py) χρησιμοποιούν το apaginate_queryset.
+    """
+    keyset_ordering = ('id',)
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        page = await paginator.apage(self.request.GET.get(self.cursor_kwarg))
+        return (paginator, page, page.object_list, page.has_other_pages())
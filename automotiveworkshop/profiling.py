@@ -0,0 +1,165 @@
+import json
+import logging
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+"""
+Προφίλ ανά αίτημα (opt-in) για τον εντοπισμό αργών σελίδων στην παραγωγή.
+Καταγράφει πλήθος και χρόνο queries (και διπλά queries), χρόνο view και χρόνο
+απόδοσης templates, και τα στέλνει στην κεφαλίδα Server-Timing και ως γραμμή
+JSON στον logger 'automotiveworkshop.profiling'.
+Ενεργοποιείται με PROFILING = True στις ρυθμίσεις (μεταβλητή WORKSHOP_PROFILING=1).
+Όταν είναι ανενεργό, το middleware αφαιρείται από την αλυσίδα (MiddlewareNotUsed)
+και χρησιμοποιείται ο κανονικός template backend, άρα δεν υπάρχει καμία επιβάρυνση.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Πλήθος διπλών queries που εμφανίζονται στο log
+MAX_LOGGED_DUPLICATES = 5
+
+# Το προφίλ του τρέχοντος αιτήματος (None εκτός αιτήματος)
+current_profile = ContextVar('current_profile', default=None)
+
+
+class RequestProfile:
+    """Μετρήσεις ενός αιτήματος"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = Counter()  # (sql, params) -> πλήθος εκτελέσεων
+        self.query_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.view_started = None
+        self.view_ms = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """Wrapper του connection.execute_wrapper που χρονομετρά κάθε query"""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (perf_counter() - started) * 1000
+            self.query_count += 1
+            self.queries[(sql, repr(params))] += 1
+
+    def duplicates(self):
+        """Queries που εκτελέστηκαν περισσότερες από μία φορές με τις ίδιες παραμέτρους"""
+        return [(sql, count) for (sql, _), count in self.queries.most_common() if count > 1]
+
+    def similar(self):
+        """Πλήθος queries με ίδιο SQL αλλά άλλες παραμέτρους (συνήθως ένδειξη N+1)"""
+        return self.query_count - len({sql for sql, _ in self.queries})
+
+    def finish_view(self):
+        if self.view_started is not None and self.view_ms is None:
+            self.view_ms = (perf_counter() - self.view_started) * 1000
+
+    def server_timing(self, total_ms):
+        duplicates = sum(count - 1 for _, count in self.duplicates())
+        metrics = [
+            f'sql;dur={self.sql_ms:.1f};desc="{self.query_count} queries, {duplicates} duplicates"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ]
+        if self.view_ms is not None:
+            metrics.insert(1, f'view;dur={self.view_ms:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self, request, response, total_ms):
+        duplicates = self.duplicates()
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'view_ms': round(self.view_ms, 2) if self.view_ms is not None else None,
+            'template_ms': round(self.template_ms, 2),
+            'sql_ms': round(self.sql_ms, 2),
+            'queries': self.query_count,
+            'duplicate_queries': sum(count - 1 for _, count in duplicates),
+            'similar_queries': self.similar(),
+            'top_duplicates': [
+                {'sql': sql[:200], 'count': count} for sql, count in duplicates[:MAX_LOGGED_DUPLICATES]
+            ],
+        }
+
+
+class ProfilingMiddleware:
+    """
+    Middleware προφίλ. Πρέπει να είναι πρώτο στο MIDDLEWARE, ώστε ο συνολικός χρόνος
+    να περιλαμβάνει και τα υπόλοιπα middleware.
+    Ο χρόνος view μετρά από την κλήση της view μέχρι να επιστρέψει (για TemplateResponse
+    χωρίς την απόδοση του template). Ο χρόνος templates περιλαμβάνει και τα queries
+    που εκτελούνται μέσα στο template (lazy querysets).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        profile.finish_view()
+
+        total_ms = (perf_counter() - profile.started) * 1000
+        response['Server-Timing'] = profile.server_timing(total_ms)
+        logger.info(json.dumps(profile.as_dict(request, response, total_ms), ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_profile.get().view_started = perf_counter()
+
+    def process_template_response(self, request, response):
+        # Καλείται αμέσως πριν την απόδοση του TemplateResponse
+        current_profile.get().finish_view()
+        return response
+
+    def process_exception(self, request, exception):
+        current_profile.get().finish_view()
+
+
+class ProfiledTemplate(Template):
+    """Template που προσθέτει τον χρόνο απόδοσής του στο προφίλ του αιτήματος"""
+
+    def render(self, context=None, request=None):
+        profile = current_profile.get()
+        if profile is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_ms += (perf_counter() - started) * 1000
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    Template backend του Django που χρονομετρά την απόδοση των templates.
+    Μετρούνται μόνο τα templates που ζητούνται από τον backend (όχι τα extends/include
+    μέσα σε αυτά), ώστε ο χρόνος να μη μετριέται δύο φορές.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import User, Appointment, ArchivedAppointment, DailySummary
+from .scheduling import APPOINTMENT_DURATION, OPENING_HOUR, CLOSING_HOUR
+
+"""
+Αναφορές εσόδων και αξιοποίησης μηχανικών από τον πίνακα ημερήσιων συνόλων (DailySummary).
+Κάθε γραμμή κρατά πλήθος ραντεβού, έσοδα και χρόνο εργασιών για (ημέρα, μηχανικό, κατάσταση),
+οπότε μια μηνιαία αναφορά διαβάζει O(ημέρες × μηχανικοί) γραμμές αντί για όλα τα ραντεβού.
+Οι γραμμές ενημερώνονται σταδιακά από τα signals (βλ. signals.py) και ξαναϋπολογίζονται
+για οποιοδήποτε διάστημα με τη rebuild_summary.
+"""
+
+# Καταστάσεις που δεσμεύουν χρόνο μηχανικού
+BOOKED_STATUSES = ['CREATED', 'IN_PROGRESS', 'COMPLETED']
+
+# Διαθέσιμος χρόνος ενός μηχανικού ανά ημέρα λειτουργίας
+WORKING_DAY = timedelta(hours=CLOSING_HOUR.hour - OPENING_HOUR.hour)
+
+
+def add_to_summary(day, mechanic_id, status, appointments=0, revenue=0, labour=timedelta(0)):
+    """
+    Προσθέτει (ή αφαιρεί, με αρνητικές τιμές) στη γραμμή (ημέρα, μηχανικός, κατάσταση).
+    Η γραμμή δημιουργείται μόνο για προσθήκη: μια αφαίρεση από γραμμή που δεν υπάρχει αγνοείται.
+    Αυτό συμβαίνει π.χ. όταν ένα delete διαγράφει μαζί πελάτη και μηχανικό: το Django κάνει
+    πρώτα «χωρίς μηχανικό» (SET_NULL) τις γραμμές του μηχανικού και μετά διαγράφει τα ραντεβού.
+    """
+    if not appointments and not revenue and not labour:
+        return
+    updated = DailySummary.objects.filter(date=day, mechanic_id=mechanic_id, status=status).update(
+        appointments=F('appointments') + appointments,
+        revenue=F('revenue') + revenue,
+        labour_duration=F('labour_duration') + labour,
+    )
+    if not updated and appointments >= 0 and revenue >= 0 and labour >= timedelta(0):
+        DailySummary.objects.create(
+            date=day, mechanic_id=mechanic_id, status=status,
+            appointments=appointments, revenue=revenue, labour_duration=labour,
+        )
+
+
+def add_many_to_summary(changes):
+    """
+    Μαζική εκδοχή του add_to_summary για τις μαζικές λειτουργίες (bulk_create/update δεν στέλνουν signals).
+    Το changes είναι dict {(ημέρα, μηχανικός, κατάσταση): (ραντεβού, έσοδα, χρόνος)}.
+    Οι υπάρχουσες γραμμές διαβάζονται κλειδωμένες με ένα query και ενημερώνονται με bulk_update,
+    οι υπόλοιπες δημιουργούνται με bulk_create. Πρέπει να καλείται μέσα σε transaction.
+    """
+    changes = {key: change for key, change in changes.items() if any(change)}
+    if not changes:
+        return
+    existing = {
+        (summary.date, summary.mechanic_id, summary.status): summary
+        for summary in DailySummary.objects.select_for_update().filter(
+            date__in={day for day, _, _ in changes}, status__in={status for _, _, status in changes},
+        )
+    }
+    updated, created = [], []
+    for key, (appointments, revenue, labour) in changes.items():
+        summary = existing.get(key)
+        if summary is None:
+            day, mechanic_id, status = key
+            created.append(DailySummary(
+                date=day, mechanic_id=mechanic_id, status=status,
+                appointments=appointments, revenue=revenue, labour_duration=labour,
+            ))
+            continue
+        summary.appointments += appointments
+        summary.revenue += revenue
+        summary.labour_duration += labour
+        updated.append(summary)
+    DailySummary.objects.bulk_update(updated, ['appointments', 'revenue', 'labour_duration'], batch_size=500)
+    DailySummary.objects.bulk_create(created, batch_size=500)
+
+
+def move_in_summary(appointment_id, old_key, new_key):
+    """Μεταφέρει ένα ραντεβού (με τα τρέχοντα σύνολά του) από τη μία γραμμή στην άλλη"""
+    if old_key == new_key:
+        return
+    totals = Appointment.objects.filter(pk=appointment_id).values_list('total_cost', 'labour_duration').first()
+    if totals is None:
+        return
+    cost, labour = totals
+    add_to_summary(*old_key, appointments=-1, revenue=-cost, labour=-labour)
+    add_to_summary(*new_key, appointments=1, revenue=cost, labour=labour)
+
+
+def rebuild_summary(start, end):
+    """
+    Ξαναϋπολογίζει τα ημερήσια σύνολα για τις ημέρες start έως end (συμπεριλαμβάνονται)
+    με ένα GROUP BY στα ραντεβού και ένα στο αρχείο ραντεβού του διαστήματος.
+    Επιστρέφει το πλήθος των γραμμών.
+    """
+    totals = defaultdict(lambda: (0, Decimal('0.00'), timedelta(0)))
+    for model in (Appointment, ArchivedAppointment):
+        rows = (
+            model.objects.filter(date__range=(start, end))
+            .order_by()
+            .values('date', 'mechanic_id', 'status')
+            .annotate(count=Count('id'), revenue=Sum('total_cost'), labour=Sum('labour_duration'))
+        )
+        for row in rows:
+            key = (row['date'], row['mechanic_id'], row['status'])
+            count, revenue, labour = totals[key]
+            totals[key] = (count + row['count'], revenue + (row['revenue'] or 0), labour + (row['labour'] or timedelta(0)))
+    with transaction.atomic():
+        DailySummary.objects.filter(date__range=(start, end)).delete()
+        summaries = DailySummary.objects.bulk_create([
+            DailySummary(
+                date=day, mechanic_id=mechanic_id, status=status,
+                appointments=count, revenue=revenue, labour_duration=labour,
+            )
+            for (day, mechanic_id, status), (count, revenue, labour) in totals.items()
+        ], batch_size=1000)
+    return len(summaries)
+
+
+def mechanic_report(start, end):
+    """
+    Σύνολα ανά μηχανικό για το διάστημα: ολοκληρωμένα/ακυρωμένα ραντεβού, δεσμευμένες ώρες,
+    αξιοποίηση (δεσμευμένος προς διαθέσιμο χρόνο εργάσιμων ημερών) και έσοδα ολοκληρωμένων.
+    Επιστρέφει (γραμμές, σύνολα).
+    """
+    rows = (
+        DailySummary.objects.filter(date__range=(start, end))
+        .values('mechanic_id')
+        .annotate(
+            completed=Sum('appointments', filter=Q(status='COMPLETED')),
+            cancelled=Sum('appointments', filter=Q(status='CANCELLED')),
+            booked=Sum('appointments', filter=Q(status__in=BOOKED_STATUSES)),
+            revenue=Sum('revenue', filter=Q(status='COMPLETED')),
+            labour=Sum('labour_duration', filter=Q(status='COMPLETED')),
+        )
+        .order_by('mechanic_id')
+    )
+    working_days = sum(1 for offset in range((end - start).days + 1) if (start + timedelta(days=offset)).weekday() < 5)
+    available = WORKING_DAY * working_days
+    names = dict(User.objects.filter(pk__in=[row['mechanic_id'] for row in rows]).values_list('pk', 'username'))
+
+    report = []
+    totals = {'completed': 0, 'cancelled': 0, 'booked_hours': 0, 'labour_hours': 0, 'revenue': Decimal('0.00')}
+    for row in rows:
+        booked = timedelta(minutes=APPOINTMENT_DURATION) * (row['booked'] or 0)
+        entry = {
+            'mechanic': names.get(row['mechanic_id'], 'Χωρίς μηχανικό'),
+            'completed': row['completed'] or 0,
+            'cancelled': row['cancelled'] or 0,
+            'booked_hours': booked.total_seconds() / 3600,
+            'utilization': booked / available * 100 if available and row['mechanic_id'] else None,
+            'labour_hours': (row['labour'] or timedelta(0)).total_seconds() / 3600,
+            'revenue': (row['revenue'] or Decimal('0.00')).quantize(Decimal('0.01')),
+        }
+        report.append(entry)
+        for key in totals:
+            totals[key] += entry[key]
+    return report, totals
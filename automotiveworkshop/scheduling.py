@@ -0,0 +1,146 @@
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import time
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Appointment, User
+
+"""
+Μηχανή διαθεσιμότητας και ανάθεσης μηχανικών.
+Αντί για ένα query ανά μηχανικό, φορτώνονται με ένα query όλα τα
+ενεργά ραντεβού της ημέρας και ο έλεγχος επικάλυψης γίνεται στη μνήμη
+πάνω σε ταξινομημένες λίστες ωρών έναρξης (bisect).
+Η κράτηση ραντεβού γίνεται ατομικά ώστε δύο ταυτόχρονα αιτήματα να μην
+αναθέτουν τον ίδιο μηχανικό στην ίδια ώρα.
+"""
+
+# Διάρκεια κάθε ραντεβού σε λεπτά (2 ώρες)
+APPOINTMENT_DURATION = 120
+
+# Ωράριο λειτουργίας συνεργείου
+OPENING_HOUR = time(8, 0)
+CLOSING_HOUR = time(16, 0)
+
+# Καταστάσεις ραντεβού που δεσμεύουν τον μηχανικό
+ACTIVE_STATUSES = ['CREATED', 'IN_PROGRESS']
+
+
+def to_minutes(value):
+    """Μετατρέπει ένα time σε λεπτά από τα μεσάνυχτα"""
+    return value.hour * 60 + value.minute
+
+
+# Ραντεβού με μηχανικό εντός ωραρίου που τον δεσμεύουν
+ACTIVE_APPOINTMENT = Q(
+    mechanic__isnull=False,
+    hour__gte=OPENING_HOUR,
+    hour__lt=CLOSING_HOUR,
+    status__in=ACTIVE_STATUSES,
+)
+
+
+def active_appointments(appointment_date):
+    """Ενεργά ραντεβού με μηχανικό εντός ωραρίου για τη συγκεκριμένη ημέρα"""
+    return Appointment.objects.filter(ACTIVE_APPOINTMENT, date=appointment_date)
+
+
+def busy_intervals(appointment_date):
+    """
+    Επιστρέφει για κάθε μηχανικό την ταξινομημένη λίστα με τις ώρες έναρξης
+    (σε λεπτά) των ενεργών ραντεβού του για τη συγκεκριμένη ημέρα.
+    Εκτελεί ένα μόνο query ανεξάρτητα από το πλήθος των μηχανικών.
+    """
+    rows = active_appointments(appointment_date).order_by('hour').values_list('mechanic_id', 'hour')
+
+    busy = defaultdict(list)
+    for mechanic_id, hour in rows:
+        busy[mechanic_id].append(to_minutes(hour))
+    return busy
+
+
+def is_free(starts, start):
+    """
+    Ελέγχει αν ένα νέο ραντεβού που ξεκινά στο `start` (λεπτά) επικαλύπτεται
+    με κάποιο από τα ραντεβού της ταξινομημένης λίστας `starts`.
+    Όλα τα ραντεβού έχουν ίδια διάρκεια, άρα υπάρχει επικάλυψη μόνο αν κάποια
+    ώρα έναρξης βρίσκεται στο ανοιχτό διάστημα (start - διάρκεια, start + διάρκεια).
+    """
+    index = bisect_right(starts, start - APPOINTMENT_DURATION)
+    return index == len(starts) or starts[index] >= start + APPOINTMENT_DURATION
+
+
+def _free_mechanics(appointment_date, appointment_hour, lock=False):
+    """
+    Επιστρέφει (διαθέσιμοι μηχανικοί, ραντεβού ημέρας ανά μηχανικό) με 2 queries.
+    Με lock=True κλειδώνονται οι γραμμές των μηχανικών (πρέπει να καλείται μέσα σε transaction).
+    Οι μηχανικοί διαβάζονται πριν από τα ραντεβού, ώστε τα ραντεβού να διαβάζονται με τα κλειδώματα.
+    """
+    mechanics = User.objects.filter(role='mechanic', is_active=True).order_by('pk')
+    if lock:
+        mechanics = mechanics.select_for_update()
+    mechanics = list(mechanics)
+    busy = busy_intervals(appointment_date)
+    start = to_minutes(appointment_hour)
+    free = [mech for mech in mechanics if is_free(busy.get(mech.pk, []), start)]
+    return free, busy
+
+
+def available_mechanics(appointment_date, appointment_hour):
+    """
+    Επιστρέφει τη λίστα με όλους τους ενεργούς μηχανικούς που είναι διαθέσιμοι
+    για τη συγκεκριμένη ημερομηνία και ώρα (2 queries συνολικά).
+    """
+    free, _ = _free_mechanics(appointment_date, appointment_hour)
+    return free
+
+
+def least_loaded_mechanic(appointment_date, appointment_hour, lock=False):
+    """
+    Επιστρέφει τον διαθέσιμο μηχανικό με τα λιγότερα ενεργά ραντεβού την ίδια ημέρα
+    (σε ισοπαλία αυτόν με το μικρότερο id) ή None αν δεν υπάρχει διαθέσιμος.
+    """
+    free, busy = _free_mechanics(appointment_date, appointment_hour, lock=lock)
+    return min(free, key=lambda mech: len(busy.get(mech.pk, [])), default=None)
+
+
+def book_appointment(appointment):
+    """
+    Αναθέτει στο ραντεβού τον λιγότερο φορτωμένο διαθέσιμο μηχανικό και το αποθηκεύει
+    μέσα στο ίδιο transaction.
+    Σε PostgreSQL/MySQL οι γραμμές των μηχανικών κλειδώνονται με SELECT ... FOR UPDATE.
+    Στο SQLite το transaction ξεκινά με BEGIN IMMEDIATE (βλ. DATABASES στο settings.py),
+    οπότε οι κρατήσεις εκτελούνται η μία μετά την άλλη.
+    """
+    with transaction.atomic():
+        appointment.mechanic = least_loaded_mechanic(appointment.date, appointment.hour, lock=True)
+        appointment.save()
+    return appointment
+
+
+def assign_mechanics(appointments):
+    """
+    Αναθέτει σε κάθε ραντεβού της λίστας (χωρίς να τα αποθηκεύει) τον λιγότερο φορτωμένο
+    διαθέσιμο μηχανικό, όπως το book_appointment, με 2 queries για όλη τη λίστα.
+    Τα ραντεβού ανατίθενται με τη σειρά τους, οπότε δύο ραντεβού της ίδιας λίστας
+    δεν παίρνουν τον ίδιο μηχανικό σε επικαλυπτόμενες ώρες.
+    Πρέπει να καλείται μέσα στο transaction που αποθηκεύει τα ραντεβού.
+    """
+    mechanics = list(User.objects.filter(role='mechanic', is_active=True).order_by('pk').select_for_update())
+    rows = Appointment.objects.filter(
+        ACTIVE_APPOINTMENT, date__in={appointment.date for appointment in appointments},
+    ).values_list('date', 'mechanic_id', 'hour')
+
+    busy = defaultdict(lambda: defaultdict(list))  # ημέρα -> μηχανικός -> ώρες έναρξης
+    for day, mechanic_id, hour in rows:
+        insort(busy[day][mechanic_id], to_minutes(hour))
+
+    for appointment in appointments:
+        day = busy[appointment.date]
+        start = to_minutes(appointment.hour)
+        free = [mech for mech in mechanics if is_free(day.get(mech.pk, []), start)]
+        appointment.mechanic = min(free, key=lambda mech: len(day.get(mech.pk, [])), default=None)
+        if appointment.mechanic is not None and OPENING_HOUR <= appointment.hour < CLOSING_HOUR:
+            insort(day[appointment.mechanic.pk], start)
+    return appointments
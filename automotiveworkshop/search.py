@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import Q
+
+from .models import User, Car, Appointment, ArchivedAppointment
+
+"""
+Αναζήτηση πλήρους κειμένου (SQLite FTS5) για χρήστες, αυτοκίνητα, ραντεβού και αρχείο ραντεβού.
+Οι πίνακες FTS5 δημιουργούνται στα migrations 0004_search_index και 0008_archive και ενημερώνονται
+με triggers της βάσης, άρα μένουν συγχρονισμένοι και με bulk_create/update.
+Σε άλλες βάσεις γίνεται αναζήτηση με icontains στα ίδια πεδία.
+"""
+
+# Μέγιστο πλήθος αποτελεσμάτων ανά αναζήτηση
+SEARCH_LIMIT = 100
+
+# Πίνακας FTS5 και πεδία αναζήτησης (για την εναλλακτική αναζήτηση με icontains) ανά μοντέλο
+SEARCH_INDEXES = {
+    User: ('automotiveworkshop_user_fts', ['username', 'last_name']),
+    Car: ('automotiveworkshop_car_fts', ['serial_number', 'make', 'model']),
+    Appointment: ('automotiveworkshop_appointment_fts', ['client__last_name', 'client__afm', 'status']),
+    ArchivedAppointment: ('automotiveworkshop_archivedappointment_fts', ['client__last_name', 'client__afm', 'status']),
+}
+
+
+def strip_accents(text):
+    """Αφαιρεί τόνους και διαλυτικά (ο πίνακας FTS5 αποθηκεύει τα κείμενα χωρίς τόνους)"""
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def match_expression(text):
+    """
+    Μετατρέπει το κείμενο αναζήτησης σε έκφραση MATCH του FTS5:
+    κάθε λέξη γίνεται αναζήτηση προθέματος και όλες οι λέξεις πρέπει να ταιριάζουν.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', strip_accents(text)))
+
+
+def fallback_condition(model, text):
+    """Συνθήκη icontains στα πεδία αναζήτησης του μοντέλου (για βάσεις χωρίς FTS5)"""
+    _, fields = SEARCH_INDEXES[model]
+    return reduce(or_, (Q(**{f'{field}__icontains': text}) for field in fields))
+
+
+def match_ids(model, expression, limit):
+    """Τα id που ταιριάζουν στην έκφραση MATCH, ταξινομημένα κατά συνάφεια (bm25)"""
+    table, _ = SEARCH_INDEXES[model]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s',
+            [expression, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(model, text, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Επιστρέφει λίστα με τα αντικείμενα του μοντέλου που ταιριάζουν στο κείμενο,
+    ταξινομημένα κατά συνάφεια (bm25). Κενή αναζήτηση επιστρέφει τα πρώτα `limit` αντικείμενα.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    expression = match_expression(text)
+    if not expression:
+        return list(queryset[:limit])
+
+    if connection.vendor != 'sqlite':
+        return list(queryset.filter(fallback_condition(model, text))[:limit])
+
+    ids = match_ids(model, expression, limit)
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+async def asearch(model, text, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Ασύγχρονη εκδοχή του search (για async views). Το query στον πίνακα FTS5 είναι raw SQL,
+    που δεν έχει ασύγχρονο API, άρα εκτελείται με sync_to_async.
+    """
+    if queryset is None:
+        queryset = model.objects.all()
+    expression = match_expression(text)
+    if not expression:
+        return [obj async for obj in queryset[:limit].aiterator()]
+
+    if connection.vendor != 'sqlite':
+        return [obj async for obj in queryset.filter(fallback_condition(model, text))[:limit].aiterator()]
+
+    ids = await sync_to_async(match_ids)(model, expression, limit)
+    objects = await queryset.ain_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
@@ -0,0 +1,210 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import QuerySet, Sum
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .autocomplete import INDEXES
+from .models import User, Car, Appointment, ArchivedAppointment, Work
+from .reports import add_to_summary, move_in_summary
+from .fragments import MY_CARS, MY_APPOINTMENTS, MY_ASSIGNED_APPOINTMENTS, invalidate
+from .slots import invalidate_days
+
+"""
+Signals της εφαρμογής.
+Ενημερώνουν τα ευρετήρια αυτόματης συμπλήρωσης όταν αλλάζουν χρήστες ή αυτοκίνητα,
+τα σύνολα κόστους/χρόνου των ραντεβού όταν αλλάζουν οι εργασίες τους και τα
+ημερήσια σύνολα (DailySummary) όταν αλλάζουν ραντεβού ή εργασίες ή διαγράφονται
+αρχειοθετημένα ραντεβού. Διαγράφουν επίσης από την cache τα τμήματα σελίδων των
+πελατών/μηχανικών που επηρεάζονται (fragments.py) και τις ελεύθερες θέσεις των ημερών που επηρεάζονται (slots.py).
+Τα bulk_create/update δεν στέλνουν signals: μετά από αυτά εκτελούνται οι εντολές
+`manage.py reconcile_appointment_totals` και `manage.py rebuild_daily_summary`.
+"""
+
+
+def index_later(name, pk, value=None):
+    # Το ευρετήριο αλλάζει μόνο αν γίνει commit, ώστε μια αλλαγή που αναιρείται να μην αφήνει προτάσεις
+    if value is None:
+        transaction.on_commit(lambda: INDEXES[name].remove(pk))
+    else:
+        transaction.on_commit(lambda: INDEXES[name].update(pk, value))
+
+
+@receiver(post_save, sender=Car)
+def index_car(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'serial_number' in update_fields:
+        index_later('cars', instance.pk, instance.serial_number)
+
+
+@receiver(post_delete, sender=Car)
+def unindex_car(sender, instance, **kwargs):
+    index_later('cars', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    # Π.χ. η σύνδεση αποθηκεύει μόνο το last_login: το ευρετήριο δεν αλλάζει
+    if update_fields is None or 'username' in update_fields:
+        index_later('users', instance.pk, instance.username)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    index_later('users', instance.pk)
+
+
+def update_totals(appointment_id):
+    """
+    Ξαναϋπολογίζει από τις εργασίες τα σύνολα κόστους/χρόνου του ραντεβού και προσθέτει τη
+    διαφορά στο ημερήσιο σύνολο. Καλείται μέσα στο transaction της αλλαγής: η γραμμή του
+    ραντεβού κλειδώνεται πριν από το άθροισμα, οπότε ταυτόχρονες αλλαγές εργασιών του ίδιου
+    ραντεβού δεν χάνουν η μία την άλλη.
+    """
+    if appointment_id is None:
+        return
+    stored = Appointment.objects.select_for_update().filter(pk=appointment_id).values_list(
+        'date', 'mechanic_id', 'status', 'total_cost', 'labour_duration',
+    ).first()
+    if stored is None:
+        return
+    totals = Work.objects.filter(appointment_id=appointment_id).aggregate(cost=Sum('cost'), labour=Sum('completion_time'))
+    cost = totals['cost'] or Decimal('0.00')
+    labour = totals['labour'] or timedelta(0)
+    if (cost, labour) == stored[3:]:
+        return
+    Appointment.objects.filter(pk=appointment_id).update(total_cost=cost, labour_duration=labour)
+    add_to_summary(*stored[:3], revenue=cost - stored[3], labour=labour - stored[4])
+
+
+@receiver(pre_save, sender=Work)
+def load_stored_appointment(sender, instance, **kwargs):
+    # Το ραντεβού της εργασίας όπως είναι αποθηκευμένο, διαβασμένο μέσα στο transaction της αποθήκευσης
+    instance._stored_appointment_id = None
+    if instance.pk is not None:
+        instance._stored_appointment_id = (
+            Work.objects.filter(pk=instance.pk).values_list('appointment_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Work)
+def update_work_totals(sender, instance, **kwargs):
+    if instance._stored_appointment_id not in (None, instance.appointment_id):
+        update_totals(instance._stored_appointment_id)
+    update_totals(instance.appointment_id)
+
+
+@receiver(post_delete, sender=Work)
+def remove_from_totals(sender, instance, origin=None, **kwargs):
+    # Τα queryset.delete() και οι διαγραφές σε cascade εκτελούνται ήδη σε transaction.
+    # Όταν διαγράφεται το ίδιο το ραντεβού (cascade), τα σύνολά του αφαιρούνται μαζί του.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and origin_model is not Work:
+        return
+    update_totals(instance.appointment_id)
+
+
+@receiver(pre_save, sender=Appointment)
+def load_stored_row(sender, instance, update_fields=None, **kwargs):
+    # Η αποθηκευμένη γραμμή, διαβασμένη κλειδωμένη μέσα στο transaction της αποθήκευσης.
+    # Τα σύνολα των εργασιών τα ενημερώνουν μόνο τα signals των εργασιών: ένα παλιότερο
+    # αντίγραφο του ραντεβού παίρνει τις τρέχουσες τιμές, ώστε να μην τις αντικαταστήσει.
+    instance._stored_summary_key = None
+    if instance.pk is None:
+        return
+    stored = Appointment.objects.select_for_update().filter(pk=instance.pk).values_list(
+        'date', 'mechanic_id', 'status', 'total_cost', 'labour_duration',
+    ).first()
+    if stored is None:
+        return
+    instance._stored_summary_key = stored[:3]
+    if update_fields is None or not {'total_cost', 'labour_duration'} & set(update_fields):
+        instance.total_cost, instance.labour_duration = stored[3:]
+
+
+@receiver(post_save, sender=Appointment)
+def update_summary(sender, instance, created, **kwargs):
+    key = (instance.date, instance.mechanic_id, instance.status)
+    stored = instance._stored_summary_key
+    if created:
+        add_to_summary(*key, appointments=1, revenue=instance.total_cost, labour=instance.labour_duration)
+    elif stored is not None:
+        move_in_summary(instance.pk, stored, key)
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=ArchivedAppointment)
+def remove_from_summary(sender, instance, **kwargs):
+    # Το αρχείο μετρά στα ημερήσια σύνολα (βλ. archive.py): π.χ. η διαγραφή πελάτη διαγράφει
+    # σε cascade και τα αρχειοθετημένα ραντεβού του
+    add_to_summary(
+        instance.date, instance.mechanic_id, instance.status,
+        appointments=-1, revenue=-instance.total_cost, labour=-instance.labour_duration,
+    )
+
+
+# Cache τμημάτων σελίδων: κάθε αλλαγή διαγράφει μόνο τα τμήματα που εμφανίζουν τα δεδομένα της
+
+@receiver(pre_save, sender=Car)
+def invalidate_previous_owner(sender, instance, **kwargs):
+    if not instance._state.adding:
+        invalidate(MY_CARS, *Car.objects.filter(pk=instance.pk).values_list('owner_id', flat=True))
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def invalidate_car_fragments(sender, instance, created=False, **kwargs):
+    invalidate(MY_CARS, instance.owner_id)
+    if not created:
+        # Τα στοιχεία του αυτοκινήτου εμφανίζονται και στα ραντεβού του
+        users = Appointment.objects.filter(car_id=instance.pk).values_list('client_id', 'mechanic_id').distinct()
+        invalidate(MY_APPOINTMENTS, *{client_id for client_id, _ in users})
+        invalidate(MY_ASSIGNED_APPOINTMENTS, *{mechanic_id for _, mechanic_id in users})
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_fragments(sender, instance, **kwargs):
+    invalidate(MY_APPOINTMENTS, instance.client_id)
+    invalidate(MY_ASSIGNED_APPOINTMENTS, instance.mechanic_id)
+
+
+@receiver(pre_save, sender=Appointment)
+def invalidate_previous_mechanic(sender, instance, **kwargs):
+    # Ο προηγούμενος μηχανικός (αν αλλάζει) χάνει το ραντεβού από τη λίστα του
+    stored = instance._stored_summary_key
+    if stored is not None and stored[1] != instance.mechanic_id:
+        invalidate(MY_ASSIGNED_APPOINTMENTS, stored[1])
+
+
+# Ελεύθερες θέσεις: κάθε αλλαγή ραντεβού διαγράφει την ημέρα του (και την προηγούμενη, αν αλλάζει)
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_slots(sender, instance, **kwargs):
+    invalidate_days(instance.date)
+
+
+@receiver(pre_save, sender=Appointment)
+def invalidate_previous_day(sender, instance, **kwargs):
+    stored = instance._stored_summary_key
+    if stored is not None and stored[0] != instance.date:
+        invalidate_days(stored[0])
+
+
+def invalidate_work_appointment(appointment_id):
+    # Οι εργασίες αλλάζουν μόνο το κόστος, που εμφανίζεται στα ραντεβού του πελάτη
+    invalidate(MY_APPOINTMENTS, *Appointment.objects.filter(pk=appointment_id).values_list('client_id', flat=True))
+
+
+@receiver(pre_save, sender=Work)
+def invalidate_previous_appointment(sender, instance, **kwargs):
+    if instance._stored_appointment_id not in (None, instance.appointment_id):
+        invalidate_work_appointment(instance._stored_appointment_id)
+
+
+@receiver(post_save, sender=Work)
+@receiver(post_delete, sender=Work)
+def invalidate_work_fragments(sender, instance, **kwargs):
+    invalidate_work_appointment(instance.appointment_id)
@@ -0,0 +1,82 @@
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Appointment, User
+from .scheduling import ACTIVE_APPOINTMENT, APPOINTMENT_DURATION, CLOSING_HOUR, OPENING_HOUR, is_free, to_minutes
+
+"""
+Πλέγμα ελεύθερων θέσεων για το ημερολόγιο κρατήσεων: για κάθε ημέρα ενός διαστήματος
+και κάθε ώρα έναρξης, το πλήθος των μηχανικών που είναι διαθέσιμοι (όπως στο
+available_mechanics, αλλά χωρίς ένα query ανά θέση).
+Οι ώρες έναρξης των ενεργών ραντεβού ανά μηχανικό αποθηκεύονται στην cache ανά ημέρα.
+Οι ημέρες που λείπουν από την cache φορτώνονται με ένα query για όλο το διάστημα.
+Η cache μιας ημέρας διαγράφεται όταν αλλάζει κάποιο ραντεβού της (βλ. signals.py,
+batch.py και transitions.py), μετά το commit του transaction.
+"""
+
+# Χρόνος ζωής μιας ημέρας στην cache (δίχτυ ασφαλείας για αλλαγές χωρίς signals, π.χ. generate_dataset)
+SLOTS_TIMEOUT = 600
+
+# Απόσταση μεταξύ διαδοχικών ωρών έναρξης στο πλέγμα (σε λεπτά)
+SLOT_INTERVAL = 60
+
+# Ώρες έναρξης στο πλέγμα: το ραντεβού πρέπει να τελειώνει εντός ωραρίου
+SLOT_STARTS = list(range(to_minutes(OPENING_HOUR), to_minutes(CLOSING_HOUR) - APPOINTMENT_DURATION + 1, SLOT_INTERVAL))
+
+# Μέγιστο πλήθος ημερών ανά αίτημα
+MAX_RANGE_DAYS = 62
+
+
+def slots_key(day):
+    return f'slots:{day.isoformat()}'
+
+
+def invalidate_days(*days):
+    """Διαγράφει από την cache τις ημέρες μετά το commit του τρέχοντος transaction"""
+    keys = {slots_key(day) for day in days if day is not None}
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def busy_by_day(days):
+    """
+    Επιστρέφει {ημέρα: {μηχανικός: ταξινομημένες ώρες έναρξης σε λεπτά}} για τις ημέρες `days`.
+    Οι ημέρες που δεν είναι στην cache φορτώνονται με ένα query και αποθηκεύονται.
+    """
+    cached = cache.get_many([slots_key(day) for day in days])
+    busy = {day: cached[slots_key(day)] for day in days if slots_key(day) in cached}
+    missing = [day for day in days if day not in busy]
+    if missing:
+        loaded = {day: defaultdict(list) for day in missing}
+        rows = Appointment.objects.filter(ACTIVE_APPOINTMENT, date__in=missing).order_by('hour').values_list(
+            'date', 'mechanic_id', 'hour',
+        )
+        for day, mechanic_id, hour in rows:
+            loaded[day][mechanic_id].append(to_minutes(hour))
+        loaded = {day: dict(starts) for day, starts in loaded.items()}
+        cache.set_many({slots_key(day): starts for day, starts in loaded.items()}, SLOTS_TIMEOUT)
+        busy.update(loaded)
+    return busy
+
+
+def free_slots(start, end):
+    """
+    Επιστρέφει λίστα [(ημέρα, [(ώρα έναρξης, πλήθος ελεύθερων μηχανικών), ...]), ...]
+    για τις ημέρες από start έως end. Εκτελεί έως 2 queries (μηχανικοί και ημέρες εκτός cache).
+    """
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    mechanic_ids = set(User.objects.filter(role='mechanic', is_active=True).values_list('pk', flat=True))
+    busy = busy_by_day(days)
+
+    grid = []
+    for day in days:
+        # Μόνο οι μηχανικοί με ραντεβού την ημέρα αυτή μπορεί να μην είναι ελεύθεροι
+        starts = [hours for mechanic_id, hours in busy[day].items() if mechanic_id in mechanic_ids]
+        grid.append((day, [
+            (time(slot // 60, slot % 60), len(mechanic_ids) - sum(not is_free(hours, slot) for hours in starts))
+            for slot in SLOT_STARTS
+        ]))
+    return grid
@@ -0,0 +1,16 @@
+// Προτάσεις αυτόματης συμπλήρωσης καθώς πληκτρολογεί ο χρήστης, για κάθε πεδίο με data-autocomplete
+document.querySelectorAll('input[data-autocomplete]').forEach(function (input) {
+  var list = document.getElementById(input.getAttribute('list'));
+  input.addEventListener('input', function () {
+    fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(input.value))
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        list.innerHTML = '';
+        data.results.forEach(function (value) {
+          var option = document.createElement('option');
+          option.value = value;
+          list.appendChild(option);
+        });
+      });
+  });
+});
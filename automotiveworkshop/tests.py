@@ -0,0 +1,180 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from .archive import archive_appointments
+from .autocomplete import INDEXES
+from .benchmarks import (
+    EXPECTED_QUERIES, QUERY_COUNT_URLS, create_cars, create_users, query_count_data, query_count_request,
+    query_count_setup, read_response,
+)
+from .exports import format_value
+from .imports import import_users
+from .models import User, Appointment, ArchivedAppointment, DailySummary, Work
+from .reports import rebuild_summary
+from .search import search
+from .urls import urlpatterns
+
+"""
+Tests της εφαρμογής: `python manage.py test automotiveworkshop`.
+Έλεγχος N+1 για όλες τις views: το πλήθος των queries κάθε URL κλειδώνεται στο EXPECTED_QUERIES
+(βλ. benchmarks.py) και ελέγχεται για δύο μεγέθη δεδομένων, ώστε ένα query ανά γραμμή να αποτυγχάνει.
+"""
+
+# Πλήθος πελατών/αυτοκινήτων/ραντεβού στους δύο ελέγχους
+QUERY_COUNT_SIZES = [10, 50]
+
+
+class QueryCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users, self.clients, self.own_car, self.objects = query_count_setup()
+
+    def test_every_url_has_query_count(self):
+        names = [pattern.name for pattern in urlpatterns]
+        self.assertEqual([name for name in names if name not in QUERY_COUNT_URLS], [])
+        self.assertEqual([name for name in names if name not in EXPECTED_QUERIES], [])
+
+    def test_query_counts(self):
+        created = 0
+        for size in QUERY_COUNT_SIZES:
+            query_count_data(self.users, self.own_car, self.objects, created, size)
+            created = size
+            for name in QUERY_COUNT_URLS:
+                with self.subTest(url=name, size=size):
+                    request, url = query_count_request(self.clients, self.objects, name)
+                    request(url)  # Ζέσταμα (ευρετήρια στη μνήμη, cache περιεχομένου)
+                    with self.assertNumQueries(EXPECTED_QUERIES[name]):
+                        response = read_response(request, url)
+                    self.assertIn(response.status_code, (200, 302, 405))
+
+
+class DailySummaryTests(TestCase):
+
+    def setUp(self):
+        self.client_user = create_users(1, 'client', 'summary_client')[0]
+        self.mechanic = create_users(1, 'mechanic', 'summary_mechanic')[0]
+        car = create_cars([self.client_user], 'SUMMARY')[0]
+        self.appointment = Appointment.objects.create(
+            client=self.client_user, car=car, mechanic=self.mechanic,
+            date=date(2000, 1, 1), hour=time(8, 0), service_type='service',
+        )
+
+    def test_delete_client_and_mechanic_together(self):
+        # Οι γραμμές του μηχανικού γίνονται πρώτα «χωρίς μηχανικό» και μετά διαγράφεται το ραντεβού του πελάτη
+        User.objects.filter(pk__in=[self.client_user.pk, self.mechanic.pk]).delete()
+        self.assertFalse(Appointment.objects.exists())
+        self.assertFalse(DailySummary.objects.filter(mechanic_id=self.mechanic.pk).exists())
+
+    def test_save_keeps_work_totals(self):
+        # Ένα αντίγραφο φορτωμένο πριν από τις εργασίες δεν αντικαθιστά τα σύνολά τους
+        stale = Appointment.objects.get(pk=self.appointment.pk)
+        Work.objects.create(
+            appointment=self.appointment, description='Σέρβις', materials='Λάδια',
+            completion_time=timedelta(minutes=30), cost=Decimal('40.00'),
+        )
+        stale.status = 'IN_PROGRESS'
+        stale.save()
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.total_cost, Decimal('40.00'))
+        self.assertEqual(self.appointment.labour_duration, timedelta(minutes=30))
+        summary = DailySummary.objects.get(mechanic=self.mechanic, status='IN_PROGRESS')
+        self.assertEqual((summary.appointments, summary.revenue), (1, Decimal('40.00')))
+
+    def test_reconcile_totals(self):
+        # Εργασίες που εισάγονται με bulk_create (χωρίς signals) και ραντεβού στο αρχείο
+        Work.objects.bulk_create([Work(
+            appointment=self.appointment, description='Σέρβις', materials='Λάδια',
+            completion_time=timedelta(minutes=30), cost=Decimal('40.00'),
+        )])
+        Appointment.objects.filter(pk=self.appointment.pk).update(status='COMPLETED')
+        DailySummary.objects.all().delete()
+        archive_appointments(date(2000, 1, 2))
+        ArchivedAppointment.objects.update(total_cost=Decimal('0.00'), labour_duration=timedelta(0))
+
+        call_command('reconcile_appointment_totals', stdout=StringIO())
+        archived = ArchivedAppointment.objects.get(pk=self.appointment.pk)
+        self.assertEqual((archived.total_cost, archived.labour_duration), (Decimal('40.00'), timedelta(minutes=30)))
+        summary = DailySummary.objects.get(mechanic=self.mechanic, status='COMPLETED')
+        self.assertEqual((summary.appointments, summary.revenue), (1, Decimal('40.00')))
+
+    def test_delete_archived_appointment(self):
+        # Η διαγραφή του αυτοκινήτου διαγράφει σε cascade και το αρχειοθετημένο ραντεβού
+        Appointment.objects.filter(pk=self.appointment.pk).update(status='COMPLETED')
+        rebuild_summary(date(2000, 1, 1), date(2000, 1, 1))
+        archive_appointments(date(2000, 1, 2))
+        self.appointment.car.delete()
+        self.assertFalse(ArchivedAppointment.objects.exists())
+        self.assertEqual(DailySummary.objects.get(mechanic=self.mechanic, status='COMPLETED').appointments, 0)
+
+    def test_save_copy_and_deleted_row(self):
+        # pk = None: νέο ραντεβού. Γραμμή που διαγράφηκε στο μεταξύ: ξαναδημιουργείται
+        copy = Appointment.objects.get(pk=self.appointment.pk)
+        copy.pk = None
+        copy.save()
+        self.assertEqual(Appointment.objects.count(), 2)
+        Appointment.objects.filter(pk=self.appointment.pk).delete()
+        self.appointment.save()
+        self.assertTrue(Appointment.objects.filter(pk=self.appointment.pk).exists())
+        self.assertEqual(DailySummary.objects.get(mechanic=self.mechanic, status='CREATED').appointments, 2)
+
+
+class CSVExportTests(TestCase):
+
+    def test_formula_values_are_escaped(self):
+        self.assertEqual(format_value('=HYPERLINK("http://x")'), '\'=HYPERLINK("http://x")')
+        self.assertEqual(format_value('-2+3'), "'-2+3")
+        self.assertEqual(format_value('\tκείμενο'), "'\tκείμενο")
+        self.assertEqual(format_value('Αλλαγή λαδιών'), 'Αλλαγή λαδιών')
+        self.assertEqual(format_value(Decimal('-5.00')), Decimal('-5.00'))
+
+
+class AutocompleteTests(TestCase):
+
+    def setUp(self):
+        self.index = INDEXES['users']
+        self.index.load()
+
+    def test_index_follows_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create(username='autocomplete_client', role='client', password='!')
+        self.assertEqual(self.index.complete('autocomplete_'), [user.username])
+
+        # Αποθήκευση μόνο του last_login: καμία ενημέρωση του ευρετηρίου
+        with self.captureOnCommitCallbacks() as callbacks:
+            user.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+        # Αλλαγή που δεν γίνεται commit: το ευρετήριο δεν αλλάζει
+        with self.captureOnCommitCallbacks(execute=False):
+            user.username = 'autocomplete_renamed'
+            user.save()
+        self.assertEqual(self.index.complete('autocomplete_renamed'), [])
+
+
+class SearchTests(TestCase):
+
+    def test_empty_query_lists_objects(self):
+        create_users(3, 'client', 'search_client')
+        self.assertEqual(len(search(User, '')), User.objects.count())
+        self.assertEqual([user.username for user in search(User, 'search_client_1')], ['search_client_1'])
+
+
+class ImportTests(TestCase):
+
+    def test_user_created_during_import_is_skipped(self):
+        def rows():
+            yield {'username': 'import_first', 'password': 'secret'}
+            # Ο χρήστης δημιουργείται αφού φορτωθούν τα υπάρχοντα usernames
+            User.objects.create(username='import_late', role='client', password='!')
+            yield {'username': 'import_late', 'password': 'secret'}
+
+        report = import_users(rows(), workers=1)
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.skipped, [{'line': 3, 'key': 'import_late', 'reason': "Ο χρήστης υπάρχει ήδη."}])
+        self.assertTrue(User.objects.filter(username='import_first').exists())
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Appointment
+from .reports import add_many_to_summary
+from .fragments import MY_APPOINTMENTS, MY_ASSIGNED_APPOINTMENTS, invalidate
+from .slots import invalidate_days
+
+"""
+Αλλαγές κατάστασης ραντεβού, μεμονωμένες ή μαζικές (π.χ. το κλείσιμο της ημέρας).
+Ο κανόνας «ραντεβού σε τελική κατάσταση δεν αλλάζει» εφαρμόζεται από τη βάση, με ένα
+UPDATE ... WHERE status NOT IN (τελικές καταστάσεις) για όλα τα ραντεβού μαζί, οπότε το
+πλήθος των queries δεν εξαρτάται από το πλήθος τους.
+Το queryset.update δεν στέλνει signals: τα ημερήσια σύνολα, η cache των σελίδων και οι
+ελεύθερες θέσεις των ημερών ενημερώνονται εδώ.
+"""
+
+# Τελικές καταστάσεις: ένα ραντεβού σε αυτές δεν αλλάζει πια κατάσταση
+FINAL_STATUSES = ['COMPLETED', 'CANCELLED']
+
+# Μέγιστο πλήθος ραντεβού ανά μαζική αλλαγή (όριο παραμέτρων του IN στη βάση)
+MAX_TRANSITION_SIZE = 1000
+
+# Πεδία που χρειάζονται για τα ημερήσια σύνολα και την cache
+SUMMARY_FIELDS = ['client', 'mechanic', 'date', 'status', 'total_cost', 'labour_duration']
+
+
+def summary_changes(transitions):
+    """
+    Μεταβολές των ημερήσιων συνόλων (για το add_many_to_summary) από ζεύγη
+    (ραντεβού με την παλιά κατάσταση, νέα κατάσταση).
+    """
+    changes = defaultdict(lambda: (0, 0, timedelta(0)))
+    for appointment, new_status in transitions:
+        if appointment.status == new_status:
+            continue
+        for status, sign in [(appointment.status, -1), (new_status, 1)]:
+            key = (appointment.date, appointment.mechanic_id, status)
+            count, revenue, labour = changes[key]
+            changes[key] = (
+                count + sign, revenue + sign * appointment.total_cost, labour + sign * appointment.labour_duration,
+            )
+    return changes
+
+
+def transition_statuses(ids, status):
+    """
+    Περνά στην κατάσταση `status` όσα από τα ραντεβού `ids` δεν είναι σε τελική κατάσταση.
+    Επιστρέφει (ids που άλλαξαν, ids που απορρίφθηκαν: ανύπαρκτα ή σε τελική κατάσταση),
+    με τη σειρά των ids. Εκτελεί σταθερό πλήθος queries.
+    """
+    ids = list(dict.fromkeys(ids))
+    with transaction.atomic():
+        open_appointments = Appointment.objects.filter(pk__in=ids).exclude(status__in=FINAL_STATUSES)
+        # Οι γραμμές κλειδώνονται, ώστε το UPDATE να αλλάξει ακριβώς τα ραντεβού που διαβάστηκαν
+        appointments = list(open_appointments.select_for_update().only(*SUMMARY_FIELDS))
+        open_appointments.update(status=status)
+        add_many_to_summary(summary_changes((appointment, status) for appointment in appointments))
+        invalidate(MY_APPOINTMENTS, *{appointment.client_id for appointment in appointments})
+        invalidate(MY_ASSIGNED_APPOINTMENTS, *{appointment.mechanic_id for appointment in appointments})
+        invalidate_days(*{appointment.date for appointment in appointments})
+
+    updated = {appointment.pk for appointment in appointments}
+    return [pk for pk in ids if pk in updated], [pk for pk in ids if pk not in updated]
@@ -18,7 +18,16 @@ from .views import (
     CarCSVUploadView,
     UserSearchView,
     CarSearchView,
-    AppointmentSearchView
+    AppointmentSearchView,
+    ImportJobDetailView,
+    ImportJobProgressView,
+    AutocompleteView,
+    ReportView,
+    AppointmentBatchView,
+    AppointmentBulkStatusView,
+    SlotAvailabilityView,
+    MechanicCalendarView,
+    ExportView,
 
 )
 
@@ -28,6 +37,7 @@ urlpatterns = [
     path('appointments/create/', AppointmentCreateView.as_view(), name='appointment_create'),
     path('appointments/create/by-secretary/', SecretaryAppointmentCreateView.as_view(), name='secretary_appointment_create'),
     path('appointments/<int:pk>/update-status/', AppointmentStatusUpdateView.as_view(), name='appointment_update_status'),
+    path('appointments/update-status/', AppointmentBulkStatusView.as_view(), name='appointment_bulk_status'),
     path('appointments/mine/', MyAppointmentsView.as_view(), name='my_appointments'),
     path('login/', auth_views.LoginView.as_view(template_name='login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='index'), name='logout'),
@@ -39,8 +49,16 @@ urlpatterns = [
     path('cars/all/', CarListView.as_view(), name='all_cars'),
     path('upload/users/', UserCSVUploadView.as_view(), name='user_upload'),
     path('upload/cars/', CarCSVUploadView.as_view(), name='car_upload'),
+    path('upload/jobs/<int:pk>/', ImportJobDetailView.as_view(), name='import_job'),
+    path('upload/jobs/<int:pk>/progress/', ImportJobProgressView.as_view(), name='import_job_progress'),
     path('search/users/', UserSearchView.as_view(), name='user_search'),
     path('search/cars/', CarSearchView.as_view(), name='car_search'),
     path('search/appointments/', AppointmentSearchView.as_view(), name='appointment_search'),
+    path('autocomplete/<str:kind>/', AutocompleteView.as_view(), name='autocomplete'),
+    path('reports/', ReportView.as_view(), name='report'),
+    path('api/appointments/', AppointmentBatchView.as_view(), name='api_appointments'),
+    path('api/slots/', SlotAvailabilityView.as_view(), name='appointment_slots'),
+    path('calendar/<int:pk>/<str:token>.ics', MechanicCalendarView.as_view(), name='mechanic_calendar'),
+    path('exports/<str:kind>.csv', ExportView.as_view(), name='export'),
 
 ]
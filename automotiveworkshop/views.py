@@ -1,22 +1,40 @@
-from django.views.generic import CreateView, UpdateView, ListView, View
+import heapq
+import json
+from datetime import date, timedelta
+
+from django.views.generic import CreateView, UpdateView, ListView, DetailView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponseRedirect, HttpResponseBadRequest, JsonResponse, Http404, StreamingHttpResponse
 from django.contrib import messages
 from django.utils.decorators import method_decorator
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.models import User
 from django.views.generic import ListView
 from django.contrib.auth import get_user_model
-import random
-import csv
 from .forms import CSVUploadForm
 from django.utils.decorators import method_decorator
-from django.db.models import Q
 
-from .models import Car, Appointment, User
-from .forms import CarForm, AppointmentForm, CustomUserCreationForm
+from .models import Car, Appointment, ArchivedAppointment, User, ImportJob
+from .forms import CarForm, AppointmentForm, CustomUserCreationForm, BulkStatusForm
 from .decorators import client_required, secretary_required, mechanic_required
+from .scheduling import book_appointment
+from .search import SEARCH_LIMIT, asearch
+from .autocomplete import INDEXES
+from .pagination import KeysetPaginationMixin
+from .reports import mechanic_report
+from .fragments import CachedFragmentMixin, MY_CARS, MY_APPOINTMENTS, MY_ASSIGNED_APPOINTMENTS
+from .async_views import AsyncListView
+from .batch import BatchError, create_appointments, fetch_appointments, update_statuses
+from .transitions import FINAL_STATUSES, transition_statuses
+from .slots import MAX_RANGE_DAYS, free_slots
+from .calendar_feed import calendar_token, check_calendar_token, feed_lines, feed_version
+from .exports import EXPORTS
+from .archive import IncludeArchivedMixin
 
 """
 Οι παρακάτω views υλοποιούν τη λειτουργικότητα της εφαρμογής για:
@@ -24,6 +42,7 @@ from .decorators import client_required, secretary_required, mechanic_required
 - Μηχανικούς
 - Γραμματείς
 Χρησιμοποιούνται class-based views για καλύτερη οργάνωση και επαναχρησιμοποίηση κώδικα.
+Οι σελίδες λίστας και αναζήτησης είναι ασύγχρονες (AsyncListView, βλ. async_views.py).
 """
 
 class IndexView(View):
@@ -32,14 +51,17 @@ class IndexView(View):
         return render(request, 'index.html')
 
 
-class MyCarsView(LoginRequiredMixin, ListView):
+@method_decorator(login_required, name='dispatch')
+class MyCarsView(CachedFragmentMixin, AsyncListView):
     """
     Λίστα με τα αυτοκίνητα του τρέχοντα χρήστη (πελάτη).
-    Χρησιμοποιεί το LoginRequiredMixin για έλεγχο σύνδεσης.
+    Χρησιμοποιεί το login_required για έλεγχο σύνδεσης.
+    Η λίστα αποθηκεύεται στην cache ανά χρήστη (βλ. fragments.py).
     """
     model = Car
     template_name = 'my_cars.html'
     context_object_name = 'cars'
+    fragment_name = MY_CARS
 
     def get_queryset(self):
         """Φιλτράρει τα αυτοκίνητα βάσει ιδιοκτήτη"""
@@ -76,41 +98,66 @@ class AppointmentCreateView(LoginRequiredMixin, CreateView):
         form.instance.client = self.request.user
         form.instance.status = 'CREATED'
 
-        # τυχαιοσ μηχανικος
-        mechanics = User.objects.filter(role='mechanic', is_active=True)
-        if mechanics.exists():
-            form.instance.mechanic = random.choice(mechanics)
-        else:
-            form.instance.mechanic = None  
-
-        return super().form_valid(form)
+        # Ατομική ανάθεση του λιγότερο φορτωμένου διαθέσιμου μηχανικού
+        self.object = book_appointment(form.instance)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 
 @method_decorator(client_required, name='dispatch')
-class MyAppointmentsView(LoginRequiredMixin, ListView):
+class MyAppointmentsView(IncludeArchivedMixin, CachedFragmentMixin, AsyncListView):
     """
     Προβολή των ραντεβού του τρέχοντα πελάτη.
     Ταξινομείται με φθίνουσα σειρά ημερομηνίας/ώρας.
+    Η λίστα αποθηκεύεται στην cache ανά χρήστη (βλ. fragments.py).
+    Με ?archived=1 περιλαμβάνει και τα αρχειοθετημένα ραντεβού (χωρίς cache).
     """
     model = Appointment
     template_name = 'my_appointments.html'
     context_object_name = 'appointments'
+    fragment_name = MY_APPOINTMENTS
 
     def get_queryset(self):
-        return Appointment.objects.filter(client=self.request.user).order_by('-date', '-hour')
-
-
-class MyAssignedAppointmentsView(LoginRequiredMixin, ListView):
+        return Appointment.objects.filter(client=self.request.user).select_related('car').order_by('-date', '-hour', '-id')
+
+    async def aget_object_list(self, queryset):
+        if not self.include_archived():
+            return await super().aget_object_list(queryset)
+        # Δύο ταξινομημένα queries (ραντεβού και αρχείο), συγχωνευμένα κατά ημερομηνία/ώρα
+        archived = ArchivedAppointment.objects.filter(
+            client=self.request.user,
+        ).select_related('car').order_by('-date', '-hour', '-id')
+        return list(heapq.merge(
+            [appointment async for appointment in queryset.aiterator()],
+            [appointment async for appointment in archived.aiterator()],
+            key=lambda appointment: (appointment.date, appointment.hour, appointment.pk),
+            reverse=True,
+        ))
+
+
+@method_decorator(login_required, name='dispatch')
+class MyAssignedAppointmentsView(CachedFragmentMixin, AsyncListView):
     """
     Προβολή των ανατεθειμένων ραντεβού για μηχανικό.
+    Η λίστα αποθηκεύεται στην cache ανά χρήστη (βλ. fragments.py).
     """
     model = Appointment
-    template_name = 'appointment_list.html'
+    template_name = 'my_assigned_appointments.html'
     context_object_name = 'appointments'
+    fragment_name = MY_ASSIGNED_APPOINTMENTS
 
     def get_queryset(self):
-        return Appointment.objects.filter(mechanic=self.request.user).order_by('date', 'hour')
+        return Appointment.objects.filter(mechanic=self.request.user).select_related('car').order_by('date', 'hour')
+
+    def get_context_data(self, **kwargs):
+        """Προσθέτει το URL της ροής ημερολογίου (ICS) του μηχανικού"""
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        if user.role == 'mechanic':
+            context['calendar_url'] = self.request.build_absolute_uri(
+                reverse('mechanic_calendar', kwargs={'pk': user.pk, 'token': calendar_token(user)})
+            )
+        return context
 
 
 @method_decorator(secretary_required, name='dispatch')
@@ -122,12 +169,13 @@ class SecretaryAppointmentCreateView(LoginRequiredMixin, CreateView):
     model = Appointment
     form_class = AppointmentForm
     template_name = 'secretary_appointment_form.html'
-    success_url = reverse_lazy('appointment_list')
+    success_url = reverse_lazy('all_appointments')
 
     def form_valid(self, form):
-        """Ορίζει μόνο την κατάσταση - τα υπόλοιπα τα ορίζει ο γραμματέας"""
+        """Ορίζει την κατάσταση και αναθέτει μηχανικό - τα υπόλοιπα τα ορίζει ο γραμματέας"""
         form.instance.status = 'CREATED'
-        return super().form_valid(form)
+        self.object = book_appointment(form.instance)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 @method_decorator(secretary_required, name='dispatch')
@@ -139,21 +187,58 @@ class AppointmentStatusUpdateView(LoginRequiredMixin, UpdateView):
     model = Appointment
     fields = ['status']
     template_name = 'update_status.html'
-    success_url = reverse_lazy('appointment_list')
+    success_url = reverse_lazy('all_appointments')
 
     def form_valid(self, form):
-        current_status = self.get_object().status
-        new_status = form.cleaned_data['status']
-        
-        if current_status in ['COMPLETED', 'CANCELLED']:
+        """Η αλλαγή γίνεται με το transition_statuses, που απορρίπτει τις τελικές καταστάσεις"""
+        _, rejected = transition_statuses([self.object.pk], form.cleaned_data['status'])
+        if rejected:
             messages.error(self.request, "Δεν μπορείτε να αλλάξετε ένα τελικό στάδιο.")
-            return redirect('appointment_detail', pk=self.get_object().pk)
-            
-        return super().form_valid(form)
+            return redirect('appointment_update_status', pk=self.object.pk)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+@method_decorator(secretary_required, name='dispatch')
+class AppointmentBulkStatusView(LoginRequiredMixin, View):
+    """
+    Μαζική αλλαγή κατάστασης από γραμματέα (π.χ. κλείσιμο της ημέρας).
+    Εμφανίζει τα ανοιχτά ραντεβού μιας ημέρας (?date=, προεπιλογή σήμερα) και αλλάζει
+    όσα επιλεγούν με ένα UPDATE (transition_statuses), αναφέροντας όσα απορρίφθηκαν.
+    """
+    template_name = 'bulk_status.html'
+
+    def get_day(self):
+        try:
+            return date.fromisoformat(self.request.GET.get('date') or date.today().isoformat())
+        except ValueError:
+            raise Http404("Μη έγκυρη ημερομηνία.")
+
+    def render_page(self, form):
+        day = self.get_day()
+        appointments = Appointment.objects.filter(date=day).exclude(
+            status__in=FINAL_STATUSES,
+        ).select_related('client', 'car', 'mechanic').order_by('hour', 'id')
+        return render(self.request, self.template_name, {'form': form, 'appointments': appointments, 'day': day})
+
+    def get(self, request):
+        return self.render_page(BulkStatusForm())
+
+    def post(self, request):
+        form = BulkStatusForm(request.POST)
+        if not form.is_valid():
+            return self.render_page(form)
+        updated, rejected = transition_statuses(form.cleaned_data['ids'], form.cleaned_data['status'])
+        messages.success(request, f"Άλλαξε η κατάσταση σε {len(updated)} ραντεβού.")
+        if rejected:
+            messages.error(
+                request,
+                f"Δεν άλλαξαν (ανύπαρκτα ή σε τελικό στάδιο): {', '.join(f'#{pk}' for pk in rejected)}",
+            )
+        return redirect(request.get_full_path())
 
 
 @method_decorator(secretary_required, name='dispatch')
-class AppointmentListView(LoginRequiredMixin, ListView):
+class AppointmentListView(KeysetPaginationMixin, AsyncListView):
     """
     Πλήρης λίστα ραντεβού για γραμματέα.
     """
@@ -161,13 +246,15 @@ class AppointmentListView(LoginRequiredMixin, ListView):
     template_name = 'appointment_list.html'
     context_object_name = 'appointments'
     paginate_by = 10  # Σελιδοποίηση ανά 10 εγγραφές
+    keyset_ordering = ('-date', '-hour', '-id')  # Σελιδοποίηση με κέρσορα (χωρίς OFFSET/COUNT)
+    extra_context = {'status_choices': Appointment.STATUS_CHOICES}  # Για το φίλτρο της εξαγωγής CSV
 
     def get_queryset(self):
         return Appointment.objects.all()
 
 
 @method_decorator(client_required, name='dispatch')
-class ClientAppointmentListView(LoginRequiredMixin, ListView):
+class ClientAppointmentListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     Λίστα ραντεβού για πελάτη (μόνο τα δικά του).
     """
@@ -175,13 +262,14 @@ class ClientAppointmentListView(LoginRequiredMixin, ListView):
     template_name = 'client_appointment_list.html'
     context_object_name = 'appointments'
     paginate_by = 10
+    keyset_ordering = ('-date', '-hour', '-id')
 
     def get_queryset(self):
         return Appointment.objects.filter(client=self.request.user)
 
 
 @method_decorator(client_required, name='dispatch')
-class ClientCarListView(LoginRequiredMixin, ListView):
+class ClientCarListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     Λίστα αυτοκινήτων για πελάτη (μόνο τα δικά του).
     """
@@ -189,13 +277,14 @@ class ClientCarListView(LoginRequiredMixin, ListView):
     template_name = 'client_car_list.html'
     context_object_name = 'cars'
     paginate_by = 10
+    keyset_ordering = ('id',)
 
     def get_queryset(self):
         return Car.objects.filter(owner=self.request.user)
 
 
 @method_decorator(mechanic_required, name='dispatch')
-class MechanicAppointmentListView(LoginRequiredMixin, ListView):
+class MechanicAppointmentListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     Λίστα ραντεβού για μηχανικό (μόνο τα ανατεθειμένα σε αυτόν).
     """
@@ -203,6 +292,7 @@ class MechanicAppointmentListView(LoginRequiredMixin, ListView):
     template_name = 'mechanic_appointment_list.html'
     context_object_name = 'appointments'
     paginate_by = 10
+    keyset_ordering = ('date', 'hour', 'id')
 
     def get_queryset(self):
         return Appointment.objects.filter(mechanic=self.request.user)
@@ -227,17 +317,63 @@ class RegisterView(CreateView):
         messages.success(self.request, "Η εγγραφή ήταν επιτυχής. Μπορείτε τώρα να συνδεθείτε.")
         return redirect(self.success_url)
     
-class AllUsersView(ListView):
+
+@method_decorator(secretary_required, name='dispatch')
+class AllUsersView(KeysetPaginationMixin, AsyncListView):
+    """
+    Λίστα όλων των χρηστών για γραμματέα, με σελιδοποίηση κέρσορα.
+    Φορτώνονται μόνο τα πεδία που εμφανίζει το template.
+    """
     model = User
     template_name = 'user_list.html'
     context_object_name = 'users'
+    paginate_by = 20
+    keyset_ordering = ('username',)
+
+    def get_queryset(self):
+        return User.objects.only('username', 'first_name', 'last_name')
+
 
-class CarListView(ListView):
+@method_decorator(secretary_required, name='dispatch')
+class CarListView(KeysetPaginationMixin, AsyncListView):
+    """
+    Λίστα όλων των αυτοκινήτων για γραμματέα, με σελιδοποίηση κέρσορα.
+    Ο ιδιοκτήτης φορτώνεται με join (select_related) αντί για ένα query ανά αυτοκίνητο.
+    """
     model = Car
-    template_name = 'car_list.html'  # Make sure this template exists
+    template_name = 'car_list.html'
     context_object_name = 'cars'
+    paginate_by = 20
+    keyset_ordering = ('id',)
+
+    def get_queryset(self):
+        return Car.objects.select_related('owner').only(
+            'serial_number', 'make', 'model', 'owner__username'
+        )
+
+
+# Μέγιστο πλήθος σφαλμάτων που επιστρέφονται στην πρόοδο εισαγωγής
+MAX_PROGRESS_ERRORS = 50
+
 
 #εισαγωγη αρχειου csv
+def enqueue_import(request, kind):
+    """
+    Αποθηκεύει το ανεβασμένο CSV ως εργασία εισαγωγής στο παρασκήνιο
+    και ανακατευθύνει στη σελίδα προόδου της.
+    """
+    form = CSVUploadForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return None
+    job = ImportJob.objects.create(
+        kind=kind,
+        csv_file=form.cleaned_data['csv_file'],
+        created_by=request.user,
+    )
+    messages.success(request, "Το αρχείο καταχωρήθηκε για εισαγωγή.")
+    return redirect('import_job', pk=job.pk)
+
+
 @method_decorator(secretary_required, name='dispatch')
 class UserCSVUploadView(View):
     template_name = 'user_upload.html'
@@ -246,30 +382,7 @@ class UserCSVUploadView(View):
         return render(request, self.template_name, {'form': CSVUploadForm()})
 
     def post(self, request):
-        form = CSVUploadForm(request.POST, request.FILES)
-        if form.is_valid():
-            file = form.cleaned_data['csv_file']
-            decoded = file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded)
-
-            count = 0
-            for row in reader:
-                if not User.objects.filter(username=row['username']).exists():
-                    User.objects.create_user(
-                        username=row['username'],
-                        password=row['password'],
-                        first_name=row.get('first_name', ''),
-                        last_name=row.get('last_name', ''),
-                        email=row.get('email', ''),
-                        role=row.get('role', 'client'),
-                        afm=row.get('at', ''),
-                        address=row.get('address', ''),
-                        specialization=row.get('specialization', ''),
-                        is_active=True
-                    )
-                    count += 1
-            messages.success(request, f"{count} users imported.")
-        return redirect('user_upload')
+        return enqueue_import(request, 'users') or redirect('user_upload')
     
 
 @method_decorator(secretary_required, name='dispatch')
@@ -280,76 +393,232 @@ class CarCSVUploadView(View):
         return render(request, self.template_name, {'form': CSVUploadForm()})
 
     def post(self, request):
-        form = CSVUploadForm(request.POST, request.FILES)
-        if form.is_valid():
-            file = form.cleaned_data['csv_file']
-            decoded = file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded)
-
-            count = 0
-            for row in reader:
-                try:
-                    owner = User.objects.get(username=row['owner_username'], role='client')
-                    if not Car.objects.filter(serial_number=row['serial_number']).exists():
-                        Car.objects.create(
-                            owner=owner,
-                            serial_number=row['serial_number'],
-                            model=row['model'],
-                            make=row['make'],
-                            type=row['type'],
-                            fuel_type=row['fuel_type'],
-                            doors=int(row['doors']),
-                            wheels=int(row['wheels']),
-                            production_date=row['production_date'],
-                            acquisition_year=int(row['acquisition_year'])
-                        )
-                        count += 1
-                except Exception:
-                    continue
-            messages.success(request, f"{count} cars imported.")
-        return redirect('car_upload')
+        return enqueue_import(request, 'cars') or redirect('car_upload')
+
+
+@method_decorator(secretary_required, name='dispatch')
+class ImportJobDetailView(LoginRequiredMixin, DetailView):
+    """
+    Σελίδα προόδου εργασίας εισαγωγής.
+    Η σελίδα ανανεώνει την πρόοδο ζητώντας περιοδικά το ImportJobProgressView.
+    """
+    model = ImportJob
+    template_name = 'import_job.html'
+    context_object_name = 'job'
+
+
+@method_decorator(secretary_required, name='dispatch')
+class ImportJobProgressView(LoginRequiredMixin, View):
+    """Πρόοδος εργασίας εισαγωγής σε JSON"""
+
+    def get(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk)
+        return JsonResponse({
+            'id': job.pk,
+            'kind': job.kind,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'rows_processed': job.rows_processed,
+            'rows_created': job.rows_created,
+            'rows_skipped': job.rows_skipped,
+            'errors': job.errors[:MAX_PROGRESS_ERRORS],
+            'message': job.message,
+        })
     
 
-#Βασικη αναζητηση για χρηστη
 @method_decorator(secretary_required, name='dispatch')
-class UserSearchView(LoginRequiredMixin, ListView):
+class ReportView(LoginRequiredMixin, View):
+    """
+    Αναφορά εσόδων και αξιοποίησης μηχανικών για διάστημα ημερών (προεπιλογή ο τρέχων μήνας).
+    Διαβάζει τα ημερήσια σύνολα (DailySummary), όχι τα ραντεβού.
+    """
+    template_name = 'report.html'
+
+    def get(self, request):
+        today = date.today()
+        try:
+            start = date.fromisoformat(request.GET.get('start') or today.replace(day=1).isoformat())
+            end = date.fromisoformat(request.GET.get('end') or today.isoformat())
+        except ValueError:
+            raise Http404("Μη έγκυρη ημερομηνία.")
+        if start > end:
+            start, end = end, start
+        rows, totals = mechanic_report(start, end)
+        return render(request, self.template_name, {'rows': rows, 'totals': totals, 'start': start, 'end': end})
+
+
+#Αναζητηση πληρους κειμενου για χρηστη (ταξινομηση κατα συναφεια)
+@method_decorator(secretary_required, name='dispatch')
+class UserSearchView(AsyncListView):
     model = get_user_model()
     template_name = 'user_search.html'
     context_object_name = 'users'
 
-    def get_queryset(self):
-        query = self.request.GET.get('q', '')
-        return self.model.objects.filter(
-            Q(username__icontains=query) |
-            Q(last_name__icontains=query)
-        )
+    async def aget_object_list(self, queryset):
+        return await asearch(User, self.request.GET.get('q', ''), queryset)
 
-#Βασικη αναζητηση για αμαξι
+#Αναζητηση πληρους κειμενου για αμαξι
 @method_decorator(secretary_required, name='dispatch')
-class CarSearchView(LoginRequiredMixin, ListView):
+class CarSearchView(AsyncListView):
     model = Car
     template_name = 'car_search.html'
     context_object_name = 'cars'
 
     def get_queryset(self):
-        query = self.request.GET.get('q', '')
-        return Car.objects.filter(
-            Q(serial_number__icontains=query) |
-            Q(make__icontains=query) |
-            Q(model__icontains=query)
-        )
+        return Car.objects.select_related('owner')
+
+    async def aget_object_list(self, queryset):
+        return await asearch(Car, self.request.GET.get('q', ''), queryset)
 
-#Βασικη αναζητηση για ραντεβου
+#Αναζητηση πληρους κειμενου για ραντεβου
 @method_decorator(secretary_required, name='dispatch')
-class AppointmentSearchView(LoginRequiredMixin, ListView):
+class AppointmentSearchView(IncludeArchivedMixin, AsyncListView):
     model = Appointment
     template_name = 'appointment_search.html'
     context_object_name = 'appointments'
 
     def get_queryset(self):
-        query = self.request.GET.get('q', '')
-        return Appointment.objects.filter(
-            Q(client__last_name__icontains=query) |
-            Q(client__afm__icontains=query) |
-            Q(status__icontains=query)
-        )
+        return Appointment.objects.select_related('client')
+
+    async def aget_object_list(self, queryset):
+        text = self.request.GET.get('q', '')
+        appointments = await asearch(Appointment, text, queryset)
+        # Με ?archived=1 τα αρχειοθετημένα ακολουθούν τα ενεργά, έως το συνολικό όριο
+        if self.include_archived() and len(appointments) < SEARCH_LIMIT:
+            appointments += await asearch(
+                ArchivedAppointment, text, ArchivedAppointment.objects.select_related('client'),
+                limit=SEARCH_LIMIT - len(appointments),
+            )
+        return appointments
+
+
+#Αυτοματη συμπληρωση σειριακων αριθμων και usernames
+@method_decorator(secretary_required, name='dispatch')
+class AutocompleteView(LoginRequiredMixin, View):
+    """
+    Προτάσεις αυτόματης συμπλήρωσης σε JSON από το ευρετήριο προθεμάτων στη μνήμη.
+    Το kind είναι 'cars' (σειριακοί αριθμοί) ή 'users' (usernames).
+    """
+
+    def get(self, request, kind):
+        if kind not in INDEXES:
+            raise Http404("Άγνωστο είδος αυτόματης συμπλήρωσης.")
+        return JsonResponse({'results': INDEXES[kind].complete(request.GET.get('q', ''))})
+
+
+#Ελευθερες θεσεις ραντεβου για το ημερολογιο κρατησεων
+@method_decorator(client_required, name='dispatch')
+class SlotAvailabilityView(LoginRequiredMixin, View):
+    """
+    Πλήθος ελεύθερων μηχανικών ανά ημέρα και ώρα έναρξης σε JSON (βλ. slots.py), για το
+    ημερολόγιο της φόρμας κράτησης. Διάστημα ?start=&end= (προεπιλογή οι επόμενες 14 ημέρες).
+    """
+
+    def get(self, request):
+        today = date.today()
+        try:
+            start = date.fromisoformat(request.GET.get('start') or today.isoformat())
+            end = date.fromisoformat(request.GET.get('end') or (start + timedelta(days=13)).isoformat())
+        except ValueError:
+            return JsonResponse({'error': "Μη έγκυρη ημερομηνία."}, status=400)
+        if start > end:
+            start, end = end, start
+        if (end - start).days >= MAX_RANGE_DAYS:
+            return JsonResponse({'error': f"Το διάστημα μπορεί να έχει έως {MAX_RANGE_DAYS} ημέρες."}, status=400)
+        return JsonResponse({
+            'days': [
+                {'date': day, 'slots': [{'hour': hour.strftime('%H:%M'), 'free': free} for hour, free in slots]}
+                for day, slots in free_slots(start, end)
+            ],
+        })
+
+
+#Ροη ημερολογιου (ICS) μηχανικου
+class MechanicCalendarView(View):
+    """
+    Ροή ICS με τα επόμενα ραντεβού του μηχανικού (βλ. calendar_feed.py), για εφαρμογές
+    ημερολογίου: η πρόσβαση ελέγχεται με το token του URL, χωρίς σύνδεση.
+    Απαντά 304 (χωρίς να παράγει τη ροή) όταν ταιριάζει το If-None-Match/If-Modified-Since.
+    """
+
+    def get(self, request, pk, token):
+        mechanic = User.objects.filter(pk=pk, role='mechanic', is_active=True).only('password').first()
+        if mechanic is None or not check_calendar_token(mechanic, token):
+            raise Http404("Άγνωστο ημερολόγιο.")
+        etag, last_modified = feed_version(mechanic.pk)
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = StreamingHttpResponse(
+                feed_lines(mechanic.pk, request.get_host(), last_modified),
+                content_type='text/calendar; charset=utf-8',
+            )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+#Εξαγωγη σε CSV
+@method_decorator(secretary_required, name='dispatch')
+class ExportView(LoginRequiredMixin, View):
+    """
+    Εξαγωγή σε CSV (βλ. exports.py). Το kind είναι 'appointments', 'cars' ή 'users'.
+    Προαιρετικά φίλτρα: ?start=&end= (ημερομηνίες) και ?status= (κατάσταση ραντεβού
+    ή 'active'/'inactive' για χρήστες).
+    """
+
+    def get(self, request, kind):
+        export = EXPORTS.get(kind)
+        if export is None:
+            raise Http404("Άγνωστη εξαγωγή.")
+        try:
+            start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+            end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+        except ValueError:
+            return HttpResponseBadRequest("Μη έγκυρη ημερομηνία.")
+        status = request.GET.get('status') or None
+        if status is not None and status not in export.statuses:
+            return HttpResponseBadRequest("Μη έγκυρη κατάσταση.")
+        response = StreamingHttpResponse(export.lines(start, end, status), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{kind}-{date.today().isoformat()}.csv"'
+        return response
+
+
+#Μαζικες λειτουργιες ραντεβου σε JSON
+@method_decorator(secretary_required, name='dispatch')
+class AppointmentBatchView(LoginRequiredMixin, View):
+    """
+    JSON API για μαζικές λειτουργίες ραντεβού (βλ. batch.py):
+    - GET ?ids=1,2,3: τα ραντεβού με αυτά τα id
+    - POST [{"client", "car", "date", "hour", "service_type", "problem_description"}, ...]: δημιουργία
+    - PATCH [{"id", "status"}, ...]: αλλαγή κατάστασης
+    Κάθε παρτίδα εφαρμόζεται ολόκληρη ή καθόλου: αν κάποια εγγραφή δεν είναι έγκυρη,
+    επιστρέφεται 400 με τα σφάλματα ανά θέση της παρτίδας.
+    """
+
+    def get(self, request):
+        try:
+            ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip()]
+            appointments, missing = fetch_appointments(ids)
+        except ValueError:
+            return JsonResponse({'errors': [{'index': None, 'errors': {'ids': ["Μη έγκυρα id."]}}]}, status=400)
+        except BatchError as exc:
+            return JsonResponse({'errors': exc.errors}, status=400)
+        return JsonResponse({'appointments': appointments, 'missing': missing})
+
+    def post(self, request):
+        return self.apply(request, create_appointments, 'created', status=201)
+
+    def patch(self, request):
+        return self.apply(request, update_statuses, 'updated')
+
+    def apply(self, request, operation, key, status=200):
+        try:
+            items = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'errors': [{'index': None, 'errors': {'__all__': ["Μη έγκυρο JSON."]}}]}, status=400)
+        try:
+            result = operation(items)
+        except BatchError as exc:
+            return JsonResponse({'errors': exc.errors}, status=400)
+        return JsonResponse({key: result}, status=status)
@@ -25,7 +25,12 @@ INSTALLED_APPS = [
     'automotiveworkshop',
 ]
 
+# Προφίλ αιτημάτων (Server-Timing και log σε JSON), βλ. automotiveworkshop/profiling.py.
+# Ενεργοποίηση με WORKSHOP_PROFILING=1. Όταν είναι ανενεργό δεν έχει καμία επιβάρυνση.
+PROFILING = os.environ.get('WORKSHOP_PROFILING') == '1'
+
 MIDDLEWARE = [
+    'automotiveworkshop.profiling.ProfilingMiddleware',  # Πρώτο, ώστε να μετρά και τα υπόλοιπα
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -40,7 +45,10 @@ ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': (
+            'automotiveworkshop.profiling.ProfiledDjangoTemplates' if PROFILING
+            else 'django.template.backends.django.DjangoTemplates'
+        ),
         'DIRS': [BASE_DIR / 'automotiveworkshop' / 'templates'],  # template path
         'APP_DIRS': True,
         'OPTIONS': {
@@ -61,9 +69,58 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Τα transactions παίρνουν το κλείδωμα εγγραφής από την αρχή (BEGIN IMMEDIATE),
+            # ώστε οι ταυτόχρονες κρατήσεις ραντεβού να μην κάνουν διπλή ανάθεση μηχανικού
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Προφίλ παραγωγής για SQLite (WORKSHOP_DB_PROFILE=production):
+# - WAL: οι αναγνώσεις δεν μπλοκάρουν από εγγραφές (και αντίστροφα)
+# - synchronous=NORMAL: ένα fsync ανά checkpoint αντί για κάθε commit (ασφαλές με WAL)
+# - timeout: αναμονή έως 20s για το κλείδωμα εγγραφής αντί για «database is locked»
+# - mmap_size/cache_size: ανάγνωση μέσω mmap (256 MB) και cache σελίδων 64 MB ανά σύνδεση
+# - CONN_MAX_AGE: επαναχρησιμοποίηση συνδέσεων μεταξύ αιτημάτων, με έλεγχο πριν από κάθε αίτημα
+# Το WAL αποθηκεύεται στο αρχείο της βάσης, άρα μένει και μετά την απενεργοποίηση του προφίλ
+# (επιστροφή με `PRAGMA journal_mode=DELETE`). Μετρήσεις: `manage.py benchmark contention`.
+SQLITE_PRODUCTION_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=268435456;'
+        'PRAGMA cache_size=-65536;'
+    ),
+}
+SQLITE_PRODUCTION_CONN_MAX_AGE = 600
+
+if os.environ.get('WORKSHOP_DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        'CONN_MAX_AGE': SQLITE_PRODUCTION_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Cache (τμήματα σελίδων ανά χρήστη, βλ. automotiveworkshop/fragments.py).
+# Η locmem είναι ξεχωριστή σε κάθε διεργασία: με πολλές διεργασίες ορίζεται το
+# WORKSHOP_CACHE_DIR ώστε να χρησιμοποιείται κοινή cache σε αρχεία.
+if os.environ.get('WORKSHOP_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['WORKSHOP_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -106,6 +163,18 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Logging: οι γραμμές προφίλ αιτημάτων γράφονται στην κονσόλα
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'automotiveworkshop.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Redirects
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'